@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import require_admin
-from app.schemas.asamblea_schema import AsambleaCreate, AsambleaResponse, AsambleaUpdateEstado, ReportarControlRequest
+from app.core.migrations import MENSAJE_MIGRACION_PENDIENTE
+from app.schemas.asamblea_schema import AsambleaCreate, AsambleaResponse, AsambleaUpdateEstado, ReportarControlRequest, AsambleaArchivoResponse
 from app.services.asamblea_service import (
     create_new_asamblea,
     get_asambleas,
@@ -13,6 +14,7 @@ from app.services.asamblea_service import (
     send_reportes_control_service,
     send_aviso_actualizacion_service,
 )
+from app.services.archivo_service import archivar_asamblea_service
 from typing import Optional
 from uuid import UUID
 
@@ -23,11 +25,13 @@ router = APIRouter(prefix="/asambleas", tags=["asambleas"])
 def list_asambleas(
     skip: int = Query(0, ge=0, description="Número de registros a saltar"),
     limit: int = Query(100, ge=1, le=100, description="Número máximo de registros a retornar"),
-    search: Optional[str] = Query(None, description="Búsqueda por título o descripción"),
+    search: Optional[str] = Query(None, description="Búsqueda de texto completo por título o descripción (resultados ordenados por relevancia)"),
     estado: Optional[str] = Query(None, description="Filtrar por estado (CREADA, ACTIVA, CERRADA)"),
     fecha_desde: Optional[str] = Query(None, description="Filtrar desde fecha (formato: YYYY-MM-DD)"),
     fecha_hasta: Optional[str] = Query(None, description="Filtrar hasta fecha (formato: YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    include_total: bool = Query(True, description="Calcular el total de resultados (false: solo indica si hay más páginas)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor); reemplaza a skip"),
+    db: Session = Depends(get_read_db)
 ):
     try:
         result = get_asambleas(
@@ -37,7 +41,9 @@ def list_asambleas(
             search=search,
             estado=estado,
             fecha_desde=fecha_desde,
-            fecha_hasta=fecha_hasta
+            fecha_hasta=fecha_hasta,
+            include_total=include_total,
+            cursor=cursor
         )
         
         # Convertir las asambleas a AsambleaResponse
@@ -45,25 +51,29 @@ def list_asambleas(
         
         return {
             "asambleas": asambleas_response,
-            "total": result["total"]
+            "total": result["total"],
+            "has_more": result["has_more"],
+            "next_cursor": result["next_cursor"]
         }
     except OperationalError as e:
         error_msg = str(e)
         if "fecha_final" in error_msg.lower() or "column" in error_msg.lower():
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="La columna 'fecha_final' no existe en la base de datos. Por favor, ejecuta la migración SQL: ALTER TABLE public.asambleas ADD COLUMN IF NOT EXISTS fecha_final timestamptz NULL;"
+                detail=MENSAJE_MIGRACION_PENDIENTE
             )
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database connection error. Please try again later."
         )
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
         if "fecha_final" in error_msg.lower() or "column" in error_msg.lower():
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="La columna 'fecha_final' no existe en la base de datos. Por favor, ejecuta la migración SQL: ALTER TABLE public.asambleas ADD COLUMN IF NOT EXISTS fecha_final timestamptz NULL;"
+                detail=MENSAJE_MIGRACION_PENDIENTE
             )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -213,6 +223,25 @@ def update_asamblea_estado(
             detail=f"Error al actualizar el estado de la asamblea: {str(e)}"
         )
 
+# Endpoint para archivar una asamblea cerrada (exportar sus registros a disco)
+@router.post("/{asamblea_id}/archivar", response_model=AsambleaArchivoResponse)
+def archivar_asamblea(
+    asamblea_id: UUID,
+    eliminar_filas: Optional[bool] = Query(None, description="Borrar las filas de la tabla después de archivar (por defecto ARCHIVO_ELIMINAR_FILAS)"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    try:
+        archivo = archivar_asamblea_service(db=db, asamblea_id=asamblea_id, eliminar_filas=eliminar_filas)
+        return AsambleaArchivoResponse.model_validate(archivo)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al archivar la asamblea: {str(e)}"
+        )
+
 # Endpoint para eliminar una asamblea
 @router.delete("/{asamblea_id}")
 def delete_asamblea(
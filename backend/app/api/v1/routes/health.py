@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import PlainTextResponse, JSONResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from app.core.database import get_db, test_connection
+from app.core.database import get_db, engine, read_engine, estado_pools
+from app.core.metrics import render_metrics
+from app.core.salud import estado_replica, get_estado
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -10,21 +13,29 @@ router = APIRouter(prefix="/health", tags=["health"])
 def health():
     return {"status": "backend is running"}
 
-# Endpoint para probar la conexión a la base de datos.
+# Sonda de vida: el proceso responde (sin I/O; no depende de la base de datos)
+@router.get("/live")
+def health_live():
+    return {"status": "alive"}
+
+# Sonda de disponibilidad: último resultado del verificador en segundo plano (sin I/O).
+# 503 si la base de datos no responde, el esquema no está al día o el resultado está vencido.
+@router.get("/ready")
+def health_ready():
+    estado = get_estado()
+    return JSONResponse(estado, status_code=200 if estado["ready"] else 503)
+
+# Endpoint para probar la conexión a la base de datos (diagnóstico; para sondas usar /ready).
 @router.get("/db")
 def health_db(db: Session = Depends(get_db)):
     try:
-        # Probar conexión básica usando la función de database.py
-        if not test_connection():
-            raise HTTPException(
-                status_code=503,
-                detail="No se pudo establecer conexión con la base de datos"
-            )
-        
-        # Probar que la sesión también funciona (lo que usaremos en la app)
+        # Una sola consulta con la sesión de la app (conexión del pool)
         db.execute(text("SELECT 1"))
         
-        return {"status": "Connection to the database is successfull"}
+        resultado = {"status": "Connection to the database is successfull", "pool": estado_pools()}
+        if read_engine is not None and read_engine is not engine:
+            resultado["replica"] = estado_replica(read_engine)
+        return resultado
 
     except HTTPException:
         raise
@@ -33,4 +44,9 @@ def health_db(db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=503,
             detail=f"Error al conectar con la base de datos: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+# Endpoint de métricas en formato Prometheus (latencias por ruta, pool de BD, correos, QR/PDF).
+@router.get("/metrics", response_class=PlainTextResponse)
+def health_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
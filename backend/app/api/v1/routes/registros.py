@@ -1,48 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError
-from app.core.database import get_db
-from app.schemas.registro_schema import RegistroResponse, RegistroUpdate
+from app.core.database import get_db, get_read_db
+from app.core.migrations import MENSAJE_MIGRACION_PENDIENTE
+from app.core.etag import make_etag, etag_coincide, not_modified, set_etag, version_etag, version_if_match
+from app.core.serialization import FastJSONResponse
+from app.schemas.registro_schema import RegistroResponse, RegistroUpdate, ActividadCreate, ActividadLoteRequest, ActividadLoteResponse
 from app.services.registro_service import (
-    get_registros, 
+    get_registros_rows,
+    get_registros_version_service,
     search_registros_service,
     buscar_registros_para_poderes_service,
     buscar_registro_con_poder_service,
     update_registro_service,
+    registrar_actividad_service,
+    registrar_actividades_lote_service,
     transferir_poder_service,
     devolver_poder_service,
     verificar_control_existente_service,
     verificar_control_en_poderes_service,
     get_estadisticas_ingreso_por_hora_service,
-    get_estadisticas_quorum_coeficiente_service
+    get_estadisticas_quorum_coeficiente_service,
+    get_quorum_serie_service,
+    exportar_registros_service,
+    get_cambios_registros_service
 )
 from uuid import UUID
 from typing import Optional
+from datetime import datetime
+from urllib.parse import quote
 
 router = APIRouter(prefix="/registros", tags=["registros"])
 
 # Endpoint para obtener todos los registros de una asamblea
-@router.get("/asamblea/{asamblea_id}", response_model=list[RegistroResponse])
+# Las filas se leen como dicts con los campos de RegistroResponse y se serializan directamente
+# (sin model_validate por fila ni doble validación contra response_model)
+@router.get("/asamblea/{asamblea_id}", response_model=list[RegistroResponse], response_class=FastJSONResponse)
 def list_registros(
     asamblea_id: UUID,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     try:
-        registros = get_registros(db=db, asamblea_id=asamblea_id)
+        # GET condicional: si nada cambió, responder 304 sin cargar ni serializar filas
+        etag = make_etag("registros", asamblea_id, get_registros_version_service(db=db, asamblea_id=asamblea_id))
+        if etag_coincide(request, etag):
+            return not_modified(etag)
 
-        # Convertir los registros a RegistroResponse
-        registros_response = [RegistroResponse.model_validate(registro) for registro in registros]
+        registros = get_registros_rows(db=db, asamblea_id=asamblea_id)
 
-        return registros_response
+        response = FastJSONResponse(content=registros)
+        set_etag(response, etag)
+        return response
     except OperationalError as e:
         err_msg = str(e).lower()
         if "token_actualizacion" in err_msg or ("column" in err_msg and "does not exist" in err_msg):
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=(
-                    "Falta la columna 'token_actualizacion' en la tabla asamblea_registros. "
-                    "Ejecuta la migración: sql/add_token_actualizacion.sql"
-                ),
+                detail=MENSAJE_MIGRACION_PENDIENTE,
             )
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -56,6 +72,52 @@ def list_registros(
             detail=f"An error occurred while fetching registros: {str(e)}",
         )
 
+# Endpoint de sincronización incremental para las mesas (copia local de los registros)
+# Usa el primario: el cursor se basa en las transacciones del primario, no de la réplica
+@router.get("/asamblea/{asamblea_id}/changes", response_class=FastJSONResponse)
+def get_cambios_registros(
+    asamblea_id: UUID,
+    since: Optional[str] = Query(None, description="Cursor de la respuesta anterior; vacío = todos los registros"),
+    db: Session = Depends(get_db)
+):
+    try:
+        return FastJSONResponse(content=get_cambios_registros_service(db=db, asamblea_id=asamblea_id, since=since))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener los cambios de registros: {str(e)}"
+        )
+
+# Endpoint para exportar los registros de una asamblea (CSV o XLSX en streaming)
+@router.get("/asamblea/{asamblea_id}/export")
+def exportar_registros(
+    asamblea_id: UUID,
+    formato: str = Query("csv", alias="format", description="csv o xlsx"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Una fila por registro con poderes y asistencia ya calculados. Las filas se envían a
+    medida que se leen de la base de datos: la memoria no crece con el tamaño de la asamblea.
+    """
+    try:
+        contenido, media_type, nombre = exportar_registros_service(
+            db=db, asamblea_id=asamblea_id, formato=formato.lower()
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al exportar registros: {str(e)}"
+        )
+    return StreamingResponse(
+        contenido,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(nombre)}"},
+    )
+
 # Endpoint para buscar registros
 @router.get("/asamblea/{asamblea_id}/buscar", response_model=list[RegistroResponse])
 def buscar_registros(
@@ -157,13 +219,18 @@ def verificar_poder(
         )
 
 # Endpoint para actualizar un registro
+# Con If-Match (ETag/versión leída) la escritura solo se aplica si nadie cambió el registro; si no, 409
 @router.put("/{registro_id}", response_model=RegistroResponse)
 def actualizar_registro(
     registro_id: UUID,
     registro_update: RegistroUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     try:
+        version_esperada = version_if_match(request)
+
         # Verificar si numero_control fue enviado explícitamente usando model_dump
         # exclude_unset=True solo incluye campos que fueron enviados en el request
         campos_enviados = registro_update.model_dump(exclude_unset=True)
@@ -186,8 +253,10 @@ def actualizar_registro(
             set_numero_control_none=set_none,
             gestion_poderes=registro_update.gestion_poderes,
             actividad_ingreso=registro_update.actividad_ingreso,
+            version_esperada=version_esperada,
         )
         
+        response.headers["ETag"] = version_etag(registro.version)
         return RegistroResponse.model_validate(registro)
     except HTTPException:
         raise
@@ -197,6 +266,52 @@ def actualizar_registro(
             detail=f"Error al actualizar registro: {str(e)}"
         )
 
+# Endpoint para registrar una actividad (ingreso/salida/reingreso)
+# El servidor agrega actividad_N y sella la hora en un solo UPDATE (sin leer y reenviar el documento)
+@router.post("/{registro_id}/actividad", response_model=RegistroResponse)
+def registrar_actividad(
+    registro_id: UUID,
+    actividad: ActividadCreate,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    try:
+        registro = registrar_actividad_service(
+            db=db,
+            registro_id=registro_id,
+            tipo=actividad.tipo,
+            numero_control=actividad.numero_control,
+            version_esperada=version_if_match(request),
+        )
+        response.headers["ETag"] = version_etag(registro.version)
+        return RegistroResponse.model_validate(registro)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al registrar actividad: {str(e)}"
+        )
+
+# Endpoint para sincronizar en lote las actividades registradas sin conexión en una mesa
+# Un solo request y una transacción para todo el lote; cada evento trae su idempotency_key
+@router.post("/asamblea/{asamblea_id}/actividades/lote", response_model=ActividadLoteResponse)
+def registrar_actividades_lote(
+    asamblea_id: UUID,
+    lote: ActividadLoteRequest,
+    db: Session = Depends(get_db)
+):
+    try:
+        return registrar_actividades_lote_service(db=db, asamblea_id=asamblea_id, eventos=lote.eventos)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al registrar actividades: {str(e)}"
+        )
+
 # Endpoint para transferir un poder
 @router.post("/asamblea/{asamblea_id}/poderes/transferir")
 def transferir_poder(
@@ -342,13 +457,20 @@ def devolver_poder(
 @router.get("/asamblea/{asamblea_id}/estadisticas/ingreso-por-hora", response_model=dict)
 def get_estadisticas_ingreso_por_hora(
     asamblea_id: UUID,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtiene las estadísticas de ingreso agrupadas por hora.
     Solo cuenta actividades de tipo 'ingreso' o 'reingreso'.
     """
     try:
+        etag = make_etag("ingreso-por-hora", asamblea_id, get_registros_version_service(db=db, asamblea_id=asamblea_id))
+        if etag_coincide(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
         estadisticas = get_estadisticas_ingreso_por_hora_service(db=db, asamblea_id=asamblea_id)
         return estadisticas
     except HTTPException:
@@ -366,12 +488,19 @@ def get_estadisticas_ingreso_por_hora(
 @router.get("/asamblea/{asamblea_id}/estadisticas/quorum-coeficiente", response_model=dict)
 def get_estadisticas_quorum_coeficiente(
     asamblea_id: UUID,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtiene las estadísticas de quorum y coeficiente presente.
     """
     try:
+        etag = make_etag("quorum-coeficiente", asamblea_id, get_registros_version_service(db=db, asamblea_id=asamblea_id))
+        if etag_coincide(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
         estadisticas = get_estadisticas_quorum_coeficiente_service(db=db, asamblea_id=asamblea_id)
         return estadisticas
     except HTTPException:
@@ -385,15 +514,53 @@ def get_estadisticas_quorum_coeficiente(
             detail=f"Error al obtener estadísticas de quorum y coeficiente: {str(e)}"
         )
 
+# Endpoint para obtener la evolución del quorum (una muestra por minuto)
+@router.get("/asamblea/{asamblea_id}/estadisticas/quorum-serie", response_model=dict)
+def get_quorum_serie(
+    asamblea_id: UUID,
+    request: Request,
+    response: Response,
+    desde: Optional[datetime] = Query(None, description="Inicio del rango (ISO 8601, p. ej. 2026-03-01T08:00:00-05:00)"),
+    hasta: Optional[datetime] = Query(None, description="Fin del rango (ISO 8601)"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Serie de tiempo del quorum para gráficas y el acta: una muestra por minuto en el que
+    cambió la presencia. Cada muestra vale hasta la siguiente.
+    """
+    try:
+        # Las muestras solo cambian cuando cambian los registros
+        etag = make_etag(
+            "quorum-serie", asamblea_id, desde, hasta,
+            get_registros_version_service(db=db, asamblea_id=asamblea_id),
+        )
+        if etag_coincide(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        return get_quorum_serie_service(db=db, asamblea_id=asamblea_id, desde=desde, hasta=hasta)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error al obtener la serie de quorum: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener la serie de quorum: {str(e)}"
+        )
+
 # Endpoint para obtener un registro por ID (debe estar al final para evitar conflictos con rutas más específicas)
 @router.get("/{registro_id}", response_model=RegistroResponse)
 def get_registro(
     registro_id: UUID,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     try:
         from app.services.registro_service import get_registro_service
         registro = get_registro_service(db=db, registro_id=registro_id)
+        response.headers["ETag"] = version_etag(registro.version)
         return RegistroResponse.model_validate(registro)
     except HTTPException:
         raise
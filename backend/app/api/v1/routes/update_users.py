@@ -2,11 +2,13 @@
 Rutas públicas para que los usuarios actualicen sus datos.
 Sin autenticación: ingreso por torre/apt o por token (link/QR en correo).
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
+from app.core.cache import cache_asambleas
 from app.core.database import get_db
+from app.core.rate_limit import limitar_por_ip, limitar_por_asamblea, registrar_ingreso_fallido
 from app.repositories.registro_repository import (
-    get_registro_by_token,
+    get_registro_publico_by_token,
     get_registro_by_asamblea_torre_apt,
     ensure_token_actualizacion,
     update_registro_by_token,
@@ -20,7 +22,8 @@ from app.schemas.update_users_schema import (
 )
 from uuid import UUID
 
-router = APIRouter(prefix="/update-users", tags=["update-users"])
+# Límite por IP en todas las rutas públicas (429 antes de abrir la sesión de BD)
+router = APIRouter(prefix="/update-users", tags=["update-users"], dependencies=[Depends(limitar_por_ip)])
 
 
 def _asamblea_no_disponible():
@@ -31,13 +34,15 @@ def _asamblea_no_disponible():
 
 
 @router.post("/ingreso", response_model=IngresoResponse)
-def ingreso(data: IngresoRequest, db: Session = Depends(get_db)):
+def ingreso(data: IngresoRequest, request: Request, db: Session = Depends(get_db)):
     """
     Ingreso por número de torre y apartamento. Valida contra la asamblea y devuelve
     un token para acceder a la página de actualizar datos.
     """
+    limitar_por_asamblea(data.asamblea_id)
     asamblea = get_asamblea_by_id(db, data.asamblea_id)
     if not asamblea:
+        registrar_ingreso_fallido(request)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Asamblea no encontrada",
@@ -51,6 +56,7 @@ def ingreso(data: IngresoRequest, db: Session = Depends(get_db)):
         data.numero_apartamento,
     )
     if not registro:
+        registrar_ingreso_fallido(request)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No se encontró un registro con esa torre y apartamento en esta asamblea.",
@@ -64,47 +70,46 @@ def ingreso(data: IngresoRequest, db: Session = Depends(get_db)):
     return IngresoResponse(token=token)
 
 
+def _registro_publico(fila: dict) -> RegistroPublicResponse:
+    return RegistroPublicResponse(
+        id=fila["id"],
+        asamblea_id=fila["asamblea_id"],
+        asamblea_title=fila["asamblea_title"] or "Asamblea",
+        cedula=fila["cedula"] or "",
+        nombre=fila["nombre"] or "",
+        telefono=fila["telefono"],
+        correo=fila["correo"],
+        numero_torre=fila["numero_torre"],
+        numero_apartamento=fila["numero_apartamento"],
+    )
+
+
 @router.get("/registro", response_model=RegistroPublicResponse)
 def get_registro_public(
+    request: Request,
     token: str = Query(..., description="Token de actualización"),
     db: Session = Depends(get_db),
 ):
-    """Obtiene los datos editables del registro asociado al token."""
-    registro = get_registro_by_token(db, token)
+    """Obtiene los datos editables del registro asociado al token (una consulta con la asamblea)."""
+    registro = get_registro_publico_by_token(db, token)
     if not registro:
+        registrar_ingreso_fallido(request)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Token no válido o expirado.",
         )
-    asamblea = get_asamblea_by_id(db, registro.asamblea_id)
-    if asamblea and asamblea.estado == "CERRADA":
+    if registro["asamblea_estado"] == "CERRADA":
         raise _asamblea_no_disponible()
-    asamblea_title = asamblea.title if asamblea else "Asamblea"
-    return RegistroPublicResponse(
-        id=registro.id,
-        asamblea_id=registro.asamblea_id,
-        asamblea_title=asamblea_title,
-        cedula=registro.cedula or "",
-        nombre=registro.nombre or "",
-        telefono=registro.telefono,
-        correo=registro.correo,
-        numero_torre=registro.numero_torre,
-        numero_apartamento=registro.numero_apartamento,
-    )
+    return _registro_publico(registro)
 
 
 @router.patch("/registro", response_model=RegistroPublicResponse)
-def actualizar_registro_public(data: RegistroActualizarRequest, db: Session = Depends(get_db)):
-    """Actualiza solo cedula, nombre, telefono y correo del registro identificado por token."""
-    registro_existente = get_registro_by_token(db, data.token)
-    if not registro_existente:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Token no válido o expirado.",
-        )
-    asamblea = get_asamblea_by_id(db, registro_existente.asamblea_id)
-    if asamblea and asamblea.estado == "CERRADA":
-        raise _asamblea_no_disponible()
+def actualizar_registro_public(data: RegistroActualizarRequest, request: Request, db: Session = Depends(get_db)):
+    """
+    Actualiza solo cedula, nombre, telefono y correo del registro identificado por token.
+    El caso normal es una sola sentencia (UPDATE condicionado a que la asamblea no esté cerrada);
+    solo si no actualiza nada se consulta el motivo (token inexistente o asamblea cerrada).
+    """
     registro = update_registro_by_token(
         db,
         token=data.token,
@@ -113,15 +118,13 @@ def actualizar_registro_public(data: RegistroActualizarRequest, db: Session = De
         telefono=data.telefono,
         correo=data.correo,
     )
-    asamblea_title = asamblea.title if asamblea else "Asamblea"
-    return RegistroPublicResponse(
-        id=registro.id,
-        asamblea_id=registro.asamblea_id,
-        asamblea_title=asamblea_title,
-        cedula=registro.cedula or "",
-        nombre=registro.nombre or "",
-        telefono=registro.telefono,
-        correo=registro.correo,
-        numero_torre=registro.numero_torre,
-        numero_apartamento=registro.numero_apartamento,
+    if registro:
+        cache_asambleas.invalidar_asamblea(registro["asamblea_id"])
+        return _registro_publico(registro)
+    if get_registro_publico_by_token(db, data.token):
+        raise _asamblea_no_disponible()
+    registrar_ingreso_fallido(request)
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Token no válido o expirado.",
     )
@@ -17,6 +17,7 @@ def list_users(
     limit: int = Query(100, ge=1, le=100, description="Número máximo de registros a retornar"),
     search: Optional[str] = Query(None, description="Búsqueda por nombre, apellido o username"),
     is_admin: Optional[bool] = Query(None, description="Filtrar por rol (true=admin, false=operario)"),
+    include_total: bool = Query(True, description="Calcular el total de resultados (false: solo indica si hay más páginas)"),
     db: Session = Depends(get_db)
 ):
     try:
@@ -25,7 +26,8 @@ def list_users(
             skip=skip,
             limit=limit,
             search=search,
-            is_admin=is_admin
+            is_admin=is_admin,
+            include_total=include_total
         )
         
         # Convertir los usuarios a UserResponse
@@ -34,7 +36,8 @@ def list_users(
         
         return {
             "users": users_response,
-            "total": result["total"]
+            "total": result["total"],
+            "has_more": result["has_more"]
         }
     except OperationalError as e:
         raise HTTPException(
@@ -0,0 +1,161 @@
+"""
+Formato en disco del archivo de asambleas cerradas.
+
+Cada asamblea archivada es un directorio <ARCHIVO_DIR>/<asamblea_id>/ con:
+- registros.jsonl.gz: un registro por línea (JSON), comprimido con gzip. gestion_poderes y
+  actividad_ingreso van aplanados como listas ("poderes", "actividades") con su clave original,
+  para poder leerlos con herramientas de tabla (pandas.read_json(lines=True), jq, DuckDB).
+- manifest.json: formato, asamblea, cantidad de registros, columnas, sha256 y tamaño del archivo.
+
+Los archivos se escriben en un temporal y se renombran (nunca quedan a medias). La lectura
+usa mmap: varios workers que leen el mismo archivo comparten las páginas del sistema operativo.
+"""
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.core.serialization import dumps_json
+
+FORMATO = "jsonl.gz/v1"
+ARCHIVO_REGISTROS = "registros.jsonl.gz"
+ARCHIVO_MANIFIESTO = "manifest.json"
+
+# Archivos ya leídos por proceso (son inmutables: la clave incluye el sha256)
+_MAX_EN_MEMORIA = 8
+_en_memoria: "OrderedDict[Tuple[str, str], List[Dict[str, Any]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def aplanar_registro(registro: Dict[str, Any]) -> Dict[str, Any]:
+    """Registro con gestion_poderes / actividad_ingreso como listas de {"clave", ...campos}."""
+    plano = {k: v for k, v in registro.items() if k not in ("gestion_poderes", "actividad_ingreso")}
+    plano["poderes"] = _a_lista(registro.get("gestion_poderes"))
+    plano["actividades"] = _a_lista(registro.get("actividad_ingreso"))
+    return plano
+
+
+def desaplanar_registro(plano: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverso de aplanar_registro: vuelve al formato de la tabla (poder_N / actividad_N)."""
+    registro = {k: v for k, v in plano.items() if k not in ("poderes", "actividades")}
+    registro["gestion_poderes"] = _a_dict(plano.get("poderes"))
+    registro["actividad_ingreso"] = _a_dict(plano.get("actividades"))
+    return registro
+
+
+def _a_lista(documento: Any) -> List[Dict[str, Any]]:
+    if not isinstance(documento, dict):
+        return []
+    return [
+        {"clave": clave, **valor} if isinstance(valor, dict) else {"clave": clave, "valor": valor}
+        for clave, valor in documento.items()
+    ]
+
+
+def _a_dict(lista: Any):
+    if not lista:
+        return None
+    documento = {}
+    for item in lista:
+        item = dict(item)
+        clave = item.pop("clave")
+        documento[clave] = item["valor"] if set(item) == {"valor"} else item
+    return documento
+
+
+def _escribir_atomico(destino: Path, escribir):
+    temporal = destino.with_name(destino.name + ".tmp")
+    with open(temporal, "wb") as f:
+        escribir(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, destino)
+
+
+def escribir_archivo(directorio: Path, registros: Iterable[Dict[str, Any]], manifiesto: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Escribe registros.jsonl.gz y manifest.json en `directorio`.
+    Retorna el manifiesto completo (con registros, bytes y sha256 del archivo de datos).
+    """
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = directorio / ARCHIVO_REGISTROS
+    cantidad = 0
+
+    def escribir(f):
+        nonlocal cantidad
+        # mtime=0: el mismo contenido produce siempre el mismo archivo (y el mismo sha256)
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=9, mtime=0) as gz:
+            for registro in registros:
+                gz.write(dumps_json(aplanar_registro(registro)))
+                gz.write(b"\n")
+                cantidad += 1
+
+    _escribir_atomico(ruta, escribir)
+    sha256 = hashlib.sha256(ruta.read_bytes()).hexdigest()
+
+    manifiesto = {
+        **manifiesto,
+        "formato": FORMATO,
+        "archivo": ARCHIVO_REGISTROS,
+        "registros": cantidad,
+        "bytes": ruta.stat().st_size,
+        "sha256": sha256,
+    }
+    _escribir_atomico(
+        directorio / ARCHIVO_MANIFIESTO,
+        lambda f: f.write(json.dumps(manifiesto, indent=2, ensure_ascii=False, default=str).encode("utf-8")),
+    )
+    return manifiesto
+
+
+def leer_archivo(ruta: str, sha256: str) -> List[Dict[str, Any]]:
+    """
+    Registros de un archivo (formato de la tabla, ver desaplanar_registro).
+    Verifica el sha256 la primera vez; después sirve la copia ya decodificada.
+    """
+    clave = (ruta, sha256)
+    with _lock:
+        if clave in _en_memoria:
+            _en_memoria.move_to_end(clave)
+            return _en_memoria[clave]
+
+    with open(ruta, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        if hashlib.sha256(mapa).hexdigest() != sha256:
+            raise ValueError(f"El archivo {ruta} no coincide con su sha256 registrado")
+        with gzip.GzipFile(fileobj=mapa, mode="rb") as gz:
+            registros = [desaplanar_registro(json.loads(linea)) for linea in gz if linea.strip()]
+
+    with _lock:
+        _en_memoria[clave] = registros
+        while len(_en_memoria) > _MAX_EN_MEMORIA:
+            _en_memoria.popitem(last=False)
+    return registros
+
+
+def iterar_archivo(ruta: str, sha256: str) -> Iterator[Dict[str, Any]]:
+    """
+    Registros de un archivo uno a uno, en el orden en que se escribieron, sin cargarlos todos
+    (para exportaciones de asambleas grandes). El sha256 se verifica antes de retornar, así un
+    archivo dañado falla antes de empezar a responder; si el archivo ya está en memoria se usa esa copia.
+    """
+    with _lock:
+        registros = _en_memoria.get((ruta, sha256))
+    if registros is not None:
+        return iter(registros)
+
+    with open(ruta, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        if hashlib.sha256(mapa).hexdigest() != sha256:
+            raise ValueError(f"El archivo {ruta} no coincide con su sha256 registrado")
+
+    def generar():
+        with gzip.open(ruta, "rb") as gz:
+            for linea in gz:
+                if linea.strip():
+                    yield desaplanar_registro(json.loads(linea))
+
+    return generar()
@@ -0,0 +1,94 @@
+"""
+Caché en memoria del proceso para datos derivados de una asamblea (versión de registros,
+estadísticas de quorum e ingreso por hora).
+
+Cada worker tiene su propia caché. Se mantiene coherente entre workers con las notificaciones
+de PostgreSQL (app.core.notificaciones): cualquier escritura en asambleas o asamblea_registros
+invalida las entradas de esa asamblea en todos los procesos. Los servicios que escriben además
+invalidan la asamblea en su propio worker justo después del commit: la mesa que escribe ve su
+cambio en el GET siguiente sin esperar la vuelta de la notificación.
+
+- Con el listener conectado las entradas viven CACHE_TTL_SECONDS.
+- Sin listener (arranque, BD caída, reconexión) no se guarda nada: la caché nunca sirve datos
+  que otro worker pudo haber cambiado sin avisar.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from app.core.config import CACHE_TTL_SECONDS, CACHE_MAX_ASAMBLEAS
+
+
+class _CacheAsambleas:
+    def __init__(self, ttl: float, max_asambleas: int):
+        self.ttl = ttl
+        self.max_asambleas = max_asambleas
+        self._lock = threading.Lock()
+        # asamblea_id -> {clave: (expira, valor)}, en orden de uso (LRU por asamblea)
+        self._entradas: "OrderedDict[str, Dict[Hashable, Tuple[float, Any]]]" = OrderedDict()
+        # Generación por asamblea: si cambia mientras se calcula un valor, ese valor no se guarda
+        self._generaciones: Dict[str, int] = {}
+        self._generacion_global = 0
+        self.habilitada = False
+
+    def _generacion(self, asamblea_id: str) -> Tuple[int, int]:
+        return self._generacion_global, self._generaciones.get(asamblea_id, 0)
+
+    def obtener_o_calcular(self, asamblea_id, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Valor cacheado de (asamblea, clave) o el resultado de calcular() (que se guarda)."""
+        asamblea_id = str(asamblea_id)
+        ahora = time.monotonic()
+        with self._lock:
+            habilitada = self.habilitada
+            entradas = self._entradas.get(asamblea_id)
+            if entradas is not None:
+                self._entradas.move_to_end(asamblea_id)
+                guardado = entradas.get(clave)
+                if guardado is not None and guardado[0] > ahora:
+                    return guardado[1]
+            generacion = self._generacion(asamblea_id)
+
+        valor = calcular()
+        if not habilitada:
+            return valor
+
+        with self._lock:
+            # Si llegó una invalidación mientras se consultaba la BD, el valor puede estar viejo
+            if self.habilitada and self._generacion(asamblea_id) == generacion:
+                self._entradas.setdefault(asamblea_id, {})[clave] = (ahora + self.ttl, valor)
+                self._entradas.move_to_end(asamblea_id)
+                while len(self._entradas) > self.max_asambleas:
+                    self._entradas.popitem(last=False)
+        return valor
+
+    def invalidar_asamblea(self, asamblea_id):
+        asamblea_id = str(asamblea_id)
+        with self._lock:
+            self._entradas.pop(asamblea_id, None)
+            self._generaciones[asamblea_id] = self._generaciones.get(asamblea_id, 0) + 1
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._generaciones.clear()
+            self._generacion_global += 1
+
+    def habilitar(self, habilitada: bool):
+        """Se habilita solo mientras el listener de notificaciones está conectado."""
+        with self._lock:
+            self.habilitada = habilitada
+            self._entradas.clear()
+            self._generacion_global += 1
+
+
+cache_asambleas = _CacheAsambleas(CACHE_TTL_SECONDS, CACHE_MAX_ASAMBLEAS)
+
+
+# Invalidación a partir de una notificación de cambios (ver app.core.notificaciones)
+def invalidar_por_notificacion(payload: Dict[str, Any]):
+    asamblea_id = payload.get("asamblea_id")
+    if asamblea_id:
+        cache_asambleas.invalidar_asamblea(asamblea_id)
+    else:
+        cache_asambleas.limpiar()
@@ -0,0 +1,180 @@
+"""
+Middleware ASGI de compresión de respuestas (brotli o gzip según Accept-Encoding).
+
+- Solo comprime cuerpos de al menos `minimum_size` bytes.
+- No toca respuestas ya comprimidas (Content-Encoding presente) ni tipos binarios
+  que no ganan nada (PDF, imágenes, zip).
+- Las respuestas en streaming (StreamingResponse) se comprimen por fragmentos, con
+  flush en cada uno para que el cliente reciba los datos sin esperar al final.
+"""
+import zlib
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional, se usa gzip
+    brotli = None
+
+TIPOS_EXCLUIDOS: Tuple[str, ...] = (
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/vnd.openxmlformats",  # xlsx/docx ya son zip
+    "image/",
+    "audio/",
+    "video/",
+)
+
+
+def _negociar_encoding(accept_encoding: str) -> Optional[str]:
+    """Elige "br" o "gzip" según Accept-Encoding (respetando q=0)."""
+    aceptados = {}
+    for parte in accept_encoding.split(","):
+        campos = parte.strip().split(";")
+        nombre = campos[0].strip().lower()
+        if not nombre:
+            continue
+        q = 1.0
+        for campo in campos[1:]:
+            campo = campo.strip()
+            if campo.startswith("q="):
+                try:
+                    q = float(campo[2:])
+                except ValueError:
+                    q = 0.0
+        aceptados[nombre] = q
+    if brotli is not None and aceptados.get("br", 0) > 0:
+        return "br"
+    if aceptados.get("gzip", aceptados.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+
+class _Compresor:
+    """Envoltorio común para compresión incremental gzip / brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16+MAX_WBITS produce formato gzip (cabecera y CRC)
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            salida = self._obj.process(data)
+            return salida + self._obj.flush() if flush else salida
+        salida = self._obj.compress(data)
+        return salida + self._obj.flush(zlib.Z_SYNC_FLUSH) if flush else salida
+
+    def finalizar(self) -> bytes:
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _negociar_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compresor: Optional[_Compresor] = None
+        self.pasar_directo = False
+        self.streaming = False
+
+    def _es_comprimible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return not any(content_type.startswith(tipo) for tipo in TIPOS_EXCLUIDOS)
+
+    async def send(self, message: Message):
+        tipo = message["type"]
+
+        if tipo == "http.response.start":
+            # Se retiene hasta ver el primer fragmento del cuerpo
+            self.start_message = message
+            status_code = message.get("status", 200)
+            headers = Headers(raw=message["headers"])
+            self.pasar_directo = status_code in (204, 304) or not self._es_comprimible(headers)
+            if self.pasar_directo:
+                await self._send(message)
+            return
+
+        if tipo != "http.response.body" or self.pasar_directo:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compresor is None and not self.streaming:
+            if not more_body:
+                # Respuesta completa en un solo mensaje
+                if len(body) < self.middleware.minimum_size:
+                    await self._send(self.start_message)
+                    await self._send(message)
+                    return
+                compresor = self._nuevo_compresor()
+                comprimido = compresor.comprimir(body) + compresor.finalizar()
+                headers = self._headers_comprimidos()
+                headers["Content-Length"] = str(len(comprimido))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": comprimido})
+                return
+
+            # Respuesta en streaming: sin Content-Length, se comprime por fragmentos
+            self.streaming = True
+            self.compresor = self._nuevo_compresor()
+            headers = self._headers_comprimidos()
+            del headers["Content-Length"]
+            await self._send(self.start_message)
+
+        if more_body:
+            salida = self.compresor.comprimir(body, flush=True)
+        else:
+            salida = self.compresor.comprimir(body) + self.compresor.finalizar()
+        await self._send({"type": "http.response.body", "body": salida, "more_body": more_body})
+
+    def _nuevo_compresor(self) -> _Compresor:
+        return _Compresor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+
+    def _headers_comprimidos(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # Un ETag fuerte describe bytes exactos; tras comprimir pasa a ser débil
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        return headers
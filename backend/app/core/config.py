@@ -9,12 +9,45 @@ load_dotenv(dotenv_path=env_path)
 # También intentar cargar desde el directorio actual (por si acaso)
 load_dotenv()
 
+# Leer una variable de entorno entera con valor por defecto y límites
+def _get_int_env(name: str, default: int, minimo: int = None, maximo: int = None) -> int:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        value = default
+    if minimo is not None:
+        value = max(minimo, value)
+    if maximo is not None:
+        value = min(maximo, value)
+    return value
+
 # Variables acceso a la base de datos
 RDSHOST = os.getenv("RDSHOST")
 DB_NAME = os.getenv("DB_NAME")
 PORT = os.getenv("PORT", "5432")  # Puerto por defecto de PostgreSQL
 USER = os.getenv("USER")
 PASSWORD = os.getenv("PASSWORD")
+# Réplica de lectura opcional (mismo usuario, contraseña y base de datos); vacío = todo al primario
+RDSHOST_REPLICA = (os.getenv("RDSHOST_REPLICA") or "").strip()
+PORT_REPLICA = os.getenv("PORT_REPLICA", PORT)
+
+# Pool de conexiones (por worker y por motor: primario y réplica)
+DB_POOL_SIZE = _get_int_env("DB_POOL_SIZE", 10, minimo=1)
+# Conexiones extra permitidas por encima de DB_POOL_SIZE en picos (se cierran al devolverse)
+DB_MAX_OVERFLOW = _get_int_env("DB_MAX_OVERFLOW", 20, minimo=0)
+# Segundos que una petición espera una conexión libre antes de fallar
+DB_POOL_TIMEOUT = _get_int_env("DB_POOL_TIMEOUT", 30, minimo=1)
+# Segundos tras los que se reabre una conexión (-1 = nunca); menor que el timeout de inactividad del proxy/RDS
+DB_POOL_RECYCLE = _get_int_env("DB_POOL_RECYCLE", 1800, minimo=-1)
+# Verificar cada conexión con un ping antes de entregarla (descarta las cortadas por la red)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").strip().lower() in ("1", "true", "yes", "si", "sí")
+# Conexiones que se abren al iniciar cada worker (hasta DB_POOL_SIZE; 0 = ninguna)
+DB_POOL_MIN_SIZE = _get_int_env("DB_POOL_MIN_SIZE", 2, minimo=0)
+# Límite de duración de cada sentencia en milisegundos (0 = sin límite); las migraciones no lo aplican
+DB_STATEMENT_TIMEOUT_MS = _get_int_env("DB_STATEMENT_TIMEOUT_MS", 0, minimo=0)
+# Segundos para establecer una conexión nueva
+DB_CONNECT_TIMEOUT = _get_int_env("DB_CONNECT_TIMEOUT", 10, minimo=1)
 
 # Variables de seguridad de Tokens JWT
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -35,4 +68,73 @@ SENDGRID_FROM_EMAIL = os.getenv("SENDGRID_FROM_EMAIL", "noreply@comerciovip.com"
 SENDGRID_FROM_NAME = os.getenv("SENDGRID_FROM_NAME", "Registros Votación")
 
 # URL pública del frontend (para links en correos y QR; en local usar FRONTEND_URL=http://localhost:3000)
-FRONTEND_URL = os.getenv("FRONTEND_URL", "https://comerciovip.com").rstrip("/")
\ No newline at end of file
+FRONTEND_URL = os.getenv("FRONTEND_URL", "https://comerciovip.com").rstrip("/")
+
+# Compresión de respuestas (gzip / brotli)
+# Respuestas más pequeñas que el umbral (bytes) se envían sin comprimir
+COMPRESSION_MINIMUM_SIZE = _get_int_env("COMPRESSION_MINIMUM_SIZE", 1024, minimo=0)
+# Nivel gzip 1-9 (6 = equilibrio por defecto de zlib)
+COMPRESSION_GZIP_LEVEL = _get_int_env("COMPRESSION_GZIP_LEVEL", 6, minimo=1, maximo=9)
+# Calidad brotli 0-11 (4 comprime mejor que gzip 6 con un costo de CPU similar)
+COMPRESSION_BROTLI_QUALITY = _get_int_env("COMPRESSION_BROTLI_QUALITY", 4, minimo=0, maximo=11)
+# Métricas (/health/metrics)
+# Con varios workers: directorio compartido donde cada proceso deja su instantánea (vacío = solo el proceso actual)
+METRICS_DIR = os.getenv("METRICS_DIR", "").strip()
+# Cada cuántos segundos escribe cada worker su instantánea en METRICS_DIR
+METRICS_FLUSH_SECONDS = _get_int_env("METRICS_FLUSH_SECONDS", 10, minimo=1)
+
+# Sondas /health/ready: cada worker verifica BD, esquema y pools en segundo plano cada N segundos
+HEALTH_CHECK_INTERVAL_SECONDS = _get_int_env("HEALTH_CHECK_INTERVAL_SECONDS", 5, minimo=1)
+# Un resultado más antiguo que esto (verificador detenido o bloqueado) reporta el worker como no listo
+HEALTH_MAX_AGE_SECONDS = _get_int_env("HEALTH_MAX_AGE_SECONDS", 60, minimo=2)
+
+# Conteo de consultas SQL por petición (header Server-Timing y warnings en el log)
+# Se registra un warning si una petición supera esta cantidad de consultas o este tiempo total en BD
+QUERY_WARN_COUNT = _get_int_env("QUERY_WARN_COUNT", 20, minimo=1)
+QUERY_WARN_MS = _get_int_env("QUERY_WARN_MS", 500, minimo=1)
+# Misma sentencia repetida este número de veces en una petición = posible N+1
+QUERY_REPEAT_WARN = _get_int_env("QUERY_REPEAT_WARN", 10, minimo=2)
+
+# Zona horaria con la que el servidor sella la hora de las actividades (ingreso/salida)
+APP_TIMEZONE = os.getenv("APP_TIMEZONE", "America/Bogota").strip() or "America/Bogota"
+
+# Máximo de actividades por lote en la sincronización de las mesas (POST .../actividades/lote)
+ACTIVIDADES_LOTE_MAX = _get_int_env("ACTIVIDADES_LOTE_MAX", 1000, minimo=1)
+
+# Idempotency-Key en POST/PUT de /registros y /asambleas (respuesta guardada en idempotency_keys)
+# Segundos que se conserva la respuesta para repetirla a los reintentos
+IDEMPOTENCY_TTL_SECONDS = _get_int_env("IDEMPOTENCY_TTL_SECONDS", 86400, minimo=60)
+# Segundos tras los que una petición EN_CURSO se considera abandonada (worker caído) y la clave se libera
+IDEMPOTENCY_LOCK_SECONDS = _get_int_env("IDEMPOTENCY_LOCK_SECONDS", 300, minimo=10)
+# Respuestas más grandes que esto no se guardan (la clave se libera y un reintento se vuelve a ejecutar)
+IDEMPOTENCY_MAX_BYTES = _get_int_env("IDEMPOTENCY_MAX_BYTES", 1048576, minimo=1024)
+
+# Límite de peticiones de las rutas públicas /update-users (token bucket por IP y por asamblea)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").strip().lower() in ("1", "true", "yes", "si", "sí")
+# Peticiones por minuto y ráfaga máxima por IP
+RATE_LIMIT_IP_POR_MINUTO = _get_int_env("RATE_LIMIT_IP_POR_MINUTO", 60, minimo=1)
+RATE_LIMIT_IP_RAFAGA = _get_int_env("RATE_LIMIT_IP_RAFAGA", 20, minimo=1)
+# Peticiones por minuto y ráfaga máxima por asamblea (todas las IPs juntas; absorbe el pico tras un aviso masivo)
+RATE_LIMIT_ASAMBLEA_POR_MINUTO = _get_int_env("RATE_LIMIT_ASAMBLEA_POR_MINUTO", 1200, minimo=1)
+RATE_LIMIT_ASAMBLEA_RAFAGA = _get_int_env("RATE_LIMIT_ASAMBLEA_RAFAGA", 300, minimo=1)
+# Ingresos fallidos (torre/apartamento inexistente) por minuto y ráfaga por IP antes de bloquearla (enumeración)
+RATE_LIMIT_FALLOS_POR_MINUTO = _get_int_env("RATE_LIMIT_FALLOS_POR_MINUTO", 5, minimo=1)
+RATE_LIMIT_FALLOS_RAFAGA = _get_int_env("RATE_LIMIT_FALLOS_RAFAGA", 10, minimo=1)
+# Compartir los contadores entre workers/instancias en PostgreSQL (tabla rate_limit_buckets)
+RATE_LIMIT_COMPARTIDO = os.getenv("RATE_LIMIT_COMPARTIDO", "false").strip().lower() in ("1", "true", "yes", "si", "sí")
+# Proxies de confianza delante de la API: la IP del cliente es la entrada N desde el final de X-Forwarded-For (0 = IP de la conexión)
+RATE_LIMIT_PROXIES = _get_int_env("RATE_LIMIT_PROXIES", 0, minimo=0)
+
+# Caché en memoria por worker (versión de registros y estadísticas por asamblea)
+# Se invalida con LISTEN/NOTIFY de PostgreSQL; el TTL es solo un límite de seguridad
+CACHE_TTL_SECONDS = _get_int_env("CACHE_TTL_SECONDS", 300, minimo=1)
+# Máximo de asambleas con entradas en caché por worker (se descartan las menos usadas)
+CACHE_MAX_ASAMBLEAS = _get_int_env("CACHE_MAX_ASAMBLEAS", 200, minimo=1)
+
+# Archivo de asambleas cerradas (JSON lines comprimido en disco + manifiesto)
+# Directorio de los archivos; vacío = archivo deshabilitado
+ARCHIVO_DIR = os.getenv("ARCHIVO_DIR", "").strip()
+# Archivar automáticamente al pasar una asamblea a CERRADA
+ARCHIVO_AL_CERRAR = os.getenv("ARCHIVO_AL_CERRAR", "true").strip().lower() in ("1", "true", "yes", "si", "sí")
+# Borrar de asamblea_registros las filas ya archivadas (la asamblea queda solo lectura desde el archivo)
+ARCHIVO_ELIMINAR_FILAS = os.getenv("ARCHIVO_ELIMINAR_FILAS", "false").strip().lower() in ("1", "true", "yes", "si", "sí")
@@ -1,13 +1,18 @@
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.core.config import RDSHOST, DB_NAME, PORT, PASSWORD, USER
+from app.core.config import (
+    RDSHOST, DB_NAME, PORT, PASSWORD, USER, RDSHOST_REPLICA, PORT_REPLICA,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    DB_POOL_MIN_SIZE, DB_STATEMENT_TIMEOUT_MS, DB_CONNECT_TIMEOUT,
+)
+from app.core.pool import QueuePoolInstrumentado, instrumentar_engine, calentar_pool
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Función para construir la URL de la base de datos
-def get_database_url():
+def get_database_url(host: str = None, port: str = None):
     """Construye la URL de la base de datos validando las variables de entorno"""
     if not all([USER, PASSWORD, RDSHOST, DB_NAME, PORT]):
         missing = [var for var, val in [
@@ -17,24 +22,58 @@ def get_database_url():
         raise ValueError(
             f"Faltan variables de entorno requeridas para la conexión a la base de datos: {', '.join(missing)}"
         )
-    return f"postgresql://{USER}:{PASSWORD}@{RDSHOST}:{PORT}/{DB_NAME}"
+    # Driver explícito: SQLAlchemy 2.1 usa psycopg 3 para postgresql:// y requirements.txt instala
+    # psycopg2 (el listener de app.core.notificaciones usa su API de notificaciones)
+    return f"postgresql+psycopg2://{USER}:{PASSWORD}@{host or RDSHOST}:{port or PORT}/{DB_NAME}"
+
+# Función para crear un motor con el pool configurado (DB_POOL_*) e instrumentado (ver app/core/pool.py)
+def _crear_engine(url: str, nombre: str, opciones: list = None):
+    opciones = list(opciones or [])
+    if DB_STATEMENT_TIMEOUT_MS:
+        opciones.append(f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}")
+    connect_args = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if opciones:
+        connect_args["options"] = " ".join(opciones)
+    motor = create_engine(
+        url,
+        poolclass=QueuePoolInstrumentado,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=connect_args,
+    )
+    instrumentar_engine(motor, nombre)
+    return motor
 
 # Intentar crear el motor de SQLAlchemy
 # Si faltan variables, se creará un engine None y se validará cuando se use
 engine = None
 try:
     DATABASE_URL = get_database_url()
-    engine = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20
-    )
+    engine = _crear_engine(DATABASE_URL, "primario")
     logger.info("Motor de base de datos creado exitosamente")
 except ValueError as e:
     logger.warning(f"No se pudo crear el motor de base de datos: {e}")
     logger.info("El servidor iniciará, pero las funciones de BD no estarán disponibles hasta configurar las variables de entorno")
 
+# Motor de solo lectura para la réplica (RDSHOST_REPLICA). Sin réplica configurada apunta al
+# primario. Las transacciones se abren en modo read-only: una escritura por error falla
+# también cuando la réplica es en realidad otro primario (p. ej. un segundo PostgreSQL local)
+read_engine = engine
+if engine and RDSHOST_REPLICA:
+    try:
+        read_engine = _crear_engine(
+            get_database_url(RDSHOST_REPLICA, PORT_REPLICA),
+            "replica",
+            opciones=["-c default_transaction_read_only=on"],
+        )
+        logger.info("Motor de réplica de lectura creado (%s)", RDSHOST_REPLICA)
+    except Exception as e:
+        read_engine = engine
+        logger.warning(f"No se pudo crear el motor de la réplica, las lecturas usarán el primario: {e}")
+
 # Crear la clase base para los modelos
 Base = declarative_base()
 
@@ -43,6 +82,14 @@ SessionLocal = None
 if engine:
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sesiones de lectura: info["replica"] indica que los datos pueden venir con retraso
+ReadSessionLocal = None
+if read_engine:
+    ReadSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=read_engine,
+        info={"replica": read_engine is not engine},
+    )
+
 # Generador de dependencia para obtener una sesión de base de datos.
 def get_db():
     if not engine or not SessionLocal:
@@ -57,6 +104,42 @@ def get_db():
     finally:
         db.close()
 
+# Dependencia para GET de reportes, listas y estadísticas (réplica si está configurada).
+# Las escrituras y las lecturas que deben ver la última escritura (verificaciones, búsquedas
+# de las mesas, GET de un registro antes de editarlo) siguen usando get_db.
+def get_read_db():
+    if not read_engine or not ReadSessionLocal:
+        from fastapi import HTTPException, status
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Base de datos no configurada. Verifique las variables de entorno."
+        )
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# True si la sesión lee de la réplica (sus datos pueden ir atrasados respecto al primario)
+def es_sesion_replica(db) -> bool:
+    return bool(db.info.get("replica"))
+
+# Estado y contadores de los pools de este proceso (para /health/db)
+def estado_pools() -> dict:
+    pools = {}
+    for motor in (engine, read_engine):
+        estadisticas = getattr(getattr(motor, "pool", None), "estadisticas", None)
+        if estadisticas is not None and estadisticas.nombre not in pools:
+            pools[estadisticas.nombre] = estadisticas.resumen(motor.pool)
+    return pools
+
+# Abrir las primeras conexiones de cada pool al iniciar el worker (DB_POOL_MIN_SIZE)
+def calentar_pools():
+    for motor in {id(m): m for m in (engine, read_engine) if m is not None}.values():
+        abiertas = calentar_pool(motor, DB_POOL_MIN_SIZE)
+        if abiertas:
+            logger.info("Pool %s: %d conexiones abiertas al iniciar", motor.pool.estadisticas.nombre, abiertas)
+
 # Función para probar la conexión a la base de datos.
 def test_connection():
     if not engine:
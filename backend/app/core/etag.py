@@ -0,0 +1,67 @@
+"""
+Utilidades para GET condicionales con ETag / If-None-Match y escrituras condicionales
+con If-Match (versión de un registro).
+"""
+import hashlib
+from typing import Optional
+from fastapi import HTTPException, Request, Response, status
+
+
+def make_etag(*partes) -> str:
+    """Genera un ETag débil a partir de los valores que identifican la versión del recurso."""
+    raw = "|".join(str(parte) for parte in partes).encode("utf-8")
+    return f'W/"{hashlib.sha1(raw).hexdigest()[:20]}"'
+
+
+def _normalizar(etag: str) -> str:
+    # La comparación débil ignora el prefijo W/
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_coincide(request: Request, etag: str) -> bool:
+    """True si el If-None-Match del cliente incluye el ETag actual."""
+    if_none_match: Optional[str] = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    actual = _normalizar(etag)
+    return any(_normalizar(valor) == actual for valor in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Respuesta 304 sin cuerpo con el ETag vigente."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    # El navegador guarda la respuesta pero siempre revalida con If-None-Match
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def version_etag(version: int) -> str:
+    """ETag de un recurso con columna version (p. ej. W/"3")."""
+    return f'W/"{version}"'
+
+
+def version_if_match(request: Request) -> Optional[int]:
+    """
+    Versión esperada según If-Match, o None si el cliente no lo envió (o envió "*").
+    Se compara en forma débil: el middleware de compresión convierte los ETag en W/.
+    """
+    if_match = (request.headers.get("if-match") or "").strip()
+    if not if_match or if_match == "*":
+        return None
+    valor = _normalizar(if_match.split(",")[0]).strip('"')
+    try:
+        return int(valor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match inválido: debe ser el ETag de la versión del registro",
+        )
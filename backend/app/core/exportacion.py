@@ -0,0 +1,169 @@
+"""
+Escritura incremental de tablas a CSV y XLSX para respuestas en streaming.
+
+Ambos generadores reciben los encabezados y un iterable de filas (listas de valores) y
+producen bloques de bytes a medida que avanzan: la memoria no depende de la cantidad de filas.
+
+El XLSX se arma a mano (sin openpyxl): un zip con el mínimo de partes de Office Open XML y la
+hoja escrita fila por fila con cadenas en línea (inlineStr), sin tabla de cadenas compartidas.
+zipfile escribe sobre un destino no posicionable usando descriptores de datos, así cada
+bloque comprimido se entrega apenas está listo.
+"""
+import csv
+import io
+import zipfile
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Sequence
+from xml.sax.saxutils import escape
+
+# Filas por bloque entregado al cliente
+FILAS_POR_BLOQUE = 200
+
+# Caracteres de control no permitidos en XML 1.0
+_CONTROL = {c: None for c in range(32) if c not in (9, 10, 13)}
+
+
+def exportar_csv(encabezados: Sequence[str], filas: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """CSV UTF-8 con BOM (Excel lo abre con tildes correctas) y separador coma."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(encabezados)
+    # El encabezado sale de inmediato: el primer byte no espera a la base de datos
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    for i, fila in enumerate(filas, start=1):
+        writer.writerow(["" if valor is None else valor for valor in fila])
+        if i % FILAS_POR_BLOQUE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _Destino(io.RawIOBase):
+    """Destino de escritura no posicionable que acumula bytes hasta que se retiran."""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._partes.append(bytes(data))
+        return len(data)
+
+    def retirar(self) -> bytes:
+        data = b"".join(self._partes)
+        self._partes.clear()
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Estilo 1: encabezado en negrita
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
+
+def _workbook(nombre_hoja: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(nombre_hoja[:31], {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _celda(valor: Any, estilo: str = "") -> str:
+    if valor is None or valor == "":
+        return "<c/>"
+    if isinstance(valor, bool):
+        valor = "Si" if valor else "No"
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c{estilo}><v>{valor}</v></c>'
+    texto = escape(str(valor).translate(_CONTROL))
+    return f'<c t="inlineStr"{estilo}><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xml(valores: Sequence[Any], estilo: str = "") -> str:
+    return "<row>" + "".join(_celda(valor, estilo) for valor in valores) + "</row>"
+
+
+def exportar_xlsx(
+    encabezados: Sequence[str],
+    filas: Iterable[Sequence[Any]],
+    nombre_hoja: str = "Registros",
+) -> Iterator[bytes]:
+    """Libro XLSX de una hoja (encabezado en negrita y fijo) generado por bloques."""
+    destino = _Destino()
+    with zipfile.ZipFile(destino, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _RELS)
+        zf.writestr("xl/workbook.xml", _workbook(nombre_hoja))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _STYLES)
+
+        with zf.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as hoja:
+            hoja.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                '</sheetView></sheetViews>'
+                '<sheetData>'
+                + _fila_xml(encabezados, ' s="1"')
+            ).encode("utf-8"))
+            yield destino.retirar()
+
+            bloque = []
+            for i, fila in enumerate(filas, start=1):
+                bloque.append(_fila_xml(fila))
+                if i % FILAS_POR_BLOQUE == 0:
+                    hoja.write("".join(bloque).encode("utf-8"))
+                    bloque.clear()
+                    # El compresor retiene datos hasta llenar su ventana; se entrega lo que haya
+                    datos = destino.retirar()
+                    if datos:
+                        yield datos
+            hoja.write(("".join(bloque) + "</sheetData></worksheet>").encode("utf-8"))
+    yield destino.retirar()
@@ -0,0 +1,310 @@
+"""
+Middleware ASGI de Idempotency-Key para los POST y PUT de /registros y /asambleas.
+
+Una petición con header Idempotency-Key se ejecuta una sola vez por clave, llamador, método y ruta:
+- El llamador es el hash del sub del JWT (Authorization o cookie, como get_current_user) o "anon".
+  La respuesta guardada se repite antes de que la ruta verifique permisos, por eso una clave
+  solo la ve quien la usó: otro usuario con la misma clave ejecuta su propia petición.
+- La primera reserva la clave (fila EN_CURSO en idempotency_keys, migración 0015), se ejecuta
+  y guarda su respuesta (código, headers y cuerpo) por IDEMPOTENCY_TTL_SECONDS.
+- Un reintento con la misma clave recibe la respuesta guardada (header Idempotent-Replayed)
+  sin volver a ejecutar la operación.
+- Si la original sigue en curso, el reintento recibe 409 con Retry-After.
+- La misma clave con otro cuerpo recibe 422.
+- Solo se guardan las respuestas 2xx y los 4xx deterministas (400, 404, 409, 410, 422). Las
+  demás (401/403 de una sesión vencida, 429, 5xx) liberan la clave: el reintento se ejecuta de nuevo.
+- Una respuesta guardable de más de IDEMPOTENCY_MAX_BYTES se guarda con su código y un cuerpo JSON
+  que avisa que se omitió (header Idempotent-Body-Omitted). Si no se puede guardar, la clave queda
+  reservada hasta que vence el bloqueo: una operación ya aplicada nunca libera su clave.
+
+Sin el header, o sin base de datos configurada, la petición pasa sin cambios.
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from jose import JWTError
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_MAX_BYTES
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+METODOS = ("POST", "PUT")
+PREFIJOS = ("/registros", "/asambleas")
+LARGO_MAXIMO_CLAVE = 200
+ANONIMO = "anon"
+
+# Errores 4xx que dependen solo de la petición (el mismo cuerpo da el mismo resultado)
+ESTADOS_4XX_GUARDADOS = frozenset({400, 404, 409, 410, 422})
+
+# Segundos entre limpiezas de claves vencidas (por worker)
+_INTERVALO_LIMPIEZA = 300.0
+
+# Reserva la clave si no existe o si la fila anterior ya venció (incluye EN_CURSO abandonadas)
+_SQL_RESERVAR = text("""
+    INSERT INTO public.idempotency_keys (clave, sujeto, metodo, ruta, huella, estado, expira_en)
+    VALUES (:clave, :sujeto, :metodo, :ruta, :huella, 'EN_CURSO', now() + make_interval(secs => :bloqueo))
+    ON CONFLICT (clave, sujeto, metodo, ruta) DO UPDATE SET
+        huella = EXCLUDED.huella,
+        estado = 'EN_CURSO',
+        status_code = NULL,
+        headers = NULL,
+        body = NULL,
+        created_at = now(),
+        expira_en = EXCLUDED.expira_en
+    WHERE idempotency_keys.expira_en < now()
+    RETURNING 1
+""")
+
+_SQL_EXISTENTE = text("""
+    SELECT huella, estado, status_code, headers, body
+    FROM public.idempotency_keys
+    WHERE clave = :clave AND sujeto = :sujeto AND metodo = :metodo AND ruta = :ruta
+""")
+
+_SQL_GUARDAR = text("""
+    UPDATE public.idempotency_keys
+    SET estado = 'COMPLETA', status_code = :status_code, headers = CAST(:headers AS jsonb),
+        body = :body, expira_en = now() + make_interval(secs => :ttl)
+    WHERE clave = :clave AND sujeto = :sujeto AND metodo = :metodo AND ruta = :ruta AND huella = :huella
+""")
+
+_SQL_LIBERAR = text("""
+    DELETE FROM public.idempotency_keys
+    WHERE clave = :clave AND sujeto = :sujeto AND metodo = :metodo AND ruta = :ruta
+      AND huella = :huella AND estado = 'EN_CURSO'
+""")
+
+_SQL_LIMPIAR = text("DELETE FROM public.idempotency_keys WHERE expira_en < now()")
+
+# Headers que no se guardan (los agrega de nuevo el servidor o no aplican al reintento)
+_HEADERS_EXCLUIDOS = {"content-length", "date", "server", "set-cookie", "server-timing"}
+
+# Lo que se guarda en lugar de una respuesta de más de IDEMPOTENCY_MAX_BYTES
+_CUERPO_OMITIDO = json.dumps({
+    "detail": "La operación ya se aplicó. Su respuesta era demasiado grande para repetirla; consulte el recurso de nuevo."
+}, ensure_ascii=False).encode("utf-8")
+_HEADERS_CUERPO_OMITIDO = [["content-type", "application/json"], ["idempotent-body-omitted", "true"]]
+
+
+def _sujeto(conexion: HTTPConnection) -> str:
+    """Hash del sub del JWT de la petición, o ANONIMO si no trae un token válido."""
+    token = None
+    autorizacion = conexion.headers.get("authorization", "")
+    if autorizacion.startswith("Bearer "):
+        token = autorizacion.split(" ", 1)[1]
+    if not token:
+        token = conexion.cookies.get("access_token")
+    if not token:
+        return ANONIMO
+    try:
+        sub = decode_token(token).get("sub")
+    except JWTError:
+        # La ruta responderá 401 y esa respuesta no se guarda
+        return ANONIMO
+    if not sub:
+        return ANONIMO
+    return hashlib.sha256(f"sub:{sub}".encode("utf-8")).hexdigest()
+
+
+def _se_guarda(status_code: int) -> bool:
+    return 200 <= status_code < 300 or status_code in ESTADOS_4XX_GUARDADOS
+
+
+def _ruta(scope: Scope) -> str:
+    ruta = scope.get("path", "")
+    root_path = scope.get("root_path", "")
+    if root_path and ruta.startswith(root_path):
+        ruta = ruta[len(root_path):]
+    return ruta
+
+
+async def _respuesta_json(send: Send, status_code: int, contenido: dict, extra: Tuple[Tuple[bytes, bytes], ...] = ()):
+    body = json.dumps(contenido, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            *extra,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Ejecuta una sola vez cada POST/PUT con Idempotency-Key (ver docstring del módulo)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._ultima_limpieza = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope.get("method") not in METODOS:
+            await self.app(scope, receive, send)
+            return
+        conexion = HTTPConnection(scope)
+        clave = conexion.headers.get(HEADER, "").strip()
+        ruta = _ruta(scope)
+        if not clave or not ruta.startswith(PREFIJOS):
+            await self.app(scope, receive, send)
+            return
+
+        from app.core.database import engine
+        if engine is None:
+            await self.app(scope, receive, send)
+            return
+        if len(clave) > LARGO_MAXIMO_CLAVE:
+            await _respuesta_json(send, 400, {"detail": f"Idempotency-Key de más de {LARGO_MAXIMO_CLAVE} caracteres"})
+            return
+
+        # El cuerpo se lee completo para calcular su huella y luego se entrega igual a la app
+        partes: List[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            partes.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(partes)
+        params = {
+            "clave": clave,
+            "sujeto": _sujeto(conexion),
+            "metodo": scope["method"],
+            "ruta": ruta,
+            "huella": hashlib.sha256(body).hexdigest(),
+        }
+
+        try:
+            reservada, existente = await run_in_threadpool(self._reservar, engine, params)
+        except Exception as e:
+            # Sin la tabla (migración pendiente) o sin BD la petición sigue sin protección
+            logger.warning("Idempotency-Key no disponible, se ejecuta la petición sin guardarla: %s", e)
+            reservada, existente = False, None
+
+        if not reservada and existente is not None:
+            await self._responder_existente(send, params, existente)
+            return
+
+        entregado = False
+
+        async def receive_con_body() -> Message:
+            nonlocal entregado
+            if not entregado:
+                entregado = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        if not reservada:
+            await self.app(scope, receive_con_body, send)
+            return
+
+        inicio: Optional[Message] = None
+        cuerpo: List[bytes] = []
+        tamano = 0
+
+        async def send_capturando(message: Message):
+            nonlocal inicio, tamano
+            if message["type"] == "http.response.start":
+                inicio = message
+            elif message["type"] == "http.response.body" and tamano <= IDEMPOTENCY_MAX_BYTES:
+                fragmento = message.get("body", b"")
+                tamano += len(fragmento)
+                cuerpo.append(fragmento)
+            await send(message)
+
+        liberar = True
+        try:
+            await self.app(scope, receive_con_body, send_capturando)
+            if inicio is not None and _se_guarda(inicio["status"]):
+                # La operación ya se aplicó: desde aquí la clave no se libera aunque no se pueda guardar
+                liberar = False
+                if tamano <= IDEMPOTENCY_MAX_BYTES:
+                    headers = [
+                        [nombre.decode("latin-1"), valor.decode("latin-1")]
+                        for nombre, valor in inicio.get("headers", [])
+                        if nombre.decode("latin-1").lower() not in _HEADERS_EXCLUIDOS
+                    ]
+                    body_guardado = b"".join(cuerpo)
+                else:
+                    headers, body_guardado = _HEADERS_CUERPO_OMITIDO, _CUERPO_OMITIDO
+                await run_in_threadpool(self._guardar, engine, params, inicio["status"], headers, body_guardado)
+        finally:
+            if liberar:
+                await run_in_threadpool(self._liberar, engine, params)
+
+    def _reservar(self, engine, params: dict):
+        """(True, None) si esta petición tomó la clave; (False, fila) si ya existía."""
+        with engine.begin() as conn:
+            if conn.execute(_SQL_RESERVAR, {**params, "bloqueo": IDEMPOTENCY_LOCK_SECONDS}).first():
+                self._limpiar_vencidas(conn)
+                return True, None
+            fila = conn.execute(_SQL_EXISTENTE, params).mappings().first()
+        if fila is None:
+            # Se borró entre las dos sentencias (limpieza o liberación): se reintenta una vez
+            with engine.begin() as conn:
+                if conn.execute(_SQL_RESERVAR, {**params, "bloqueo": IDEMPOTENCY_LOCK_SECONDS}).first():
+                    return True, None
+                fila = conn.execute(_SQL_EXISTENTE, params).mappings().first()
+        return False, dict(fila) if fila else None
+
+    def _limpiar_vencidas(self, conn):
+        ahora = time.monotonic()
+        if ahora - self._ultima_limpieza < _INTERVALO_LIMPIEZA:
+            return
+        self._ultima_limpieza = ahora
+        conn.execute(_SQL_LIMPIAR)
+
+    def _guardar(self, engine, params: dict, status_code: int, headers: list, body: bytes) -> bool:
+        try:
+            with engine.begin() as conn:
+                conn.execute(_SQL_GUARDAR, {
+                    **params,
+                    "status_code": status_code,
+                    "headers": json.dumps(headers),
+                    "body": body,
+                    "ttl": IDEMPOTENCY_TTL_SECONDS,
+                })
+            return True
+        except Exception as e:
+            # La reserva EN_CURSO se mantiene hasta IDEMPOTENCY_LOCK_SECONDS (los reintentos reciben 409)
+            logger.warning("No se pudo guardar la respuesta de la Idempotency-Key %s: %s", params["clave"], e)
+            return False
+
+    def _liberar(self, engine, params: dict):
+        try:
+            with engine.begin() as conn:
+                conn.execute(_SQL_LIBERAR, params)
+        except Exception as e:
+            # La reserva vence sola después de IDEMPOTENCY_LOCK_SECONDS
+            logger.warning("No se pudo liberar la Idempotency-Key %s: %s", params["clave"], e)
+
+    async def _responder_existente(self, send: Send, params: dict, existente: dict):
+        if existente["huella"] != params["huella"]:
+            await _respuesta_json(send, 422, {
+                "detail": "La Idempotency-Key ya se usó con otro contenido. Genere una clave nueva para esta operación."
+            })
+            return
+        if existente["estado"] != "COMPLETA":
+            await _respuesta_json(
+                send, 409,
+                {"detail": "Una petición con esta Idempotency-Key todavía está en curso. Intente de nuevo en unos segundos."},
+                ((b"retry-after", b"1"),),
+            )
+            return
+        body = bytes(existente["body"] or b"")
+        headers = [(nombre.encode("latin-1"), valor.encode("latin-1")) for nombre, valor in existente["headers"] or []]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": existente["status_code"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
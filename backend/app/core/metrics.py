@@ -0,0 +1,315 @@
+"""
+Métricas en proceso con formato de texto Prometheus (expuestas en /health/metrics).
+
+- Contadores e histogramas en memoria, protegidos con un lock (costo de microsegundos por
+  petición, sin dependencias externas).
+- Las rutas se etiquetan con su plantilla (/registros/{registro_id}), no con la URL real,
+  para que la cantidad de series no crezca con los IDs.
+- Con varios workers (uvicorn --workers / gunicorn) cada proceso tiene su propia memoria:
+  si METRICS_DIR está configurado, cada worker escribe periódicamente una instantánea
+  <pid>.json en ese directorio y el endpoint suma las de todos los procesos al responder.
+  El directorio debe vaciarse al arrancar el contenedor (los contadores empiezan de cero).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import METRICS_DIR, METRICS_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Límites de los buckets en segundos (peticiones HTTP y generación de QR/PDF)
+BUCKETS_LATENCIA: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Registro:
+    """Almacén de todas las métricas del proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # nombre -> (tipo, ayuda)
+        self.descripciones: Dict[str, Tuple[str, str]] = {}
+        self.contadores: Dict[str, Dict[_Labels, float]] = {}
+        # nombre -> labels -> [conteos por bucket..., +Inf, suma]
+        self.histogramas: Dict[str, Dict[_Labels, List[float]]] = {}
+        self.buckets: Dict[str, Tuple[float, ...]] = {}
+
+    def describir(self, nombre: str, tipo: str, ayuda: str, buckets: Tuple[float, ...] = ()):
+        self.descripciones[nombre] = (tipo, ayuda)
+        if tipo == "counter":
+            self.contadores.setdefault(nombre, {})
+        elif tipo == "histogram":
+            self.histogramas.setdefault(nombre, {})
+            self.buckets[nombre] = buckets
+
+    def incrementar(self, nombre: str, labels: _Labels, valor: float = 1.0):
+        with self._lock:
+            serie = self.contadores[nombre]
+            serie[labels] = serie.get(labels, 0.0) + valor
+
+    def observar(self, nombre: str, labels: _Labels, valor: float):
+        buckets = self.buckets[nombre]
+        indice = bisect_left(buckets, valor)
+        with self._lock:
+            serie = self.histogramas[nombre]
+            datos = serie.get(labels)
+            if datos is None:
+                datos = serie[labels] = [0.0] * (len(buckets) + 2)
+            # Se guarda el conteo por bucket (no acumulado); se acumula al exportar
+            datos[indice] += 1
+            datos[-1] += valor
+
+    def instantanea(self) -> Dict:
+        """Copia serializable (JSON) de los contadores e histogramas del proceso."""
+        with self._lock:
+            return {
+                "contadores": {
+                    nombre: [[list(map(list, labels)), valor] for labels, valor in serie.items()]
+                    for nombre, serie in self.contadores.items()
+                },
+                "histogramas": {
+                    nombre: [[list(map(list, labels)), list(datos)] for labels, datos in serie.items()]
+                    for nombre, serie in self.histogramas.items()
+                },
+            }
+
+
+REGISTRO = _Registro()
+
+REGISTRO.describir("http_requests_total", "counter", "Peticiones HTTP por método, ruta y código de estado")
+REGISTRO.describir(
+    "http_request_duration_seconds", "histogram",
+    "Latencia de las peticiones HTTP por método y ruta", BUCKETS_LATENCIA,
+)
+REGISTRO.describir("emails_enviados_total", "counter", "Correos procesados por tipo y estado final")
+REGISTRO.describir(
+    "generacion_duration_seconds", "histogram",
+    "Tiempo de generación de QR y PDF por tipo", BUCKETS_LATENCIA,
+)
+
+
+def _labels(**valores: str) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in valores.items()))
+
+
+# Registrar un correo procesado (tipo: REPORTE CONTROL, ACTUALIZACION; estado: ENVIADO, ERROR)
+def registrar_email(tipo: str, estado: str):
+    REGISTRO.incrementar("emails_enviados_total", _labels(tipo=tipo, estado=estado))
+
+
+# Medir el tiempo de un bloque de generación (qr_email, qr_pdf, pdf_ingreso)
+@contextmanager
+def medir_generacion(tipo: str) -> Iterator[None]:
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRO.observar("generacion_duration_seconds", _labels(tipo=tipo), time.perf_counter() - inicio)
+
+
+class MetricsMiddleware:
+    """Cuenta y mide cada petición HTTP, etiquetada con la plantilla de la ruta."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status_code = 500
+
+        async def send_con_estado(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_estado)
+        finally:
+            duracion = time.perf_counter() - inicio
+            # El router deja la ruta encontrada en el scope; sin ruta se agrupa todo en una serie
+            route = scope.get("route")
+            ruta = getattr(route, "path", None) or "sin_ruta"
+            metodo = scope.get("method", "")
+            REGISTRO.incrementar(
+                "http_requests_total",
+                _labels(method=metodo, route=ruta, status=status_code),
+            )
+            REGISTRO.observar(
+                "http_request_duration_seconds",
+                _labels(method=metodo, route=ruta),
+                duracion,
+            )
+
+
+# --- Varios workers: instantáneas por proceso en METRICS_DIR ---
+
+_flush_thread: Optional[threading.Thread] = None
+
+
+def _path_instantanea(pid: int) -> Path:
+    return Path(METRICS_DIR) / f"{pid}.json"
+
+
+def escribir_instantanea():
+    """Escribe la instantánea del proceso de forma atómica (archivo temporal + rename)."""
+    if not METRICS_DIR:
+        return
+    destino = _path_instantanea(os.getpid())
+    temporal = destino.with_suffix(".tmp")
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporal.write_text(json.dumps(REGISTRO.instantanea()), encoding="utf-8")
+        os.replace(temporal, destino)
+    except OSError as e:
+        logger.warning("No se pudo escribir la instantánea de métricas: %s", e)
+
+
+def iniciar_flush_periodico():
+    """Arranca (una vez por proceso) el hilo que escribe la instantánea cada METRICS_FLUSH_SECONDS."""
+    global _flush_thread
+    if not METRICS_DIR or (_flush_thread is not None and _flush_thread.is_alive()):
+        return
+
+    def _loop():
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            escribir_instantanea()
+
+    _flush_thread = threading.Thread(target=_loop, name="metrics-flush", daemon=True)
+    _flush_thread.start()
+
+
+def _instantaneas() -> List[Dict]:
+    """Instantánea propia (en vivo) más las de los otros workers leídas de METRICS_DIR."""
+    propias = REGISTRO.instantanea()
+    if not METRICS_DIR:
+        return [propias]
+    escribir_instantanea()
+    resultado = [propias]
+    for path in Path(METRICS_DIR).glob("*.json"):
+        if path.stem == str(os.getpid()):
+            continue
+        try:
+            resultado.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            # Archivo a medio escribir o borrado entre el glob y la lectura
+            continue
+    return resultado
+
+
+def _combinar(instantaneas: List[Dict]) -> Tuple[Dict[str, Dict[_Labels, float]], Dict[str, Dict[_Labels, List[float]]]]:
+    contadores: Dict[str, Dict[_Labels, float]] = {}
+    histogramas: Dict[str, Dict[_Labels, List[float]]] = {}
+    for inst in instantaneas:
+        for nombre, series in inst.get("contadores", {}).items():
+            destino = contadores.setdefault(nombre, {})
+            for labels, valor in series:
+                clave = tuple(map(tuple, labels))
+                destino[clave] = destino.get(clave, 0.0) + valor
+        for nombre, series in inst.get("histogramas", {}).items():
+            destino = histogramas.setdefault(nombre, {})
+            for labels, datos in series:
+                clave = tuple(map(tuple, labels))
+                if clave in destino:
+                    destino[clave] = [a + b for a, b in zip(destino[clave], datos)]
+                else:
+                    destino[clave] = list(datos)
+    return contadores, histogramas
+
+
+# --- Formato de texto Prometheus ---
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_labels(labels: _Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pares = list(labels) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(valor)
+
+
+def _gauges_pool() -> List[Tuple[str, str, List[Tuple[Tuple[Tuple[str, str], ...], float]]]]:
+    """Estado de los pools de conexiones de este proceso: (nombre, ayuda, [(labels, valor)])."""
+    from app.core.database import engine, read_engine
+    pools = [("primario", engine)]
+    if read_engine is not None and read_engine is not engine:
+        pools.append(("replica", read_engine))
+    gauges = {
+        "db_pool_size": ("Tamaño configurado del pool", []),
+        "db_pool_checked_out": ("Conexiones en uso", []),
+        "db_pool_checked_in": ("Conexiones libres en el pool", []),
+        "db_pool_overflow": ("Conexiones abiertas por encima del tamaño del pool", []),
+    }
+    for nombre_pool, motor in pools:
+        if not motor:
+            continue
+        pool = motor.pool
+        labels = (("pool", nombre_pool),)
+        try:
+            valores = {
+                "db_pool_size": pool.size(),
+                "db_pool_checked_out": pool.checkedout(),
+                "db_pool_checked_in": pool.checkedin(),
+                "db_pool_overflow": max(pool.overflow(), 0),
+            }
+        except AttributeError:
+            # Pools sin estas estadísticas (NullPool, StaticPool)
+            continue
+        for nombre, valor in valores.items():
+            gauges[nombre][1].append((labels, valor))
+    return [(nombre, ayuda, muestras) for nombre, (ayuda, muestras) in gauges.items() if muestras]
+
+
+def render_metrics() -> str:
+    """Texto en formato de exposición Prometheus (text/plain; version=0.0.4)."""
+    contadores, histogramas = _combinar(_instantaneas())
+    lineas: List[str] = []
+
+    for nombre, (tipo, ayuda) in REGISTRO.descripciones.items():
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        if tipo == "counter":
+            for labels, valor in sorted(contadores.get(nombre, {}).items()):
+                lineas.append(f"{nombre}{_formatear_labels(labels)} {_numero(valor)}")
+        elif tipo == "histogram":
+            buckets = REGISTRO.buckets[nombre]
+            for labels, datos in sorted(histogramas.get(nombre, {}).items()):
+                acumulado = 0.0
+                for limite, conteo in zip(buckets, datos):
+                    acumulado += conteo
+                    lineas.append(f"{nombre}_bucket{_formatear_labels(labels, (('le', repr(limite)),))} {_numero(acumulado)}")
+                acumulado += datos[len(buckets)]
+                lineas.append(f"{nombre}_bucket{_formatear_labels(labels, (('le', '+Inf'),))} {_numero(acumulado)}")
+                lineas.append(f"{nombre}_sum{_formatear_labels(labels)} {datos[-1]!r}")
+                lineas.append(f"{nombre}_count{_formatear_labels(labels)} {_numero(acumulado)}")
+
+    # Los gauges del pool son del proceso que responde (cada worker tiene su propio pool)
+    pid = (("pid", str(os.getpid())),)
+    for nombre, ayuda, muestras in _gauges_pool():
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} gauge")
+        for labels, valor in muestras:
+            lineas.append(f"{nombre}{_formatear_labels(labels, pid)} {_numero(valor)}")
+
+    return "\n".join(lineas) + "\n"
@@ -0,0 +1,206 @@
+"""
+Migraciones versionadas del esquema de base de datos.
+
+Cada archivo en backend/migrations/ se llama NNNN_descripcion.sql y se aplica una sola vez,
+en orden, dentro de su propia transacción. Las versiones aplicadas quedan registradas en la
+tabla schema_migrations.
+
+Uso (desde la carpeta backend):
+  python -m app.core.migrations status     # muestra versión actual y pendientes
+  python -m app.core.migrations upgrade    # aplica las migraciones pendientes
+  python -m app.core.migrations upgrade --hasta 3
+"""
+import argparse
+import hashlib
+import logging
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional, Dict, Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent.parent / "migrations"
+
+# Clave fija para pg_advisory_xact_lock: evita que dos procesos migren a la vez
+_ADVISORY_LOCK_ID = 7026026
+
+# Mensaje para los endpoints cuando falta una columna/tabla por migraciones sin aplicar
+MENSAJE_MIGRACION_PENDIENTE = (
+    "El esquema de la base de datos está desactualizado. "
+    "Ejecuta las migraciones desde la carpeta backend: python -m app.core.migrations upgrade"
+)
+
+_PATRON_ARCHIVO = re.compile(r"^(\d{4})_([\w\-]+)\.sql$")
+
+_status_cache: Optional[Dict[str, Any]] = None
+_status_lock = threading.Lock()
+
+
+def listar_migraciones() -> List[Dict[str, Any]]:
+    """Lista las migraciones disponibles en disco ordenadas por versión."""
+    migraciones = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = _PATRON_ARCHIVO.match(path.name)
+        if not match:
+            logger.warning("Archivo de migración ignorado (nombre inválido): %s", path.name)
+            continue
+        migraciones.append({
+            "version": int(match.group(1)),
+            "nombre": match.group(2),
+            "path": path,
+        })
+    return migraciones
+
+
+def _checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _crear_tabla_schema_migrations(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS public.schema_migrations ("
+        " version integer PRIMARY KEY,"
+        " nombre varchar(255) NOT NULL,"
+        " checksum varchar(64) NOT NULL,"
+        " applied_at timestamptz DEFAULT now() NOT NULL"
+        ")"
+    ))
+
+
+def _versiones_aplicadas(conn) -> Dict[int, str]:
+    rows = conn.execute(text("SELECT version, checksum FROM public.schema_migrations")).all()
+    return {row.version: row.checksum for row in rows}
+
+
+def aplicar_migraciones(engine, hasta: Optional[int] = None) -> List[int]:
+    """
+    Aplica en orden las migraciones pendientes (hasta la versión indicada, si se da).
+    Retorna la lista de versiones aplicadas.
+    """
+    with engine.begin() as conn:
+        _crear_tabla_schema_migrations(conn)
+
+    aplicadas = []
+    for migracion in listar_migraciones():
+        version = migracion["version"]
+        if hasta is not None and version > hasta:
+            break
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _ADVISORY_LOCK_ID})
+            # Los backfills pueden tardar más que DB_STATEMENT_TIMEOUT_MS
+            conn.execute(text("SET LOCAL statement_timeout = 0"))
+            # Revisar dentro del lock: otro proceso pudo aplicarla mientras esperábamos
+            if version in _versiones_aplicadas(conn):
+                continue
+            logger.info("Aplicando migración %04d_%s", version, migracion["nombre"])
+            conn.exec_driver_sql(migracion["path"].read_text(encoding="utf-8"))
+            conn.execute(
+                text(
+                    "INSERT INTO public.schema_migrations (version, nombre, checksum) "
+                    "VALUES (:version, :nombre, :checksum)"
+                ),
+                {
+                    "version": version,
+                    "nombre": migracion["nombre"],
+                    "checksum": _checksum(migracion["path"]),
+                },
+            )
+        aplicadas.append(version)
+
+    invalidar_schema_status()
+    return aplicadas
+
+
+def _version_actual(engine) -> int:
+    """Una sola consulta: versión más alta aplicada (0 si la tabla aún no existe)."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT COALESCE(MAX(version), 0) FROM public.schema_migrations")
+            ).scalar_one()
+    except ProgrammingError:
+        return 0
+
+
+def get_schema_status(engine=None, force: bool = False) -> Dict[str, Any]:
+    """
+    Estado del esquema comparado con las migraciones en disco.
+    El resultado se cachea en el proceso; usar force=True para volver a consultar.
+    """
+    global _status_cache
+    if _status_cache is not None and not force:
+        return _status_cache
+
+    with _status_lock:
+        if _status_cache is not None and not force:
+            return _status_cache
+        if engine is None:
+            from app.core.database import engine
+        version_esperada = max((m["version"] for m in listar_migraciones()), default=0)
+        version_actual = _version_actual(engine) if engine else 0
+        _status_cache = {
+            "version_actual": version_actual,
+            "version_esperada": version_esperada,
+            "al_dia": version_actual >= version_esperada,
+        }
+        return _status_cache
+
+
+def invalidar_schema_status():
+    global _status_cache
+    _status_cache = None
+
+
+def _cmd_status(engine) -> int:
+    with engine.begin() as conn:
+        _crear_tabla_schema_migrations(conn)
+        aplicadas = _versiones_aplicadas(conn)
+    for migracion in listar_migraciones():
+        version = migracion["version"]
+        nombre = f"{version:04d}_{migracion['nombre']}"
+        if version not in aplicadas:
+            print(f"  [pendiente] {nombre}")
+        elif aplicadas[version] != _checksum(migracion["path"]):
+            print(f"  [modificada] {nombre} (el archivo cambió después de aplicarse)")
+        else:
+            print(f"  [aplicada]  {nombre}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Migraciones del esquema de base de datos")
+    sub = parser.add_subparsers(dest="comando")
+    sub.add_parser("status", help="Muestra las migraciones aplicadas y pendientes")
+    upgrade = sub.add_parser("upgrade", help="Aplica las migraciones pendientes")
+    upgrade.add_argument("--hasta", type=int, default=None, help="Versión máxima a aplicar")
+    args = parser.parse_args(argv)
+
+    from app.core.database import engine
+
+    if not engine:
+        print("ERROR: No se pudo conectar a la base de datos. Revisa las variables de entorno.")
+        return 1
+
+    if args.comando == "status":
+        return _cmd_status(engine)
+
+    try:
+        aplicadas = aplicar_migraciones(engine, hasta=getattr(args, "hasta", None))
+    except Exception as e:
+        print(f"ERROR al ejecutar las migraciones: {e}")
+        return 1
+    if aplicadas:
+        print("Migraciones aplicadas: " + ", ".join(f"{v:04d}" for v in aplicadas))
+    else:
+        print("El esquema ya está al día.")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Listener de notificaciones de cambios (PostgreSQL LISTEN/NOTIFY) por worker.
+
+Los triggers de la migración 0009 hacen pg_notify('comerciovip_cambios', ...) al escribir en
+asambleas o asamblea_registros. Cada worker mantiene una conexión dedicada escuchando ese canal
+en un hilo y pasa cada payload a los suscriptores (por defecto, la caché en memoria).
+
+Si la conexión se pierde, la caché se deshabilita (pudieron perderse notificaciones) hasta
+reconectar; al reconectar se vacía y se vuelve a habilitar.
+"""
+import json
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.cache import cache_asambleas, invalidar_por_notificacion
+
+logger = logging.getLogger(__name__)
+
+CANAL = "comerciovip_cambios"
+
+# Segundos entre reintentos de conexión (crece hasta el máximo)
+_ESPERA_INICIAL = 1.0
+_ESPERA_MAXIMA = 30.0
+
+_suscriptores: List[Callable[[Dict[str, Any]], None]] = [invalidar_por_notificacion]
+_hilo: Optional[threading.Thread] = None
+_detener = threading.Event()
+
+
+def suscribir(callback: Callable[[Dict[str, Any]], None]):
+    """Registra una función que recibe el payload (dict) de cada notificación."""
+    _suscriptores.append(callback)
+
+
+def _despachar(payload_texto: str):
+    try:
+        payload = json.loads(payload_texto)
+    except ValueError:
+        logger.warning("Notificación con payload inválido: %s", payload_texto[:200])
+        return
+    for callback in _suscriptores:
+        try:
+            callback(payload)
+        except Exception:
+            logger.exception("Error procesando notificación de cambios")
+
+
+def _escuchar(engine):
+    espera = _ESPERA_INICIAL
+    while not _detener.is_set():
+        conexion = None
+        try:
+            # Conexión fuera del pool: queda ocupada mientras el worker viva
+            conexion = engine.raw_connection()
+            # La conexión del driver se toma antes de detach (después ya no está asociada al registro del pool)
+            dbapi = conexion.driver_connection
+            conexion.detach()
+            dbapi.autocommit = True
+            with dbapi.cursor() as cursor:
+                cursor.execute(f"LISTEN {CANAL}")
+            cache_asambleas.habilitar(True)
+            logger.info("Escuchando notificaciones de cambios en el canal %s", CANAL)
+            espera = _ESPERA_INICIAL
+
+            while not _detener.is_set():
+                # Despierta cada 5 s para poder detenerse y detectar conexiones muertas
+                if select.select([dbapi], [], [], 5.0) == ([], [], []):
+                    continue
+                dbapi.poll()
+                while dbapi.notifies:
+                    _despachar(dbapi.notifies.pop(0).payload)
+        except Exception as e:
+            logger.warning("Listener de notificaciones desconectado: %s. Reintentando en %.0f s", e, espera)
+        finally:
+            cache_asambleas.habilitar(False)
+            if conexion is not None:
+                try:
+                    conexion.close()
+                except Exception:
+                    pass
+        _detener.wait(espera)
+        espera = min(espera * 2, _ESPERA_MAXIMA)
+
+
+def iniciar_listener(engine):
+    """Arranca el hilo del listener (una vez por proceso)."""
+    global _hilo
+    if engine is None or (_hilo is not None and _hilo.is_alive()):
+        return
+    _detener.clear()
+    _hilo = threading.Thread(target=_escuchar, args=(engine,), name="notificaciones-cambios", daemon=True)
+    _hilo.start()
+
+
+def detener_listener():
+    _detener.set()
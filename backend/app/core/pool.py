@@ -0,0 +1,182 @@
+"""
+Instrumentación de los pools de conexiones (primario y réplica).
+
+- QueuePoolInstrumentado mide cuánto espera cada checkout por una conexión libre y cuenta
+  los timeouts (pool agotado más de DB_POOL_TIMEOUT) y los checkouts en overflow.
+- Los eventos connect / invalidate / soft_invalidate del pool cuentan las conexiones abiertas
+  y las descartadas (pre-ping fallido, error de red, reciclaje).
+- Todo se acumula en EstadisticasPool (resumen para /health/db) y en las métricas
+  db_pool_* de /health/metrics, con la etiqueta pool="primario|replica".
+- calentar_pool abre al iniciar el proceso las primeras conexiones: la primera petición no
+  paga el handshake TCP/TLS + autenticación.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import REGISTRO, _labels
+
+logger = logging.getLogger(__name__)
+
+# Buckets de la espera por conexión: casi siempre 0, los valores altos indican pool saturado
+BUCKETS_ESPERA: tuple = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+REGISTRO.describir(
+    "db_pool_checkout_wait_seconds", "histogram",
+    "Espera por una conexión libre del pool en cada checkout", BUCKETS_ESPERA,
+)
+REGISTRO.describir("db_pool_timeouts_total", "counter", "Checkouts que agotaron DB_POOL_TIMEOUT sin conexión libre")
+REGISTRO.describir("db_pool_overflow_checkouts_total", "counter", "Checkouts servidos con conexiones de overflow")
+REGISTRO.describir("db_pool_connections_opened_total", "counter", "Conexiones nuevas abiertas hacia PostgreSQL")
+REGISTRO.describir("db_pool_invalidations_total", "counter", "Conexiones invalidadas por tipo (hard, soft)")
+
+# Marca por hilo de la llamada a _do_get que se está midiendo
+_midiendo = threading.local()
+
+
+class EstadisticasPool:
+    """Contadores de un pool desde que arrancó el proceso."""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self._labels = _labels(pool=nombre)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.conexiones_abiertas = 0
+        self.invalidaciones = 0
+
+    def registrar_checkout(self, espera: float, en_overflow: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += espera
+            if espera > self.espera_maxima:
+                self.espera_maxima = espera
+            if en_overflow:
+                self.overflow_checkouts += 1
+        REGISTRO.observar("db_pool_checkout_wait_seconds", self._labels, espera)
+        if en_overflow:
+            REGISTRO.incrementar("db_pool_overflow_checkouts_total", self._labels)
+
+    def registrar_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+        REGISTRO.incrementar("db_pool_timeouts_total", self._labels)
+
+    def registrar_conexion(self):
+        with self._lock:
+            self.conexiones_abiertas += 1
+        REGISTRO.incrementar("db_pool_connections_opened_total", self._labels)
+
+    def registrar_invalidacion(self, tipo: str):
+        with self._lock:
+            self.invalidaciones += 1
+        REGISTRO.incrementar("db_pool_invalidations_total", _labels(pool=self.nombre, tipo=tipo))
+
+    def resumen(self, pool: Any) -> Dict[str, Any]:
+        """Estado actual del pool más los contadores acumulados (para /health/db)."""
+        with self._lock:
+            resultado = {
+                "checkouts": self.checkouts,
+                "espera_promedio_ms": round(self.espera_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+                "timeouts": self.timeouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "conexiones_abiertas": self.conexiones_abiertas,
+                "invalidaciones": self.invalidaciones,
+            }
+        try:
+            resultado.update({
+                "size": pool.size(),
+                "en_uso": pool.checkedout(),
+                "libres": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        except AttributeError:
+            pass
+        return resultado
+
+
+class QueuePoolInstrumentado(QueuePool):
+    """QueuePool que mide la espera de cada checkout (el pool no tiene un evento "antes de")."""
+
+    estadisticas: Optional[EstadisticasPool] = None
+
+    def _do_get(self):
+        # QueuePool._do_get se llama a sí mismo al reintentar: solo se mide la llamada externa
+        if self.estadisticas is None or getattr(_midiendo, "activo", False):
+            return super()._do_get()
+        _midiendo.activo = True
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except PoolTimeoutError:
+            self.estadisticas.registrar_timeout()
+            raise
+        finally:
+            _midiendo.activo = False
+        # La espera incluye abrir la conexión cuando el pool no tenía una libre
+        self.estadisticas.registrar_checkout(
+            time.perf_counter() - inicio,
+            en_overflow=self.checkedout() > self.size(),
+        )
+        return conexion
+
+    def recreate(self):
+        # engine.dispose() reemplaza el pool: las estadísticas siguen con el nuevo
+        nuevo = super().recreate()
+        nuevo.estadisticas = self.estadisticas
+        return nuevo
+
+
+def instrumentar_engine(engine, nombre: str) -> EstadisticasPool:
+    """Asocia un EstadisticasPool al pool del engine (creado con QueuePoolInstrumentado)."""
+    estadisticas = EstadisticasPool(nombre)
+    engine.pool.estadisticas = estadisticas
+
+    # Los eventos se registran sobre el engine: se conservan si el pool se recrea
+    @event.listens_for(engine, "connect")
+    def _al_conectar(dbapi_connection, connection_record):
+        estadisticas.registrar_conexion()
+
+    @event.listens_for(engine, "invalidate")
+    def _al_invalidar(dbapi_connection, connection_record, exception):
+        estadisticas.registrar_invalidacion("hard")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _al_invalidar_soft(dbapi_connection, connection_record, exception):
+        estadisticas.registrar_invalidacion("soft")
+
+    return estadisticas
+
+
+def calentar_pool(engine, cantidad: int) -> int:
+    """
+    Abre `cantidad` conexiones (sin pasar del tamaño del pool) y las devuelve al pool.
+    Retorna cuántas se pudieron abrir; un fallo no impide el arranque.
+    """
+    if engine is None or cantidad <= 0:
+        return 0
+    try:
+        cantidad = min(cantidad, engine.pool.size())
+    except AttributeError:
+        return 0
+    conexiones = []
+    try:
+        # Se retienen todas a la vez para que cada checkout abra una conexión distinta
+        for _ in range(cantidad):
+            conexiones.append(engine.raw_connection())
+    except Exception as e:
+        logger.warning("No se pudo calentar el pool de conexiones: %s", e)
+    finally:
+        for conexion in conexiones:
+            conexion.close()
+    return len(conexiones)
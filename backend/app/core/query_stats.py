@@ -0,0 +1,152 @@
+"""
+Conteo y tiempo de las consultas SQL de cada petición.
+
+- Eventos before/after_cursor_execute de SQLAlchemy acumulan cantidad y duración en un
+  objeto por petición (ContextVar; los endpoints síncronos corren en el threadpool con una
+  copia del contexto, que apunta al mismo objeto).
+- QueryStatsMiddleware agrega el header Server-Timing (visible en las herramientas de
+  desarrollo del navegador) y deja un warning en el log si la petición supera los umbrales
+  o repite la misma sentencia muchas veces (posible N+1).
+- assert_max_queries fija en pruebas el máximo de consultas de un bloque o endpoint.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import QUERY_WARN_COUNT, QUERY_WARN_MS, QUERY_REPEAT_WARN
+
+logger = logging.getLogger(__name__)
+
+
+class EstadisticasConsultas:
+    """Consultas ejecutadas dentro de una petición (o de un bloque assert_max_queries)."""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.duracion = 0.0
+        self.por_sentencia: Dict[str, int] = {}
+
+    def registrar(self, statement: str, duracion: float):
+        self.cantidad += 1
+        self.duracion += duracion
+        self.por_sentencia[statement] = self.por_sentencia.get(statement, 0) + 1
+
+    def repetidas(self, minimo: int) -> List[str]:
+        """Sentencias ejecutadas al menos `minimo` veces (mismo SQL con distintos parámetros)."""
+        return [s for s, n in self.por_sentencia.items() if n >= minimo]
+
+
+_estadisticas: ContextVar[Optional[EstadisticasConsultas]] = ContextVar("query_stats", default=None)
+
+# Colectores de assert_max_queries: TestClient ejecuta la app en otro hilo y no comparte el
+# contexto del test, por eso se registran aparte
+_colectores: List[EstadisticasConsultas] = []
+_colectores_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_stats_inicio", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("query_stats_inicio")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    stats = _estadisticas.get()
+    if stats is not None:
+        stats.registrar(statement, duracion)
+    if _colectores:
+        with _colectores_lock:
+            for colector in _colectores:
+                colector.registrar(statement, duracion)
+
+
+# Estadísticas de la petición actual (None fuera de una petición)
+def get_query_stats() -> Optional[EstadisticasConsultas]:
+    return _estadisticas.get()
+
+
+def _server_timing(stats: EstadisticasConsultas, total: float) -> str:
+    return (
+        f'db;dur={stats.duracion * 1000:.1f};desc="{stats.cantidad} consultas", '
+        f"app;dur={total * 1000:.1f}"
+    )
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = EstadisticasConsultas()
+        token = _estadisticas.set(stats)
+        inicio = time.perf_counter()
+
+        async def send_con_timing(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", _server_timing(stats, time.perf_counter() - inicio))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_timing)
+        finally:
+            _estadisticas.reset(token)
+            _registrar_si_excede(scope, stats)
+
+
+def _registrar_si_excede(scope: Scope, stats: EstadisticasConsultas):
+    ruta = f"{scope.get('method', '')} {scope.get('path', '')}"
+    duracion_ms = stats.duracion * 1000
+    if stats.cantidad > QUERY_WARN_COUNT or duracion_ms > QUERY_WARN_MS:
+        logger.warning(
+            "%s ejecutó %d consultas SQL en %.1f ms (umbrales: %d consultas, %d ms)",
+            ruta, stats.cantidad, duracion_ms, QUERY_WARN_COUNT, QUERY_WARN_MS,
+        )
+    for statement in stats.repetidas(QUERY_REPEAT_WARN):
+        logger.warning(
+            "Posible N+1 en %s: la misma consulta se ejecutó %d veces: %s",
+            ruta, stats.por_sentencia[statement], " ".join(statement.split())[:200],
+        )
+
+
+# Verificar en pruebas que un bloque no exceda una cantidad de consultas
+@contextmanager
+def assert_max_queries(maximo: int) -> Iterator[EstadisticasConsultas]:
+    """
+    Uso:
+        with assert_max_queries(3):
+            client.get(f"/registros/asamblea/{asamblea_id}/estadisticas/quorum")
+
+    Lanza AssertionError con las sentencias ejecutadas si se supera el máximo.
+    """
+    colector = EstadisticasConsultas()
+    with _colectores_lock:
+        _colectores.append(colector)
+    try:
+        yield colector
+    finally:
+        with _colectores_lock:
+            _colectores.remove(colector)
+    if colector.cantidad > maximo:
+        detalle = "\n".join(
+            f"  {n}x {' '.join(s.split())[:200]}" for s, n in colector.por_sentencia.items()
+        )
+        raise AssertionError(
+            f"Se ejecutaron {colector.cantidad} consultas SQL (máximo {maximo}):\n{detalle}"
+        )
@@ -0,0 +1,188 @@
+"""
+Límite de peticiones (token bucket) para las rutas públicas de /update-users.
+
+- Un bucket por IP (todas las rutas públicas), uno por asamblea (ingreso por torre/apartamento)
+  y uno de ingresos fallidos por IP: quien prueba combinaciones de torre/apartamento agota
+  ese bucket y queda bloqueado aunque no supere el límite general.
+- Cada bucket se recarga a una tasa fija (por minuto) hasta su capacidad (ráfaga). Una
+  petición sin token disponible recibe 429 con Retry-After antes de tocar la base de datos.
+- El estado vive en memoria del worker (dict con límite de claves, costo de microsegundos).
+  Con RATE_LIMIT_COMPARTIDO los buckets por IP y por asamblea se comparten entre workers e
+  instancias en la tabla rate_limit_buckets (migración 0016) con un solo UPSERT por bucket;
+  el bucket en memoria se sigue consultando primero, así el exceso más grosero se rechaza sin
+  ir a la base. El de ingresos fallidos es siempre por worker (consultarlo en la base costaría
+  una consulta en cada petición pública).
+- Detrás de un proxy hay que declarar RATE_LIMIT_PROXIES: sin eso todas las peticiones llegan con
+  la IP del proxy y el conjunto se trataría como un solo cliente. X-Forwarded-For lo escribe el
+  cliente, así que con RATE_LIMIT_PROXIES=0 se ignora (se avisa una vez en los logs) y el límite
+  sigue siendo por la IP de la conexión.
+- Decisiones contadas en la métrica rate_limit_decisiones_total (límite y resultado).
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import text
+
+from app.core.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_IP_POR_MINUTO, RATE_LIMIT_IP_RAFAGA,
+    RATE_LIMIT_ASAMBLEA_POR_MINUTO, RATE_LIMIT_ASAMBLEA_RAFAGA,
+    RATE_LIMIT_FALLOS_POR_MINUTO, RATE_LIMIT_FALLOS_RAFAGA,
+    RATE_LIMIT_COMPARTIDO, RATE_LIMIT_PROXIES,
+)
+from app.core.metrics import REGISTRO, _labels
+
+logger = logging.getLogger(__name__)
+
+REGISTRO.describir("rate_limit_decisiones_total", "counter", "Decisiones del limitador de rutas públicas por límite y resultado")
+
+# Claves por bucket en memoria (se descartan las menos usadas; una clave olvidada empieza llena)
+MAX_CLAVES = 50000
+
+# Segundos entre limpiezas de buckets compartidos sin uso (por worker)
+_INTERVALO_LIMPIEZA = 600.0
+
+_SQL_CONSUMIR = text("""
+    INSERT INTO public.rate_limit_buckets AS b (clave, tokens, actualizado)
+    VALUES (:clave, :capacidad - 1, now())
+    ON CONFLICT (clave) DO UPDATE SET
+        tokens = LEAST(:capacidad, b.tokens + EXTRACT(EPOCH FROM now() - b.actualizado) * :tasa) - 1,
+        actualizado = now()
+    WHERE LEAST(:capacidad, b.tokens + EXTRACT(EPOCH FROM now() - b.actualizado) * :tasa) >= 1
+    RETURNING b.tokens
+""")
+
+# Una fila sin uso por una hora ya está llena: borrarla no cambia ninguna decisión
+_SQL_LIMPIAR = text("DELETE FROM public.rate_limit_buckets WHERE actualizado < now() - interval '1 hour'")
+
+
+class TokenBucket:
+    """Buckets en memoria por clave con recarga continua."""
+
+    def __init__(self, nombre: str, por_minuto: int, rafaga: int):
+        self.nombre = nombre
+        self.tasa = por_minuto / 60.0
+        self.capacidad = float(rafaga)
+        self._lock = threading.Lock()
+        # clave -> (tokens, instante de la última actualización)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _disponibles(self, clave: str, ahora: float) -> float:
+        tokens, instante = self._buckets.get(clave, (self.capacidad, ahora))
+        return min(self.capacidad, tokens + (ahora - instante) * self.tasa)
+
+    def consumir(self, clave: str, costo: float = 1.0) -> float:
+        """Consume `costo` tokens. Retorna 0 si se permitió o los segundos a esperar si no."""
+        ahora = time.monotonic()
+        with self._lock:
+            tokens = self._disponibles(clave, ahora)
+            if tokens < costo:
+                return (costo - tokens) / self.tasa
+            self._buckets[clave] = (tokens - costo, ahora)
+            self._buckets.move_to_end(clave)
+            while len(self._buckets) > MAX_CLAVES:
+                self._buckets.popitem(last=False)
+        return 0.0
+
+    def espera(self, clave: str) -> float:
+        """Segundos hasta que haya un token (0 si hay), sin consumir."""
+        with self._lock:
+            tokens = self._disponibles(clave, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.tasa
+
+
+limite_ip = TokenBucket("ip", RATE_LIMIT_IP_POR_MINUTO, RATE_LIMIT_IP_RAFAGA)
+limite_asamblea = TokenBucket("asamblea", RATE_LIMIT_ASAMBLEA_POR_MINUTO, RATE_LIMIT_ASAMBLEA_RAFAGA)
+limite_fallos = TokenBucket("fallos", RATE_LIMIT_FALLOS_POR_MINUTO, RATE_LIMIT_FALLOS_RAFAGA)
+
+_ultima_limpieza = 0.0
+_aviso_proxy_emitido = False
+
+
+def _consumir_compartido(bucket: TokenBucket, clave: str) -> float:
+    """Consume un token del bucket compartido en PostgreSQL (0 = permitido)."""
+    global _ultima_limpieza
+    from app.core.database import engine
+    if engine is None:
+        return 0.0
+    try:
+        with engine.begin() as conn:
+            permitido = conn.execute(_SQL_CONSUMIR, {
+                "clave": f"{bucket.nombre}:{clave}",
+                "capacidad": bucket.capacidad,
+                "tasa": bucket.tasa,
+            }).first() is not None
+            ahora = time.monotonic()
+            if ahora - _ultima_limpieza > _INTERVALO_LIMPIEZA:
+                _ultima_limpieza = ahora
+                conn.execute(_SQL_LIMPIAR)
+    except Exception as e:
+        # Sin la tabla o sin BD se decide solo con el bucket en memoria
+        logger.warning("Rate limit compartido no disponible: %s", e)
+        return 0.0
+    return 0.0 if permitido else 1.0 / bucket.tasa
+
+
+def _rechazar(bucket: TokenBucket, espera: float):
+    REGISTRO.incrementar("rate_limit_decisiones_total", _labels(limite=bucket.nombre, resultado="rechazado"))
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Demasiadas solicitudes. Espere un momento e intente de nuevo.",
+        headers={"Retry-After": str(max(1, math.ceil(espera)))},
+    )
+
+
+def _consumir(bucket: TokenBucket, clave: str):
+    espera = bucket.consumir(clave)
+    if not espera and RATE_LIMIT_COMPARTIDO:
+        espera = _consumir_compartido(bucket, clave)
+    if espera:
+        _rechazar(bucket, espera)
+    REGISTRO.incrementar("rate_limit_decisiones_total", _labels(limite=bucket.nombre, resultado="permitido"))
+
+
+# IP del cliente: la de la conexión o, detrás de RATE_LIMIT_PROXIES proxies, la que agregó el primero
+def ip_cliente(request: Request) -> str:
+    global _aviso_proxy_emitido
+    reenviadas = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+    if RATE_LIMIT_PROXIES:
+        if len(reenviadas) >= RATE_LIMIT_PROXIES:
+            return reenviadas[-RATE_LIMIT_PROXIES]
+    elif reenviadas and not _aviso_proxy_emitido:
+        _aviso_proxy_emitido = True
+        logger.warning(
+            "Petición con X-Forwarded-For y RATE_LIMIT_PROXIES=0: se limita por la IP de la conexión. "
+            "Detrás de un proxy configure RATE_LIMIT_PROXIES con la cantidad de proxies delante de la API."
+        )
+    return request.client.host if request.client else "desconocida"
+
+
+# Dependencia de las rutas públicas: límite por IP y bloqueo por ingresos fallidos
+def limitar_por_ip(request: Request):
+    if not RATE_LIMIT_ENABLED:
+        return
+    ip = ip_cliente(request)
+    espera = limite_fallos.espera(ip)
+    if espera:
+        _rechazar(limite_fallos, espera)
+    _consumir(limite_ip, ip)
+
+
+# Límite por asamblea (se llama con el asamblea_id del cuerpo, antes de consultar la BD)
+def limitar_por_asamblea(asamblea_id):
+    if not RATE_LIMIT_ENABLED:
+        return
+    _consumir(limite_asamblea, str(asamblea_id))
+
+
+# Registrar un ingreso fallido (torre/apartamento inexistente) de la IP del cliente
+def registrar_ingreso_fallido(request: Request):
+    if not RATE_LIMIT_ENABLED:
+        return
+    # Sin tokens no se descuenta nada: la IP ya está bloqueada hasta que el bucket se recargue
+    limite_fallos.consumir(ip_cliente(request))
@@ -0,0 +1,118 @@
+"""
+Verificador en segundo plano para las sondas de /health/ready.
+
+Un hilo por worker consulta cada HEALTH_CHECK_INTERVAL_SECONDS la versión del esquema (una
+consulta con una conexión del pool, que además prueba la conexión), el retraso de la réplica
+si está configurada y el estado de los pools, y guarda el resultado. Las sondas solo leen ese
+resultado: no tocan la base de datos por mucho que el orquestador las llame.
+
+Si el último resultado tiene más de HEALTH_MAX_AGE_SECONDS (hilo detenido o consulta
+bloqueada), el worker se reporta como no listo.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.config import HEALTH_CHECK_INTERVAL_SECONDS, HEALTH_MAX_AGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_estado: Optional[Dict[str, Any]] = None
+_verificado_en: float = 0.0
+_lock = threading.Lock()
+_hilo: Optional[threading.Thread] = None
+_detener = threading.Event()
+
+
+def estado_replica(read_engine) -> Dict[str, Any]:
+    """Conexión a la réplica y retraso de replicación (None si no es standby)."""
+    try:
+        with read_engine.connect() as conn:
+            retraso = conn.execute(text(
+                "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+            )).scalar()
+        return {"ok": True, "retraso_segundos": float(retraso) if retraso is not None else None}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+def _verificar() -> Dict[str, Any]:
+    """Una verificación completa: base de datos, esquema, réplica y pools."""
+    from app.core.database import engine, read_engine, estado_pools
+    from app.core.migrations import get_schema_status
+
+    if engine is None:
+        return {"ready": False, "db": {"ok": False, "error": "Base de datos no configurada"}}
+
+    resultado: Dict[str, Any] = {}
+    inicio = time.perf_counter()
+    try:
+        schema = get_schema_status(engine, force=True)
+        resultado["db"] = {"ok": True, "latencia_ms": round((time.perf_counter() - inicio) * 1000, 1)}
+        resultado["schema"] = schema
+    except Exception as e:
+        resultado["db"] = {"ok": False, "error": str(e)}
+
+    if read_engine is not None and read_engine is not engine:
+        resultado["replica"] = estado_replica(read_engine)
+
+    resultado["pool"] = estado_pools()
+    # La réplica y el pool se informan pero no sacan al worker de rotación: sin réplica las
+    # lecturas fallan igual en todos los workers, y un pool ocupado no se alivia quitando tráfico
+    resultado["ready"] = resultado["db"]["ok"] and resultado.get("schema", {}).get("al_dia", False)
+    return resultado
+
+
+def verificar_ahora() -> Dict[str, Any]:
+    """Ejecuta una verificación y guarda su resultado."""
+    global _estado, _verificado_en
+    try:
+        estado = _verificar()
+    except Exception as e:
+        logger.exception("Error en la verificación de salud")
+        estado = {"ready": False, "error": str(e)}
+    estado["verificado_en"] = datetime.now(timezone.utc).isoformat()
+    with _lock:
+        if _estado is not None and _estado.get("ready") and not estado["ready"]:
+            logger.warning("Worker no listo: %s", estado)
+        _estado = estado
+        _verificado_en = time.monotonic()
+    return estado
+
+
+def get_estado() -> Dict[str, Any]:
+    """Último resultado (sin I/O). ready=False si no hay resultado o está vencido."""
+    with _lock:
+        estado, verificado_en = _estado, _verificado_en
+    if estado is None:
+        return {"ready": False, "error": "Verificación inicial pendiente"}
+    antiguedad = time.monotonic() - verificado_en
+    estado = {**estado, "antiguedad_segundos": round(antiguedad, 1)}
+    if antiguedad > HEALTH_MAX_AGE_SECONDS:
+        estado["ready"] = False
+        estado["error"] = "Verificación de salud vencida"
+    return estado
+
+
+def iniciar_verificador():
+    """Arranca (una vez por proceso) el hilo que refresca el estado."""
+    global _hilo
+    if _hilo is not None and _hilo.is_alive():
+        return
+    _detener.clear()
+
+    def _loop():
+        while not _detener.is_set():
+            verificar_ahora()
+            _detener.wait(HEALTH_CHECK_INTERVAL_SECONDS)
+
+    _hilo = threading.Thread(target=_loop, name="verificador-salud", daemon=True)
+    _hilo.start()
+
+
+def detener_verificador():
+    _detener.set()
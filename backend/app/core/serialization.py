@@ -0,0 +1,50 @@
+"""
+Serialización JSON rápida para respuestas grandes.
+
+Usa orjson si está instalado (serializa UUID y datetime de forma nativa) y si no,
+cae al json de la librería estándar con el mismo resultado.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+from typing import Any
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+def _default(obj: Any):
+    # Numeric de PostgreSQL llega como Decimal (coeficiente)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        # Mismo formato que Pydantic: UTC como "Z"
+        texto = obj.isoformat()
+        return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serializa a bytes JSON (UTF-8, sin espacios)."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    Respuesta JSON que serializa directamente dicts/filas ya armados, sin pasar
+    por la validación de response_model ni por jsonable_encoder.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
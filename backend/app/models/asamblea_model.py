@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Text, TIMESTAMP, ForeignKey, Numeric, text
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, TIMESTAMP, ForeignKey, Numeric, Computed, Integer, BigInteger, Boolean, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.core.database import Base
 import uuid
 
@@ -17,6 +17,15 @@ class Asamblea(Base):
     created_by = Column(String(50), nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+    # Columna generada para búsqueda de texto completo (migración 0006); no se carga por defecto
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('spanish'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('spanish'::regconfig, coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
 
     # Relación con registros
     registros = relationship("AsambleaRegistro", back_populates="asamblea", cascade="all, delete-orphan")
@@ -40,6 +49,63 @@ class AsambleaRegistro(Base):
     token_actualizacion = Column(String(255), nullable=True, unique=True)  # único por registro, para link/QR actualizar datos
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+    # Versión para concurrencia optimista (migración 0008): el ORM la incrementa en cada UPDATE
+    # y agrega "WHERE version = <leída>"; si otra escritura ganó, el flush lanza StaleDataError
+    version = Column(Integer, server_default=text("1"), nullable=False)
+
+    __mapper_args__ = {"version_id_col": version}
 
     # Relación con asamblea
     asamblea = relationship("Asamblea", back_populates="registros")
+
+# Resumen de quorum por asamblea (migración 0010): lo mantienen triggers de la base de datos,
+# la aplicación solo lo lee
+class AsambleaQuorum(Base):
+    __tablename__ = "asamblea_quorum"
+
+    asamblea_id = Column(UUID(as_uuid=True), ForeignKey("asambleas.id", ondelete="CASCADE"), primary_key=True)
+    total_registros = Column(Integer, nullable=False, server_default=text("0"))
+    registros_presentes = Column(Integer, nullable=False, server_default=text("0"))
+    total_coeficiente = Column(Numeric, nullable=False, server_default=text("0"))
+    coeficiente_presente = Column(Numeric, nullable=False, server_default=text("0"))
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+
+# Serie de tiempo del quorum, una muestra por minuto (migración 0011; la escribe un trigger)
+class AsambleaQuorumMuestra(Base):
+    __tablename__ = "asamblea_quorum_muestras"
+
+    asamblea_id = Column(UUID(as_uuid=True), ForeignKey("asambleas.id", ondelete="CASCADE"), primary_key=True)
+    minuto = Column(TIMESTAMP(timezone=True), primary_key=True)
+    total_registros = Column(Integer, nullable=False)
+    registros_presentes = Column(Integer, nullable=False)
+    total_coeficiente = Column(Numeric, nullable=False)
+    coeficiente_presente = Column(Numeric, nullable=False)
+
+# Archivo en disco de una asamblea cerrada (migración 0012)
+class AsambleaArchivo(Base):
+    __tablename__ = "asamblea_archivos"
+
+    asamblea_id = Column(UUID(as_uuid=True), ForeignKey("asambleas.id", ondelete="CASCADE"), primary_key=True)
+    ruta = Column(Text, nullable=False)
+    formato = Column(String(30), nullable=False)
+    registros = Column(Integer, nullable=False)
+    bytes = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    # True cuando las filas se borraron de asamblea_registros y el archivo es la única copia
+    filas_eliminadas = Column(Boolean, nullable=False, server_default=text("false"))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+
+# Actividad recibida en lote desde una mesa, por clave de idempotencia (migración 0013)
+class RegistroActividadEvento(Base):
+    __tablename__ = "registro_actividad_eventos"
+
+    asamblea_id = Column(UUID(as_uuid=True), ForeignKey("asambleas.id", ondelete="CASCADE"), primary_key=True)
+    idempotency_key = Column(String(100), primary_key=True)
+    registro_id = Column(UUID(as_uuid=True), nullable=False)
+    tipo = Column(String(20), nullable=False)
+    hora = Column(String(10), nullable=False)
+    numero_control = Column(String(20), nullable=True)
+    client_timestamp = Column(TIMESTAMP(timezone=True), nullable=False)
+    actividad = Column(String(30), nullable=True)
+    version = Column(Integer, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
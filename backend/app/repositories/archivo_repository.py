@@ -0,0 +1,54 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, text
+from app.models.asamblea_model import AsambleaArchivo, AsambleaRegistro
+from app.repositories.registro_repository import get_registros_version
+from uuid import UUID
+from typing import Optional
+
+# Obtener el archivo de una asamblea (None si no está archivada)
+def get_archivo(db: Session, asamblea_id: UUID) -> Optional[AsambleaArchivo]:
+    return db.get(AsambleaArchivo, asamblea_id)
+
+# Registrar el archivo de una asamblea y, opcionalmente, borrar sus filas de asamblea_registros
+def guardar_archivo(
+    db: Session,
+    asamblea_id: UUID,
+    ruta: str,
+    manifiesto: dict,
+    eliminar_filas: bool,
+    version_exportada: Optional[str] = None,
+) -> AsambleaArchivo:
+    """
+    Todo en una transacción: si el borrado falla, tampoco queda registrado el archivo.
+    version_exportada: versión de los registros (get_registros_version) al exportar; antes de
+    borrar se bloquean las filas y si la versión cambió se lanza ValueError (nada se borra).
+    Con eliminar_filas el trigger de quorum no recalcula (comerciovip.archivando), así el
+    resumen y la serie de quorum conservan el valor final de la asamblea.
+    """
+    if eliminar_filas and version_exportada is not None:
+        db.execute(
+            select(AsambleaRegistro.id)
+            .where(AsambleaRegistro.asamblea_id == asamblea_id)
+            .with_for_update()
+        ).all()
+        if get_registros_version(db, asamblea_id) != version_exportada:
+            db.rollback()
+            raise ValueError("Los registros cambiaron mientras se archivaban; vuelve a intentarlo")
+
+    archivo = db.get(AsambleaArchivo, asamblea_id) or AsambleaArchivo(asamblea_id=asamblea_id)
+    archivo.ruta = ruta
+    archivo.formato = manifiesto["formato"]
+    archivo.registros = manifiesto["registros"]
+    archivo.bytes = manifiesto["bytes"]
+    archivo.sha256 = manifiesto["sha256"]
+    archivo.filas_eliminadas = eliminar_filas
+    db.add(archivo)
+    db.flush()
+
+    if eliminar_filas:
+        db.execute(text("SET LOCAL comerciovip.archivando = 'on'"))
+        db.execute(delete(AsambleaRegistro).where(AsambleaRegistro.asamblea_id == asamblea_id))
+
+    db.commit()
+    db.refresh(archivo)
+    return archivo
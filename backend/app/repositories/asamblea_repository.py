@@ -1,7 +1,12 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, cast, literal, select, tuple_, or_, and_
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from app.models.asamblea_model import Asamblea, AsambleaRegistro
+from app.repositories.pagination import paginar_query, encode_cursor, decode_cursor
 from uuid import UUID
 from typing import List, Optional
+from datetime import datetime, time
+import re
 
 # Crear una asamblea con sus registros
 def create_asamblea_with_registros(db: Session, asamblea_data: dict, registros_data: List[dict], created_by: str):
@@ -52,88 +57,115 @@ def create_asamblea_with_registros(db: Session, asamblea_data: dict, registros_d
 
 # Obtener una asamblea por ID
 def get_asamblea_by_id(db: Session, asamblea_id: UUID):
-    return db.query(Asamblea).filter(Asamblea.id == asamblea_id).first()
+    # db.get usa el identity map de la sesión: si la ruta y el servicio piden la misma
+    # asamblea en la misma petición, solo la primera llamada consulta la base de datos
+    return db.get(Asamblea, asamblea_id)
 
-# Obtener todas las asambleas
-def get_all_asambleas(db: Session, skip: int = 0, limit: int = 100, search: Optional[str] = None, estado: Optional[str] = None, fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None):
-    from datetime import datetime
-    
-    query = db.query(Asamblea)
-    
-    # Filtro de búsqueda por título o descripción
-    if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Asamblea.title.ilike(search_filter)) |
-            (Asamblea.description.ilike(search_filter))
-        )
+# Convertir una fecha YYYY-MM-DD del filtro a datetime (None si no es válida)
+def _parse_fecha_filtro(fecha: Optional[str], fin_de_dia: bool = False) -> Optional[datetime]:
+    if not fecha:
+        return None
+    try:
+        fecha_dt = datetime.strptime(fecha, "%Y-%m-%d")
+    except ValueError:
+        return None
+    if fin_de_dia:
+        # Agregar 23:59:59 para incluir todo el día
+        fecha_dt = datetime.combine(fecha_dt.date(), time(23, 59, 59))
+    return fecha_dt
+
+# Convertir el texto de búsqueda en un tsquery en español con coincidencia por prefijo
+def _tsquery_busqueda(search: Optional[str]):
+    """
+    "asamblea ordin" -> to_tsquery('spanish', 'asamblea:* & ordin:*').
+    Solo se usan palabras (letras y números), así el texto del usuario nunca rompe la sintaxis del tsquery.
+    Retorna None si no hay palabras para buscar.
+    """
+    palabras = re.findall(r"\w+", search or "")
+    if not palabras:
+        return None
+    return func.to_tsquery(
+        cast(literal("spanish"), REGCONFIG),
+        " & ".join(f"{palabra}:*" for palabra in palabras),
+    )
+
+# Construir las condiciones de filtro de asambleas (compartidas por listado y conteo)
+def build_asamblea_filters(search: Optional[str] = None, estado: Optional[str] = None, fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None) -> list:
+    condiciones = []
+    
+    # Búsqueda de texto completo por título o descripción (índice GIN sobre search_vector)
+    ts_query = _tsquery_busqueda(search)
+    if ts_query is not None:
+        condiciones.append(Asamblea.search_vector.op("@@")(ts_query))
     
     # Filtro por estado
     if estado:
-        query = query.filter(Asamblea.estado == estado)
-    
-    # Filtro por fecha desde
-    if fecha_desde:
-        try:
-            # El formato viene como YYYY-MM-DD, convertir a datetime
-            fecha_desde_dt = datetime.strptime(fecha_desde, "%Y-%m-%d")
-            query = query.filter(Asamblea.created_at >= fecha_desde_dt)
-        except:
-            pass
-    
-    # Filtro por fecha hasta
-    if fecha_hasta:
-        try:
-            # El formato viene como YYYY-MM-DD, convertir a datetime y agregar 23:59:59 para incluir todo el día
-            fecha_hasta_dt = datetime.strptime(fecha_hasta, "%Y-%m-%d")
-            from datetime import time
-            fecha_hasta_dt = datetime.combine(fecha_hasta_dt.date(), time(23, 59, 59))
-            query = query.filter(Asamblea.created_at <= fecha_hasta_dt)
-        except:
-            pass
-    
-    # Ordenar por fecha de creación descendente
-    query = query.order_by(Asamblea.created_at.desc())
-    
-    return query.offset(skip).limit(limit).all()
+        condiciones.append(Asamblea.estado == estado)
+    
+    # Filtro por rango de fechas de creación
+    fecha_desde_dt = _parse_fecha_filtro(fecha_desde)
+    if fecha_desde_dt:
+        condiciones.append(Asamblea.created_at >= fecha_desde_dt)
+    
+    fecha_hasta_dt = _parse_fecha_filtro(fecha_hasta, fin_de_dia=True)
+    if fecha_hasta_dt:
+        condiciones.append(Asamblea.created_at <= fecha_hasta_dt)
+    
+    return condiciones
 
-# Contar asambleas con filtros
-def count_asambleas(db: Session, search: Optional[str] = None, estado: Optional[str] = None, fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None):
-    from datetime import datetime
+# Condición keyset: filas que van después del cursor en el orden (rank DESC,) created_at DESC, id DESC
+def _condicion_despues_de_cursor(cursor: str, rank=None, ts_query=None):
+    valores = decode_cursor(cursor)
+    try:
+        created_at = datetime.fromisoformat(valores["c"])
+        ultimo_id = UUID(valores["i"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Cursor inválido")
+    
+    despues = tuple_(Asamblea.created_at, Asamblea.id) < tuple_(created_at, ultimo_id)
+    if rank is None:
+        return despues
+    
+    # Con búsqueda, el rank de la última fila se recalcula en la base de datos
+    # (evita comparar flotantes serializados en el cursor)
+    anterior = aliased(Asamblea)
+    rank_anterior = (
+        select(func.ts_rank(anterior.search_vector, ts_query))
+        .where(anterior.id == ultimo_id)
+        .scalar_subquery()
+    )
+    return or_(rank < rank_anterior, and_(rank == rank_anterior, despues))
+
+# Obtener una página de asambleas con su total en una sola consulta
+def get_asambleas_page(db: Session, skip: int = 0, limit: int = 100, search: Optional[str] = None, estado: Optional[str] = None, fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None, include_total: bool = True, cursor: Optional[str] = None):
+    """
+    Con search, los resultados se ordenan por relevancia (ts_rank) y luego por fecha.
+    Con cursor se usa paginación keyset sobre (created_at, id) en lugar de OFFSET;
+    en ese modo no se calcula el total (total=None).
+    """
+    query = db.query(Asamblea).filter(*build_asamblea_filters(search, estado, fecha_desde, fecha_hasta))
     
-    query = db.query(Asamblea)
+    ts_query = _tsquery_busqueda(search)
+    rank = func.ts_rank(Asamblea.search_vector, ts_query) if ts_query is not None else None
     
-    if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Asamblea.title.ilike(search_filter)) |
-            (Asamblea.description.ilike(search_filter))
-        )
+    # Ordenar por relevancia (si hay búsqueda) y por fecha de creación descendente
+    orden = [Asamblea.created_at.desc(), Asamblea.id.desc()]
+    if rank is not None:
+        orden.insert(0, rank.desc())
+    query = query.order_by(*orden)
     
-    if estado:
-        query = query.filter(Asamblea.estado == estado)
-    
-    # Filtro por fecha desde
-    if fecha_desde:
-        try:
-            # El formato viene como YYYY-MM-DD, convertir a datetime
-            fecha_desde_dt = datetime.strptime(fecha_desde, "%Y-%m-%d")
-            query = query.filter(Asamblea.created_at >= fecha_desde_dt)
-        except:
-            pass
-    
-    # Filtro por fecha hasta
-    if fecha_hasta:
-        try:
-            # El formato viene como YYYY-MM-DD, convertir a datetime y agregar 23:59:59 para incluir todo el día
-            fecha_hasta_dt = datetime.strptime(fecha_hasta, "%Y-%m-%d")
-            from datetime import time
-            fecha_hasta_dt = datetime.combine(fecha_hasta_dt.date(), time(23, 59, 59))
-            query = query.filter(Asamblea.created_at <= fecha_hasta_dt)
-        except:
-            pass
-    
-    return query.count()
+    if cursor:
+        query = query.filter(_condicion_despues_de_cursor(cursor, rank, ts_query))
+        pagina = paginar_query(query, skip=0, limit=limit, include_total=False)
+    else:
+        pagina = paginar_query(query, skip=skip, limit=limit, include_total=include_total)
+    
+    pagina["next_cursor"] = None
+    if pagina["has_more"] and pagina["items"]:
+        ultima = pagina["items"][-1]
+        pagina["next_cursor"] = encode_cursor({"c": ultima.created_at.isoformat(), "i": str(ultima.id)})
+    
+    return pagina
 
 # Actualizar el estado de una asamblea
 def update_asamblea_estado(db: Session, asamblea_id: UUID, nuevo_estado: str):
@@ -169,15 +201,12 @@ def update_asamblea_estado(db: Session, asamblea_id: UUID, nuevo_estado: str):
     
     # Si se activa, establecer fecha_inicio si no está establecida
     if nuevo_estado == "ACTIVA" and asamblea.fecha_inicio is None:
-        from datetime import datetime
         asamblea.fecha_inicio = datetime.utcnow()
     
     # Si se cierra, establecer fecha_final si no está establecida
     if nuevo_estado == "CERRADA" and asamblea.fecha_final is None:
-        from datetime import datetime
         asamblea.fecha_final = datetime.utcnow()
     
-    from datetime import datetime
     asamblea.updated_at = datetime.utcnow()
     
     db.commit()
@@ -0,0 +1,59 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+from typing import Dict, Any
+import base64
+import json
+
+# Paginar una consulta ORM en un solo viaje a la base de datos
+def paginar_query(query: Query, skip: int = 0, limit: int = 100, include_total: bool = True) -> Dict[str, Any]:
+    """
+    Ejecuta la consulta paginada y retorna {"items", "total", "has_more"}.
+
+    - include_total=True: agrega count(*) OVER () a la misma consulta, así el total
+      llega junto con la página (una sola consulta en lugar de lista + count).
+    - include_total=False: no calcula el total (total=None); pide limit+1 filas
+      solo para saber si hay más páginas.
+
+    La consulta debe traer una sola entidad y venir ya filtrada y ordenada.
+    """
+    if not include_total:
+        rows = query.offset(skip).limit(limit + 1).all()
+        return {
+            "items": rows[:limit],
+            "total": None,
+            "has_more": len(rows) > limit,
+        }
+
+    rows = query.add_columns(func.count().over().label("total")).offset(skip).limit(limit).all()
+    if rows:
+        total = rows[0].total
+    elif skip > 0:
+        # Página fuera de rango: la ventana no devuelve filas, contar aparte
+        total = query.order_by(None).count()
+    else:
+        total = 0
+
+    items = [row[0] for row in rows]
+    return {
+        "items": items,
+        "total": total,
+        "has_more": skip + len(items) < total,
+    }
+
+
+# Codificar un cursor de paginación (keyset) como texto opaco para el cliente
+def encode_cursor(valores: Dict[str, Any]) -> str:
+    raw = json.dumps(valores, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+# Decodificar un cursor generado por encode_cursor
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Lanza ValueError si el cursor no es válido."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(valores, dict):
+        raise ValueError("Cursor inválido")
+    return valores
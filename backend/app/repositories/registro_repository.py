@@ -1,9 +1,11 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from app.models.asamblea_model import AsambleaRegistro
+from sqlalchemy import or_, and_, func, select, update, text
+from sqlalchemy.orm.exc import StaleDataError
+from app.models.asamblea_model import Asamblea, AsambleaRegistro, AsambleaQuorum, AsambleaQuorumMuestra, RegistroActividadEvento
 from uuid import UUID
 from typing import Optional, List
 from datetime import datetime, timezone
+import json
 import re
 
 # Obtener todos los registros de una asamblea
@@ -15,6 +17,77 @@ def get_registros_by_asamblea(db: Session, asamblea_id: UUID):
     
     return query.all()
 
+# Obtener los registros de una asamblea como diccionarios (sin instanciar objetos ORM)
+def get_registros_rows_by_asamblea(db: Session, asamblea_id: UUID, columnas: List[str]) -> List[dict]:
+    """
+    Consulta Core de solo las columnas pedidas; cada fila se devuelve como dict listo
+    para serializar. Mucho más liviano que cargar AsambleaRegistro para listas grandes.
+    """
+    query = (
+        select(*[getattr(AsambleaRegistro, columna) for columna in columnas])
+        .where(AsambleaRegistro.asamblea_id == asamblea_id)
+        .order_by(AsambleaRegistro.nombre)
+    )
+    return [dict(row) for row in db.execute(query).mappings()]
+
+# Recorrer los registros de una asamblea con un cursor del lado del servidor
+def iterar_registros_rows(db: Session, asamblea_id: UUID, columnas: List[str], lote: int = 500):
+    """
+    Igual que get_registros_rows_by_asamblea pero sin cargar todo: yield_per usa un cursor
+    con nombre en PostgreSQL y trae `lote` filas a la vez (memoria constante).
+    """
+    query = (
+        select(*[getattr(AsambleaRegistro, columna) for columna in columnas])
+        .where(AsambleaRegistro.asamblea_id == asamblea_id)
+        .order_by(AsambleaRegistro.nombre)
+        .execution_options(yield_per=lote)
+    )
+    for row in db.execute(query).mappings():
+        yield dict(row)
+
+# Cursor de sincronización: xmin del snapshot actual (ver migración 0014)
+def get_cursor_cambios(db: Session) -> str:
+    """
+    Toda transacción con id menor al cursor ya terminó. Se consulta antes que los cambios:
+    las consultas siguientes ven al menos todo lo anterior al cursor (en el peor caso una fila
+    se entrega dos veces, nunca se pierde).
+    """
+    return str(db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())")).scalar_one())
+
+# Registros de una asamblea escritos desde el cursor (cambio_txid >= desde)
+def get_registros_cambiados(db: Session, asamblea_id: UUID, columnas: List[str], desde: str) -> List[dict]:
+    query = (
+        select(*[getattr(AsambleaRegistro, columna) for columna in columnas])
+        .where(AsambleaRegistro.asamblea_id == asamblea_id)
+        .where(text("asamblea_registros.cambio_txid >= CAST(:desde AS xid8)").bindparams(desde=desde))
+    )
+    return [dict(row) for row in db.execute(query).mappings()]
+
+# IDs de los registros de una asamblea eliminados desde el cursor
+def get_registros_eliminados(db: Session, asamblea_id: UUID, desde: str) -> List[UUID]:
+    filas = db.execute(
+        text(
+            "SELECT registro_id FROM public.registro_eliminaciones "
+            "WHERE asamblea_id = :asamblea_id AND cambio_txid >= CAST(:desde AS xid8)"
+        ),
+        {"asamblea_id": asamblea_id, "desde": desde},
+    ).scalars()
+    return [UUID(str(registro_id)) for registro_id in filas]
+
+# Obtener una versión barata de los registros de una asamblea (para ETag)
+def get_registros_version(db: Session, asamblea_id: UUID) -> str:
+    """
+    Cambia cuando se crea, elimina o actualiza cualquier registro de la asamblea.
+    La suma de updated_at detecta también actualizaciones que se confirman fuera de orden
+    (donde max(updated_at) no cambiaría). Se resuelve con el índice (asamblea_id, updated_at).
+    """
+    total, ultimo, suma = db.query(
+        func.count(),
+        func.max(AsambleaRegistro.updated_at),
+        func.sum(func.extract("epoch", AsambleaRegistro.updated_at)),
+    ).filter(AsambleaRegistro.asamblea_id == asamblea_id).one()
+    return f"{total}:{ultimo.isoformat() if ultimo else ''}:{suma or 0}"
+
 # Buscar registros por criterios
 def search_registros(
     db: Session,
@@ -117,6 +190,31 @@ def ensure_token_actualizacion(db: Session, registro_id: UUID) -> Optional[str]:
     return token
 
 
+# Columnas de las rutas públicas: datos editables del registro más título y estado de la asamblea
+_COLUMNAS_PUBLICAS = (
+    AsambleaRegistro.id,
+    AsambleaRegistro.asamblea_id,
+    AsambleaRegistro.cedula,
+    AsambleaRegistro.nombre,
+    AsambleaRegistro.telefono,
+    AsambleaRegistro.correo,
+    AsambleaRegistro.numero_torre,
+    AsambleaRegistro.numero_apartamento,
+    Asamblea.title.label("asamblea_title"),
+    Asamblea.estado.label("asamblea_estado"),
+)
+
+# Registro por token con el título y estado de su asamblea (una consulta con JOIN)
+def get_registro_publico_by_token(db: Session, token: str) -> Optional[dict]:
+    if not token or not token.strip():
+        return None
+    fila = db.execute(
+        select(*_COLUMNAS_PUBLICAS)
+        .join(Asamblea, Asamblea.id == AsambleaRegistro.asamblea_id)
+        .where(AsambleaRegistro.token_actualizacion == token.strip())
+    ).mappings().first()
+    return dict(fila) if fila else None
+
 # Actualizar solo datos permitidos por token (cedula, nombre, telefono, correo)
 def update_registro_by_token(
     db: Session,
@@ -125,22 +223,41 @@ def update_registro_by_token(
     nombre: Optional[str] = None,
     telefono: Optional[str] = None,
     correo: Optional[str] = None,
-):
-    registro = get_registro_by_token(db, token)
-    if not registro:
+) -> Optional[dict]:
+    """
+    Un solo UPDATE ... FROM asambleas ... RETURNING: solo actualiza si la asamblea no está
+    CERRADA (la verificación y la escritura no pueden separarse por un cierre concurrente).
+    Retorna las columnas públicas del registro actualizado, o None si el token no existe o la
+    asamblea está cerrada (get_registro_publico_by_token distingue los dos casos).
+    """
+    if not token or not token.strip():
         return None
+    valores = {
+        "updated_at": func.now(),
+        # UPDATE directo: el ORM no incrementa version por su cuenta
+        "version": AsambleaRegistro.version + 1,
+    }
     if cedula is not None:
-        registro.cedula = cedula
+        valores["cedula"] = cedula
     if nombre is not None:
-        registro.nombre = nombre
+        valores["nombre"] = nombre
     if telefono is not None:
-        registro.telefono = telefono
+        valores["telefono"] = telefono
     if correo is not None:
-        registro.correo = correo
-    registro.updated_at = datetime.now(timezone.utc)
+        valores["correo"] = correo
+    fila = db.execute(
+        update(AsambleaRegistro)
+        .where(
+            AsambleaRegistro.token_actualizacion == token.strip(),
+            Asamblea.id == AsambleaRegistro.asamblea_id,
+            Asamblea.estado != "CERRADA",
+        )
+        .values(**valores)
+        .returning(*_COLUMNAS_PUBLICAS)
+        .execution_options(synchronize_session=False)
+    ).mappings().first()
     db.commit()
-    db.refresh(registro)
-    return registro
+    return dict(fila) if fila else None
 
 # Buscar registros para autocompletado de poderes
 def buscar_registros_para_poderes(
@@ -261,14 +378,23 @@ def update_registro(
     _numero_control_set_none: bool = False,
     gestion_poderes: Optional[dict] = None,
     actividad_ingreso: Optional[dict] = None,
+    version_esperada: Optional[int] = None,
+    commit: bool = True,
 ):
     """
     Actualiza un registro.
     _numero_control_set_none: Si es True, establece numero_control a None explícitamente.
+    version_esperada: si se da y no coincide con la versión actual, lanza StaleDataError
+    (el ORM además verifica la versión en el UPDATE por si otra escritura entra en medio).
+    commit: False para dejar el cambio en la transacción actual (varios registros a la vez).
     """
     registro = get_registro_by_id(db, registro_id)
     if not registro:
         return None
+    if version_esperada is not None and registro.version != version_esperada:
+        raise StaleDataError(
+            f"Registro {registro_id}: versión esperada {version_esperada}, actual {registro.version}"
+        )
 
     if cedula is not None:
         registro.cedula = cedula
@@ -305,11 +431,243 @@ def update_registro(
     
     registro.updated_at = datetime.utcnow()
     
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     db.refresh(registro)
     
     return registro
 
+# Siguiente actividad_N calculada en la misma sentencia UPDATE (N = mayor número existente + 1).
+# El ORM guarda None como JSON null ('null'::jsonb), no como NULL: ambos cuentan como vacío
+_SQL_ACTIVIDAD_INGRESO_CON_NUEVA = text("""
+    COALESCE(NULLIF(actividad_ingreso, 'null'::jsonb), '{}'::jsonb) || jsonb_build_object(
+        'actividad_' || (
+            SELECT COALESCE(MAX(substring(clave FROM '^actividad_([0-9]+)$')::int), 0) + 1
+            FROM jsonb_object_keys(COALESCE(NULLIF(actividad_ingreso, 'null'::jsonb), '{}'::jsonb)) AS clave
+        ),
+        jsonb_build_object('tipo', CAST(:tipo AS text), 'hora', CAST(:hora AS text))
+    )
+""")
+
+# poder_1 con el nuevo número de control (conserva torre/apartamento o toma los del registro).
+# El parámetro no se llama numero_control: chocaría con el de la columna en el mismo UPDATE
+_SQL_GESTION_PODERES_CON_CONTROL = text("""
+    jsonb_set(
+        COALESCE(NULLIF(gestion_poderes, 'null'::jsonb), '{}'::jsonb),
+        '{poder_1}',
+        jsonb_build_object(
+            'torre', COALESCE(NULLIF(gestion_poderes -> 'poder_1' ->> 'torre', ''), numero_torre, ''),
+            'apartamento', COALESCE(NULLIF(gestion_poderes -> 'poder_1' ->> 'apartamento', ''), numero_apartamento, ''),
+            'numero_control', CAST(:control AS text)
+        ),
+        true
+    )
+""")
+
+# Agregar una actividad (ingreso/salida/reingreso) de forma atómica
+def append_actividad(
+    db: Session,
+    registro_id: UUID,
+    tipo: str,
+    hora: str,
+    numero_control: Optional[str] = None,
+    limpiar_control: bool = False,
+    version_esperada: Optional[int] = None,
+):
+    """
+    Agrega actividad_N a actividad_ingreso en un solo UPDATE ... RETURNING, sin leer el
+    documento antes: dos mesas que registran a la vez no se pisan las actividades.
+    - numero_control: se asigna al registro y a poder_1 (ingreso/reingreso).
+    - limpiar_control: deja numero_control en NULL (salida).
+    - version_esperada: solo actualiza si la versión coincide (si no, StaleDataError).
+    Retorna el registro actualizado o None si no existe.
+    """
+    valores = {
+        "actividad_ingreso": _SQL_ACTIVIDAD_INGRESO_CON_NUEVA.bindparams(tipo=tipo, hora=hora),
+        "updated_at": func.now(),
+        # UPDATE directo: el ORM no incrementa version por su cuenta
+        "version": AsambleaRegistro.version + 1,
+    }
+    if limpiar_control:
+        valores["numero_control"] = None
+    elif numero_control:
+        valores["numero_control"] = numero_control
+        valores["gestion_poderes"] = _SQL_GESTION_PODERES_CON_CONTROL.bindparams(control=numero_control)
+
+    stmt = (
+        update(AsambleaRegistro)
+        .where(AsambleaRegistro.id == registro_id)
+        .values(**valores)
+        .returning(AsambleaRegistro)
+        .execution_options(populate_existing=True)
+    )
+    if version_esperada is not None:
+        stmt = stmt.where(AsambleaRegistro.version == version_esperada)
+    registro = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+    if registro is None and version_esperada is not None and get_registro_by_id(db, registro_id):
+        raise StaleDataError(f"Registro {registro_id}: versión esperada {version_esperada}")
+    return registro
+
+# Lote de actividades en una sola sentencia (migración 0013):
+# 1. entrada: los eventos del lote (JSON) como filas.
+# 2. nuevos: registra las claves de idempotencia; las ya usadas se omiten (ON CONFLICT) y los
+#    registros que no son de la asamblea no entran.
+# 3. por_registro: las actividades nuevas de cada registro en orden, el número de control final
+#    (la última salida lo limpia, el último ingreso/reingreso con control lo asigna) y el de poder_1.
+# 4. actualizados: un UPDATE por registro (no por evento) que agrega actividad_N+1..N+k; la
+#    numeración se calcula con la fila ya bloqueada, igual que en append_actividad.
+_SQL_APLICAR_LOTE = text("""
+    WITH entrada AS (
+        SELECT *
+        FROM jsonb_to_recordset(CAST(:eventos AS jsonb)) AS e(
+            orden int, idempotency_key text, registro_id uuid, tipo text, hora text,
+            numero_control text, client_timestamp timestamptz
+        )
+    ),
+    nuevos AS (
+        INSERT INTO public.registro_actividad_eventos (
+            asamblea_id, idempotency_key, registro_id, tipo, hora, numero_control, client_timestamp
+        )
+        SELECT CAST(:asamblea_id AS uuid), e.idempotency_key, e.registro_id, e.tipo, e.hora,
+               e.numero_control, e.client_timestamp
+        FROM entrada e
+        WHERE EXISTS (
+            SELECT 1 FROM public.asamblea_registros r
+            WHERE r.id = e.registro_id AND r.asamblea_id = CAST(:asamblea_id AS uuid)
+        )
+        ORDER BY e.orden
+        ON CONFLICT (asamblea_id, idempotency_key) DO NOTHING
+        RETURNING idempotency_key
+    ),
+    aplicar AS (
+        SELECT e.*,
+               row_number() OVER (PARTITION BY e.registro_id ORDER BY e.orden) AS n,
+               count(*) OVER (PARTITION BY e.registro_id) AS total
+        FROM entrada e
+        JOIN nuevos USING (idempotency_key)
+    ),
+    por_registro AS (
+        SELECT
+            registro_id,
+            jsonb_agg(jsonb_build_object('n', n, 'tipo', tipo, 'hora', hora) ORDER BY n) AS actividades,
+            (array_agg(CASE WHEN tipo = 'salida' THEN '' ELSE numero_control END ORDER BY n DESC)
+                FILTER (WHERE tipo = 'salida' OR numero_control IS NOT NULL))[1] AS control_final,
+            (array_agg(numero_control ORDER BY n DESC)
+                FILTER (WHERE tipo <> 'salida' AND numero_control IS NOT NULL))[1] AS control_poder
+        FROM aplicar
+        GROUP BY registro_id
+    ),
+    actualizados AS (
+        -- El ORM guarda None como JSON null ('null'::jsonb), no como NULL: ambos cuentan como vacío
+        UPDATE public.asamblea_registros r SET
+            actividad_ingreso = COALESCE(NULLIF(r.actividad_ingreso, 'null'::jsonb), '{}'::jsonb) || (
+                SELECT jsonb_object_agg(
+                    'actividad_' || (base.maximo + (a ->> 'n')::int),
+                    jsonb_build_object('tipo', a ->> 'tipo', 'hora', a ->> 'hora')
+                )
+                FROM jsonb_array_elements(p.actividades) AS a,
+                     (SELECT COALESCE(MAX(substring(clave FROM '^actividad_([0-9]+)$')::int), 0) AS maximo
+                      FROM jsonb_object_keys(COALESCE(NULLIF(r.actividad_ingreso, 'null'::jsonb), '{}'::jsonb)) AS clave) AS base
+            ),
+            numero_control = CASE
+                WHEN p.control_final IS NULL THEN r.numero_control
+                ELSE NULLIF(p.control_final, '')
+            END,
+            gestion_poderes = CASE
+                WHEN p.control_poder IS NULL THEN r.gestion_poderes
+                ELSE jsonb_set(
+                    COALESCE(NULLIF(r.gestion_poderes, 'null'::jsonb), '{}'::jsonb),
+                    '{poder_1}',
+                    jsonb_build_object(
+                        'torre', COALESCE(NULLIF(r.gestion_poderes -> 'poder_1' ->> 'torre', ''), r.numero_torre, ''),
+                        'apartamento', COALESCE(NULLIF(r.gestion_poderes -> 'poder_1' ->> 'apartamento', ''), r.numero_apartamento, ''),
+                        'numero_control', p.control_poder
+                    ),
+                    true
+                )
+            END,
+            updated_at = now(),
+            version = r.version + 1
+        FROM por_registro p
+        WHERE r.id = p.registro_id
+        RETURNING
+            r.id,
+            r.version,
+            (SELECT MAX(substring(clave FROM '^actividad_([0-9]+)$')::int)
+             FROM jsonb_object_keys(r.actividad_ingreso) AS clave) AS ultima
+    )
+    SELECT a.idempotency_key, a.registro_id,
+           'actividad_' || (u.ultima - a.total + a.n) AS actividad,
+           u.version
+    FROM aplicar a
+    JOIN actualizados u ON u.id = a.registro_id
+""")
+
+# Guarda en cada evento la actividad creada y la versión resultante (para responder reintentos)
+_SQL_GUARDAR_RESULTADOS_LOTE = text("""
+    UPDATE public.registro_actividad_eventos ev
+    SET actividad = x.actividad, "version" = x.version
+    FROM jsonb_to_recordset(CAST(:resultados AS jsonb)) AS x(idempotency_key text, actividad text, version int)
+    WHERE ev.asamblea_id = CAST(:asamblea_id AS uuid) AND ev.idempotency_key = x.idempotency_key
+""")
+
+# Aplicar un lote de actividades de una asamblea en una transacción
+def aplicar_actividades_lote(db: Session, asamblea_id: UUID, eventos: List[dict]):
+    """
+    eventos: dicts con idempotency_key, registro_id, tipo, hora, numero_control (None en
+    salida) y client_timestamp, en el orden en que se deben aplicar.
+    Retorna (aplicados, anteriores): dicts por idempotency_key con registro_id, actividad y
+    version; `anteriores` son las claves ya usadas en un lote previo.
+    """
+    if not eventos:
+        return {}, {}
+    payload = json.dumps([
+        {**evento, "orden": i, "registro_id": str(evento["registro_id"])}
+        for i, evento in enumerate(eventos)
+    ], default=str)
+    filas = db.execute(_SQL_APLICAR_LOTE, {"eventos": payload, "asamblea_id": str(asamblea_id)}).mappings().all()
+    aplicados = {
+        fila["idempotency_key"]: {
+            "registro_id": UUID(str(fila["registro_id"])),
+            "actividad": fila["actividad"],
+            "version": fila["version"],
+        }
+        for fila in filas
+    }
+    if aplicados:
+        db.execute(_SQL_GUARDAR_RESULTADOS_LOTE, {
+            "asamblea_id": str(asamblea_id),
+            "resultados": json.dumps([
+                {"idempotency_key": k, "actividad": v["actividad"], "version": v["version"]}
+                for k, v in aplicados.items()
+            ]),
+        })
+
+    pendientes = [evento["idempotency_key"] for evento in eventos if evento["idempotency_key"] not in aplicados]
+    anteriores = {}
+    if pendientes:
+        previos = (
+            db.query(RegistroActividadEvento)
+            .filter(
+                RegistroActividadEvento.asamblea_id == asamblea_id,
+                RegistroActividadEvento.idempotency_key.in_(pendientes),
+            )
+            .all()
+        )
+        anteriores = {
+            previo.idempotency_key: {
+                "registro_id": previo.registro_id,
+                "actividad": previo.actividad,
+                "version": previo.version,
+            }
+            for previo in previos
+        }
+    db.commit()
+    return aplicados, anteriores
+
 # Verificar si un número de control ya está asignado a otro registro
 def verificar_control_existente(
     db: Session,
@@ -383,19 +741,23 @@ def get_estadisticas_ingreso_por_hora(db: Session, asamblea_id: UUID):
     Solo cuenta actividades de tipo 'ingreso' o 'reingreso' del campo actividad_ingreso.
     Retorna un diccionario con la hora como clave y el conteo como valor.
     """
-    registros = db.query(AsambleaRegistro).filter(
-        AsambleaRegistro.asamblea_id == asamblea_id,
-        AsambleaRegistro.actividad_ingreso.isnot(None)
-    ).all()
-    
+    actividades = db.execute(
+        select(AsambleaRegistro.actividad_ingreso).where(
+            AsambleaRegistro.asamblea_id == asamblea_id,
+            AsambleaRegistro.actividad_ingreso.isnot(None)
+        )
+    ).scalars()
+    return contar_ingresos_por_hora(actividades)
+
+# Contar ingresos por hora a partir de los actividad_ingreso (de la tabla o de un archivo)
+def contar_ingresos_por_hora(actividades) -> dict:
     # Diccionario para almacenar conteos por hora
     conteo_por_hora = {}
     
-    for registro in registros:
-        if not registro.actividad_ingreso:
+    for actividad_ingreso in actividades:
+        if not actividad_ingreso:
             continue
         
-        actividad_ingreso = registro.actividad_ingreso
         if isinstance(actividad_ingreso, dict):
             # Iterar sobre todas las actividades (actividad_1, actividad_2, etc.)
             for actividad_key, actividad_data in actividad_ingreso.items():
@@ -484,7 +846,63 @@ def esta_presente(actividad_ingreso: Optional[dict]) -> bool:
 # Obtener estadísticas de quorum y coeficiente presente
 def get_estadisticas_quorum_coeficiente(db: Session, asamblea_id: UUID):
     """
-    Obtiene las estadísticas de quorum y coeficiente presente.
+    Lee el resumen asamblea_quorum que mantienen los triggers de la migración 0010
+    (una sola fila). Si la asamblea aún no tiene resumen se calcula sobre los registros.
+    """
+    resumen = db.get(AsambleaQuorum, asamblea_id)
+    if resumen is None:
+        return calcular_estadisticas_quorum_coeficiente(db, asamblea_id)
+    return {
+        "total_registros": resumen.total_registros,
+        "registros_presentes": resumen.registros_presentes,
+        "total_coeficiente": float(resumen.total_coeficiente),
+        "coeficiente_presente": float(resumen.coeficiente_presente),
+    }
+
+# Serie de tiempo del quorum (una muestra por minuto) en un rango
+def get_quorum_serie(
+    db: Session,
+    asamblea_id: UUID,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> List[dict]:
+    """
+    Muestras de asamblea_quorum_muestras con desde <= minuto <= hasta, en orden.
+    Se resuelve con un solo index scan sobre la clave primaria (asamblea_id, minuto).
+    """
+    muestras = AsambleaQuorumMuestra.__table__
+    stmt = select(
+        muestras.c.minuto,
+        muestras.c.total_registros,
+        muestras.c.registros_presentes,
+        muestras.c.total_coeficiente,
+        muestras.c.coeficiente_presente,
+    ).where(muestras.c.asamblea_id == asamblea_id)
+    if desde is not None:
+        stmt = stmt.where(muestras.c.minuto >= desde)
+    if hasta is not None:
+        stmt = stmt.where(muestras.c.minuto <= hasta)
+    return [
+        {
+            "minuto": fila.minuto,
+            "total_registros": fila.total_registros,
+            "registros_presentes": fila.registros_presentes,
+            "total_coeficiente": float(fila.total_coeficiente),
+            "coeficiente_presente": float(fila.coeficiente_presente),
+        }
+        for fila in db.execute(stmt.order_by(muestras.c.minuto))
+    ]
+
+# Recalcular desde cero el resumen de quorum de una asamblea (reparación)
+def recalcular_asamblea_quorum(db: Session, asamblea_id: UUID):
+    db.execute(text("SELECT public.recalcular_asamblea_quorum(:asamblea_id)"), {"asamblea_id": asamblea_id})
+    db.commit()
+
+# Calcular las estadísticas de quorum recorriendo los registros (referencia del resumen)
+def calcular_estadisticas_quorum_coeficiente(db: Session, asamblea_id: UUID):
+    """
+    Calcula las estadísticas de quorum y coeficiente presente en Python.
+    Son las mismas reglas de los triggers; app.services.quorum_service lo usa para verificar.
     
     Retorna:
     - total_registros: Total de registros en la asamblea
@@ -493,9 +911,10 @@ def get_estadisticas_quorum_coeficiente(db: Session, asamblea_id: UUID):
     - coeficiente_presente: Suma de coeficientes de registros presentes (coeficiente propio + poderes)
     """
     # Obtener todos los registros de la asamblea
+    # Orden fijo: con unidades repetidas el dueño es el primero (igual que en los triggers)
     registros = db.query(AsambleaRegistro).filter(
         AsambleaRegistro.asamblea_id == asamblea_id
-    ).all()
+    ).order_by(AsambleaRegistro.created_at, AsambleaRegistro.id).all()
     
     total_registros = len(registros)
     registros_presentes = 0
@@ -503,9 +922,18 @@ def get_estadisticas_quorum_coeficiente(db: Session, asamblea_id: UUID):
     coeficiente_presente = 0.0
     
     # Calcular total_coeficiente: suma de todos los valores de la columna coeficiente
+    # y armar el índice (torre, apartamento) -> dueño original para resolver los poderes
+    # en memoria (antes se consultaban todos los registros otra vez por cada poder)
+    duenos_por_unidad = {}
     for registro in registros:
         if registro.coeficiente is not None:
             total_coeficiente += float(registro.coeficiente)
+        unidad = (
+            (registro.numero_torre or "").strip().lower(),
+            (registro.numero_apartamento or "").strip().lower(),
+        )
+        # Igual que buscar_dueno_original_poder: gana el primer registro que coincide
+        duenos_por_unidad.setdefault(unidad, registro)
     
     # Calcular coeficiente_presente: para registros presentes, suma su coeficiente + poderes
     for registro in registros:
@@ -532,16 +960,11 @@ def get_estadisticas_quorum_coeficiente(db: Session, asamblea_id: UUID):
                         # Obtener datos del poder
                         torre = poder_data.get("torre") or poder_data.get("numero_torre") or ""
                         apartamento = poder_data.get("apartamento") or poder_data.get("numero_apartamento") or ""
-                        numero_control = poder_data.get("numero_control") or ""
                         
                         # Si el poder tiene datos válidos, buscar el coeficiente del dueño original
                         if torre.strip() or apartamento.strip():
-                            dueno_original = buscar_dueno_original_poder(
-                                db=db,
-                                asamblea_id=asamblea_id,
-                                torre=torre.strip(),
-                                apartamento=apartamento.strip(),
-                                numero_control=numero_control.strip()
+                            dueno_original = duenos_por_unidad.get(
+                                (torre.strip().lower(), apartamento.strip().lower())
                             )
                             
                             if dueno_original and dueno_original.coeficiente is not None:
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from app.models.user_model import User
+from app.repositories.pagination import paginar_query
 from uuid import UUID
 from typing import List, Optional
 
@@ -15,14 +16,14 @@ def get_by_id(db: Session, user_id: UUID):
         .filter(User.id == user_id)\
         .first()
 
-# Obtener todos los usuarios
-def get_all_users(db: Session, skip: int = 0, limit: int = 100, search: Optional[str] = None, is_admin: Optional[bool] = None):
-    query = db.query(User)
+# Construir las condiciones de filtro de usuarios (compartidas por listado y conteo)
+def build_user_filters(search: Optional[str] = None, is_admin: Optional[bool] = None) -> list:
+    condiciones = []
     
     # Filtro de búsqueda por nombre, apellido o username
     if search:
         search_filter = f"%{search}%"
-        query = query.filter(
+        condiciones.append(
             (User.name.ilike(search_filter)) |
             (User.last_name.ilike(search_filter)) |
             (User.username.ilike(search_filter))
@@ -30,29 +31,18 @@ def get_all_users(db: Session, skip: int = 0, limit: int = 100, search: Optional
     
     # Filtro por rol (admin/operario)
     if is_admin is not None:
-        query = query.filter(User.is_admin == is_admin)
+        condiciones.append(User.is_admin == is_admin)
     
-    # Ordenar por nombre
-    query = query.order_by(User.name, User.last_name)
-    
-    return query.offset(skip).limit(limit).all()
+    return condiciones
 
-# Contar usuarios con filtros
-def count_users(db: Session, search: Optional[str] = None, is_admin: Optional[bool] = None):
-    query = db.query(User)
+# Obtener una página de usuarios con su total en una sola consulta
+def get_users_page(db: Session, skip: int = 0, limit: int = 100, search: Optional[str] = None, is_admin: Optional[bool] = None, include_total: bool = True):
+    query = db.query(User).filter(*build_user_filters(search, is_admin))
     
-    if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (User.name.ilike(search_filter)) |
-            (User.last_name.ilike(search_filter)) |
-            (User.username.ilike(search_filter))
-        )
-    
-    if is_admin is not None:
-        query = query.filter(User.is_admin == is_admin)
+    # Ordenar por nombre (id como desempate para que las páginas sean estables)
+    query = query.order_by(User.name, User.last_name, User.id)
     
-    return query.count()
+    return paginar_query(query, skip=skip, limit=limit, include_total=include_total)
 
 # Crear un usuario
 def create_user(db: Session, user: User):
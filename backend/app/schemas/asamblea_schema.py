@@ -44,3 +44,17 @@ class AsambleaResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Esquema para respuesta del archivo de una asamblea cerrada
+class AsambleaArchivoResponse(BaseModel):
+    asamblea_id: UUID
+    ruta: str
+    formato: str
+    registros: int
+    bytes: int
+    sha256: str
+    filas_eliminadas: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from uuid import UUID
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 # Esquema para respuesta de registro
@@ -19,6 +19,7 @@ class RegistroResponse(BaseModel):
     gestion_poderes: Optional[Dict[str, Any]]
     created_at: datetime
     updated_at: datetime
+    version: int  # se envía como If-Match (ETag) al actualizar
 
     class Config:
         from_attributes = True
@@ -40,3 +41,34 @@ class PoderSearchParams(BaseModel):
     torre: Optional[str] = None
     apartamento: Optional[str] = None
     numero_control: Optional[str] = None
+
+# Esquema para registrar una actividad (la hora la pone el servidor)
+class ActividadCreate(BaseModel):
+    tipo: str  # ingreso, salida, reingreso
+    numero_control: Optional[str] = None  # se asigna en ingreso/reingreso
+
+# Esquema de una actividad registrada sin conexión por una mesa (sincronización en lote)
+class ActividadLoteItem(BaseModel):
+    registro_id: UUID
+    tipo: str  # ingreso, salida, reingreso
+    client_timestamp: datetime  # hora de la mesa; sin zona se toma APP_TIMEZONE
+    idempotency_key: str  # única por evento; reenviarla no duplica la actividad
+    numero_control: Optional[str] = None
+
+# Esquema para el lote de actividades
+class ActividadLoteRequest(BaseModel):
+    eventos: List[ActividadLoteItem]
+
+# Resultado de cada actividad del lote
+class ActividadLoteResultado(BaseModel):
+    idempotency_key: str
+    registro_id: UUID
+    estado: str  # aplicado, duplicado, no_encontrado, invalido
+    actividad: Optional[str] = None  # clave actividad_N creada
+    version: Optional[int] = None  # versión del registro después del lote
+    detail: Optional[str] = None
+
+# Esquema de respuesta del lote de actividades
+class ActividadLoteResponse(BaseModel):
+    aplicados: int
+    resultados: List[ActividadLoteResultado]
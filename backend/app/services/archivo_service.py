@@ -0,0 +1,177 @@
+"""
+Archivo de asambleas cerradas (formato en app/core/archivo.py).
+
+También es la herramienta de línea de comandos que archiva las asambleas CERRADA que aún no
+tienen archivo (p. ej. las cerradas antes de configurar ARCHIVO_DIR). Uso (desde la carpeta
+backend o dentro del contenedor):
+  python -m app.services.archivo_service archivar                   # usa ARCHIVO_ELIMINAR_FILAS
+  python -m app.services.archivo_service archivar --eliminar-filas  # borra las filas ya archivadas
+  python -m app.services.archivo_service archivar --asamblea-id <uuid>
+"""
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.repositories.asamblea_repository import get_asamblea_by_id
+from app.repositories.registro_repository import get_registros_rows_by_asamblea, get_registros_version
+from app.repositories.archivo_repository import get_archivo, guardar_archivo
+from app.models.asamblea_model import Asamblea, AsambleaArchivo, AsambleaRegistro
+from app.core.archivo import escribir_archivo, leer_archivo, iterar_archivo
+from app.core.cache import cache_asambleas
+from app.core.config import ARCHIVO_DIR, ARCHIVO_ELIMINAR_FILAS
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import UUID
+from typing import Optional, List, Dict, Any, Iterator
+import argparse
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Todas las columnas de asamblea_registros (el archivo es la copia completa)
+COLUMNAS_ARCHIVO = [columna.key for columna in AsambleaRegistro.__table__.columns]
+
+# Servicio para archivar una asamblea cerrada
+def archivar_asamblea_service(db: Session, asamblea_id: UUID, eliminar_filas: Optional[bool] = None):
+    """
+    Exporta los registros de una asamblea CERRADA a <ARCHIVO_DIR>/<asamblea_id>/ y lo registra
+    en asamblea_archivos. Con eliminar_filas (por defecto ARCHIVO_ELIMINAR_FILAS) borra las
+    filas de asamblea_registros; desde ahí los registros se leen del archivo.
+    """
+    if not ARCHIVO_DIR:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El archivo de asambleas no está configurado (ARCHIVO_DIR)",
+        )
+    asamblea = get_asamblea_by_id(db, asamblea_id)
+    if not asamblea:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asamblea no encontrada"
+        )
+    if asamblea.estado != "CERRADA":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Solo se pueden archivar asambleas cerradas",
+        )
+    if eliminar_filas is None:
+        eliminar_filas = ARCHIVO_ELIMINAR_FILAS
+
+    existente = get_archivo(db, asamblea_id)
+    if existente and existente.filas_eliminadas:
+        # Ya no hay filas que exportar: el archivo existente es la única copia
+        return existente
+
+    version = get_registros_version(db, asamblea_id)
+    # Ordenados por nombre: la exportación recorre el archivo en este mismo orden
+    registros = get_registros_rows_by_asamblea(db=db, asamblea_id=asamblea_id, columnas=COLUMNAS_ARCHIVO)
+    directorio = Path(ARCHIVO_DIR) / str(asamblea_id)
+    manifiesto = escribir_archivo(directorio, registros, {
+        "asamblea": {
+            "id": str(asamblea.id),
+            "title": asamblea.title,
+            "estado": asamblea.estado,
+            "fecha_inicio": asamblea.fecha_inicio,
+            "fecha_final": asamblea.fecha_final,
+        },
+        "columnas": COLUMNAS_ARCHIVO,
+        "archivado_en": datetime.now(timezone.utc),
+    })
+
+    try:
+        archivo = guardar_archivo(
+            db=db,
+            asamblea_id=asamblea_id,
+            ruta=str(directorio / manifiesto["archivo"]),
+            manifiesto=manifiesto,
+            eliminar_filas=eliminar_filas,
+            version_exportada=version,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    cache_asambleas.invalidar_asamblea(asamblea_id)
+    logger.info(
+        "Asamblea %s archivada: %d registros, %d bytes%s",
+        asamblea_id, archivo.registros, archivo.bytes, " (filas eliminadas)" if eliminar_filas else "",
+    )
+    return archivo
+
+# Registros de una asamblea archivada cuyas filas ya no están en la tabla
+def get_registros_archivados(db: Session, asamblea_id: UUID) -> Optional[List[Dict[str, Any]]]:
+    """
+    Lista de registros (formato de la tabla) leída del archivo, o None si la asamblea
+    conserva sus filas en asamblea_registros (el caso normal).
+    """
+    archivo = get_archivo(db, asamblea_id)
+    if archivo is None or not archivo.filas_eliminadas:
+        return None
+    return leer_archivo(archivo.ruta, archivo.sha256)
+
+# Registros de una asamblea archivada uno a uno (ordenados por nombre, como se archivaron), o
+# None si conserva sus filas. No usa la sesión después de retornar: sirve para respuestas en streaming
+def iterar_registros_archivados(db: Session, asamblea_id: UUID) -> Optional[Iterator[Dict[str, Any]]]:
+    archivo = get_archivo(db, asamblea_id)
+    if archivo is None or not archivo.filas_eliminadas:
+        return None
+    return iterar_archivo(archivo.ruta, archivo.sha256)
+
+# Versión (ETag) de los registros de una asamblea archivada, o None si no lo está
+def get_version_archivo(db: Session, asamblea_id: UUID) -> Optional[str]:
+    archivo = get_archivo(db, asamblea_id)
+    if archivo is None or not archivo.filas_eliminadas:
+        return None
+    return f"archivo:{archivo.sha256}"
+
+
+# Asambleas cerradas pendientes de archivar (o de borrar sus filas si se pide)
+def _asambleas_por_archivar(db: Session, eliminar_filas: Optional[bool]) -> List[UUID]:
+    query = (
+        db.query(Asamblea.id)
+        .outerjoin(AsambleaArchivo, AsambleaArchivo.asamblea_id == Asamblea.id)
+        .filter(Asamblea.estado == "CERRADA")
+    )
+    if eliminar_filas:
+        query = query.filter((AsambleaArchivo.asamblea_id.is_(None)) | (AsambleaArchivo.filas_eliminadas.is_(False)))
+    else:
+        query = query.filter(AsambleaArchivo.asamblea_id.is_(None))
+    return [fila.id for fila in query.order_by(Asamblea.fecha_final).all()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    archivar = sub.add_parser("archivar", help="Archiva las asambleas cerradas sin archivo")
+    archivar.add_argument("--asamblea-id", type=UUID, help="Solo esta asamblea")
+    archivar.add_argument("--eliminar-filas", action="store_true", default=None,
+                          help="Borrar las filas de asamblea_registros después de archivar")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+
+    if SessionLocal is None:
+        print("ERROR: No se pudo conectar a la base de datos. Revisa las variables de entorno.")
+        return 1
+    if not ARCHIVO_DIR:
+        print("ERROR: Configura ARCHIVO_DIR con el directorio donde guardar los archivos.")
+        return 1
+
+    db = SessionLocal()
+    try:
+        ids = [args.asamblea_id] if args.asamblea_id else _asambleas_por_archivar(db, args.eliminar_filas)
+        errores = 0
+        for asamblea_id in ids:
+            try:
+                archivo = archivar_asamblea_service(db, asamblea_id, eliminar_filas=args.eliminar_filas)
+                print(f"Asamblea {asamblea_id}: {archivo.registros} registros, {archivo.bytes} bytes -> {archivo.ruta}")
+            except HTTPException as e:
+                db.rollback()
+                errores += 1
+                print(f"Asamblea {asamblea_id}: {e.detail}")
+        print(f"{len(ids) - errores} asambleas archivadas, {errores} con errores")
+        return 1 if errores else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
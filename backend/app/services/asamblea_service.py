@@ -4,8 +4,7 @@ from uuid import UUID
 from app.schemas.asamblea_schema import AsambleaCreate, AsambleaResponse
 from app.repositories.asamblea_repository import (
     create_asamblea_with_registros,
-    get_all_asambleas,
-    count_asambleas,
+    get_asambleas_page,
     get_asamblea_by_id,
     update_asamblea_estado,
     delete_asamblea
@@ -13,11 +12,18 @@ from app.repositories.asamblea_repository import (
 from app.repositories.registro_repository import get_registros_by_ids_and_asamblea
 from app.services.email_service import send_reporte_control, send_aviso_actualizacion
 from app.models.email_model import Email
+from app.core.metrics import registrar_email
 from app.repositories.registro_repository import ensure_token_actualizacion
-from app.core.config import FRONTEND_URL
+from app.core.config import FRONTEND_URL, ARCHIVO_DIR, ARCHIVO_AL_CERRAR
+from app.core.cache import cache_asambleas
+from app.services.archivo_service import archivar_asamblea_service, get_registros_archivados
+from types import SimpleNamespace
+import logging
 from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
 
+logger = logging.getLogger(__name__)
+
 # Servicio para crear una asamblea con sus registros
 def create_new_asamblea(db: Session, data_asamblea: AsambleaCreate, created_by: str):
     # Preparar datos de la asamblea
@@ -64,14 +70,23 @@ def get_asambleas(
     search: Optional[str] = None,
     estado: Optional[str] = None,
     fecha_desde: Optional[str] = None,
-    fecha_hasta: Optional[str] = None
+    fecha_hasta: Optional[str] = None,
+    include_total: bool = True,
+    cursor: Optional[str] = None
 ):
-    asambleas = get_all_asambleas(db, skip=skip, limit=limit, search=search, estado=estado, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta)
-    total = count_asambleas(db, search=search, estado=estado, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta)
+    try:
+        pagina = get_asambleas_page(db, skip=skip, limit=limit, search=search, estado=estado, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta, include_total=include_total, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return {
-        "asambleas": asambleas,
-        "total": total
+        "asambleas": pagina["items"],
+        "total": pagina["total"],
+        "has_more": pagina["has_more"],
+        "next_cursor": pagina["next_cursor"]
     }
 
 # Servicio para actualizar el estado de una asamblea
@@ -93,7 +108,6 @@ def update_asamblea_estado_service(db: Session, asamblea_id: UUID, nuevo_estado:
             asamblea_id=asamblea_id,
             nuevo_estado=nuevo_estado
         )
-        return asamblea_actualizada
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -104,6 +118,25 @@ def update_asamblea_estado_service(db: Session, asamblea_id: UUID, nuevo_estado:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar el estado de la asamblea: {str(e)}"
         )
+    cache_asambleas.invalidar_asamblea(asamblea_id)
+
+    # Archivar al cerrar; si falla, la asamblea queda cerrada igual (se puede archivar después)
+    if nuevo_estado == "CERRADA" and ARCHIVO_DIR and ARCHIVO_AL_CERRAR:
+        try:
+            archivar_asamblea_service(db, asamblea_id)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"No se pudo archivar la asamblea {asamblea_id}: {str(e)}", exc_info=True)
+        db.refresh(asamblea_actualizada)
+    return asamblea_actualizada
+
+# Registros por id, leídos del archivo si la asamblea ya no tiene filas en la tabla
+def _registros_por_ids(db: Session, asamblea_id: UUID, registro_ids: List[UUID]):
+    archivados = get_registros_archivados(db, asamblea_id)
+    if archivados is None:
+        return get_registros_by_ids_and_asamblea(db, asamblea_id, registro_ids)
+    ids = {str(registro_id) for registro_id in registro_ids}
+    return [SimpleNamespace(**registro) for registro in archivados if registro["id"] in ids]
 
 # Servicio para eliminar una asamblea
 def delete_asamblea_service(db: Session, asamblea_id: UUID):
@@ -120,6 +153,7 @@ def delete_asamblea_service(db: Session, asamblea_id: UUID):
     
     try:
         resultado = delete_asamblea(db=db, asamblea_id=asamblea_id)
+        cache_asambleas.invalidar_asamblea(asamblea_id)
         return resultado
     except Exception as e:
         raise HTTPException(
@@ -162,7 +196,7 @@ def send_reportes_control_service(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Solo se pueden enviar reportes de control cuando la asamblea está cerrada.",
         )
-    registros = get_registros_by_ids_and_asamblea(db, asamblea_id, registro_ids)
+    registros = _registros_por_ids(db, asamblea_id, registro_ids)
     asamblea_title = asamblea.title or "Asamblea"
     enviados = 0
     fallidos = 0
@@ -201,6 +235,7 @@ def send_reportes_control_service(
             fallidos += 1
             errores.append(f"{correo}: {str(e)}")
         email_record.updated_at = datetime.now(timezone.utc)
+        registrar_email(email_record.tipo, email_record.estado)
     db.commit()
     return {"enviados": enviados, "fallidos": fallidos, "errores": errores}
 
@@ -221,6 +256,11 @@ def send_aviso_actualizacion_service(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Asamblea no encontrada",
         )
+    if get_registros_archivados(db, asamblea_id) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La asamblea está archivada: sus registros ya no se pueden actualizar.",
+        )
     registros = get_registros_by_ids_and_asamblea(db, asamblea_id, registro_ids)
     asamblea_title = asamblea.title or "Asamblea"
     enviados = 0
@@ -264,5 +304,6 @@ def send_aviso_actualizacion_service(
             fallidos += 1
             errores.append(f"{correo}: {str(e)}")
         email_record.updated_at = datetime.now(timezone.utc)
+        registrar_email(email_record.tipo, email_record.estado)
     db.commit()
     return {"enviados": enviados, "fallidos": fallidos, "errores": errores}
@@ -17,6 +17,7 @@ from sendgrid.helpers.mail import (
     ContentId,
 )
 from app.core.config import SENDGRID_KEY, SENDGRID_FROM_EMAIL, SENDGRID_FROM_NAME
+from app.core.metrics import medir_generacion
 from app.email.template_loader import render_reporte_control, render_actualizacion_datos
 
 logger = logging.getLogger(__name__)
@@ -26,13 +27,14 @@ def _qr_to_base64(url: str, size: int = 160) -> str:
     """Genera un QR con la URL y lo devuelve en base64 PNG."""
     try:
         import qrcode
-        qr = qrcode.QRCode(version=1, box_size=10, border=2)
-        qr.add_data(url)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        img = img.resize((size, size))
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
+        with medir_generacion("qr_email"):
+            qr = qrcode.QRCode(version=1, box_size=10, border=2)
+            qr.add_data(url)
+            qr.make(fit=True)
+            img = qr.make_image(fill_color="black", back_color="white")
+            img = img.resize((size, size))
+            buf = io.BytesIO()
+            img.save(buf, format="PNG")
         return base64.b64encode(buf.getvalue()).decode("utf-8")
     except Exception as e:
         logger.warning("No se pudo generar QR: %s", e)
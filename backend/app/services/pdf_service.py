@@ -10,6 +10,7 @@ from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 
 from app.core.config import FRONTEND_URL
+from app.core.metrics import medir_generacion
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +22,14 @@ QR_SIZE_PT = 320  # puntos (~113 mm)
 def _qr_png_bytes(url: str, size: int = 400) -> bytes:
     """Genera un QR con la URL y devuelve los bytes PNG."""
     import qrcode
-    qr = qrcode.QRCode(version=1, box_size=10, border=2)
-    qr.add_data(url)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    img = img.resize((size, size))
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
+    with medir_generacion("qr_pdf"):
+        qr = qrcode.QRCode(version=1, box_size=10, border=2)
+        qr.add_data(url)
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+        img = img.resize((size, size))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
     return buf.getvalue()
 
 
@@ -46,6 +48,11 @@ def generar_pdf_qr_ingreso(asamblea_id: str, asamblea_title: str) -> bytes:
     """
     Genera un PDF A4 con ReportLab: buen padding, QR grande, sin librerías del sistema.
     """
+    with medir_generacion("pdf_ingreso"):
+        return _generar_pdf_qr_ingreso(asamblea_id, asamblea_title)
+
+
+def _generar_pdf_qr_ingreso(asamblea_id: str, asamblea_title: str) -> bytes:
     url_ingreso = f"{FRONTEND_URL}/update-users/ingreso?asamblea={asamblea_id}"
     qr_bytes = _qr_png_bytes(url_ingreso)
     fecha_str = datetime.now(timezone.utc).strftime("%d/%m/%Y %H:%M")
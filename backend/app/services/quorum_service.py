@@ -0,0 +1,83 @@
+"""
+Verifica y repara el resumen asamblea_quorum (migración 0010).
+
+Compara la fila de cada asamblea con el cálculo en Python sobre sus registros y, salvo con
+--solo-verificar, la recalcula desde cero con la función recalcular_asamblea_quorum de la BD.
+
+Uso (desde la carpeta backend o dentro del contenedor):
+  python -m app.services.quorum_service reparar                        # todas las asambleas
+  python -m app.services.quorum_service reparar --asamblea-id <uuid>
+  python -m app.services.quorum_service reparar --solo-verificar       # sale con código 1 si hay desvíos
+"""
+import argparse
+import sys
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.asamblea_model import Asamblea, AsambleaQuorum
+from app.repositories.registro_repository import (
+    calcular_estadisticas_quorum_coeficiente,
+    recalcular_asamblea_quorum,
+)
+
+CAMPOS = ["total_registros", "registros_presentes", "total_coeficiente", "coeficiente_presente"]
+TOLERANCIA = 1e-6
+
+
+def diferencias_quorum(db: Session, asamblea_id: UUID):
+    """Campos del resumen que no coinciden con el cálculo sobre los registros."""
+    esperado = calcular_estadisticas_quorum_coeficiente(db, asamblea_id)
+    resumen = db.get(AsambleaQuorum, asamblea_id)
+    if resumen is None:
+        return {"resumen": ("sin fila", esperado)}
+    diferencias = {}
+    for campo in CAMPOS:
+        actual = float(getattr(resumen, campo))
+        if abs(actual - float(esperado[campo])) > TOLERANCIA:
+            diferencias[campo] = (actual, esperado[campo])
+    return diferencias
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    reparar = sub.add_parser("reparar", help="Verifica y recalcula el resumen asamblea_quorum")
+    reparar.add_argument("--asamblea-id", type=UUID, help="Solo esta asamblea")
+    reparar.add_argument("--solo-verificar", action="store_true", help="No reparar, solo reportar desvíos")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+
+    if SessionLocal is None:
+        print("ERROR: No se pudo conectar a la base de datos. Revisa las variables de entorno.")
+        return 1
+
+    db = SessionLocal()
+    try:
+        if args.asamblea_id:
+            ids = [args.asamblea_id]
+        else:
+            ids = [fila.id for fila in db.query(Asamblea.id).order_by(Asamblea.created_at).all()]
+
+        con_desvio = 0
+        for asamblea_id in ids:
+            diferencias = diferencias_quorum(db, asamblea_id)
+            if diferencias:
+                con_desvio += 1
+                detalle = ", ".join(f"{campo}: {a} -> {e}" for campo, (a, e) in diferencias.items())
+                print(f"Asamblea {asamblea_id}: {detalle}")
+            if not args.solo_verificar:
+                recalcular_asamblea_quorum(db, asamblea_id)
+            db.expire_all()
+
+        accion = "verificadas" if args.solo_verificar else "recalculadas"
+        print(f"{len(ids)} asambleas {accion}, {con_desvio} con desvíos")
+        return 1 if args.solo_verificar and con_desvio else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
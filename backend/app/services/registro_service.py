@@ -1,21 +1,46 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from sqlalchemy.orm.exc import StaleDataError
 from app.repositories.registro_repository import (
     get_registros_by_asamblea, 
+    get_registros_rows_by_asamblea,
+    iterar_registros_rows,
+    esta_presente,
+    get_registros_version,
+    get_cursor_cambios,
+    get_registros_cambiados,
+    get_registros_eliminados,
     search_registros,
     get_registro_by_id,
     buscar_registros_para_poderes,
     buscar_registro_con_poder,
     buscar_dueno_original_poder,
     update_registro,
+    append_actividad,
+    aplicar_actividades_lote,
     verificar_control_existente,
     verificar_control_en_poderes,
     get_estadisticas_ingreso_por_hora,
-    get_estadisticas_quorum_coeficiente
+    contar_ingresos_por_hora,
+    get_estadisticas_quorum_coeficiente,
+    get_quorum_serie
 )
 from app.repositories.asamblea_repository import get_asamblea_by_id
+from app.schemas.registro_schema import RegistroResponse
+from app.core.config import APP_TIMEZONE, ACTIVIDADES_LOTE_MAX
+from app.core.cache import cache_asambleas
+from app.core.database import ReadSessionLocal, es_sesion_replica
+from app.core.exportacion import exportar_csv, exportar_xlsx
+from app.services.archivo_service import get_registros_archivados, get_version_archivo, iterar_registros_archivados
+from app.core.etag import version_etag
 from uuid import UUID
 from typing import Optional, Dict, Any
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+TIPOS_ACTIVIDAD = ("ingreso", "salida", "reingreso")
+# Largo de la columna numero_control (varchar(20) en asamblea_registros y registro_actividad_eventos)
+LARGO_NUMERO_CONTROL = 20
 
 # Servicio para obtener un registro por ID
 def get_registro_service(db: Session, registro_id: UUID):
@@ -41,6 +66,192 @@ def get_registros(db: Session, asamblea_id: UUID):
     
     return registros
 
+# Servicio para obtener los registros de una asamblea como dicts con los campos de RegistroResponse
+def get_registros_rows(db: Session, asamblea_id: UUID):
+    # Verificar que la asamblea existe
+    asamblea = get_asamblea_by_id(db, asamblea_id)
+    if not asamblea:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asamblea no encontrada"
+        )
+    
+    columnas = list(RegistroResponse.model_fields)
+    # Asamblea archivada sin filas en la tabla: se sirve desde el archivo
+    if asamblea.estado == "CERRADA":
+        archivados = get_registros_archivados(db, asamblea_id)
+        if archivados is not None:
+            filas = [{columna: registro.get(columna) for columna in columnas} for registro in archivados]
+            return sorted(filas, key=lambda fila: fila["nombre"])
+
+    return get_registros_rows_by_asamblea(
+        db=db,
+        asamblea_id=asamblea_id,
+        columnas=columnas,
+    )
+
+# Servicio para la sincronización incremental de los registros de una asamblea
+def get_cambios_registros_service(db: Session, asamblea_id: UUID, since: Optional[str] = None):
+    """
+    Sin `since` (o con una asamblea archivada) retorna todos los registros con completo=True;
+    con `since` solo los escritos desde ese cursor y los ids eliminados. El cliente guarda el
+    cursor de la respuesta para la siguiente llamada. Un registro puede repetirse entre dos
+    respuestas: el cliente lo reemplaza por id.
+    """
+    # xid8 es un entero sin signo de 64 bits (hasta 20 dígitos); isdigit solo acepta también dígitos unicode
+    if since is not None and not (len(since) <= 20 and since.isascii() and since.isdigit() and int(since) < 2 ** 64):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido: use el valor 'cursor' de la respuesta anterior",
+        )
+    asamblea = get_asamblea_by_id(db, asamblea_id)
+    if not asamblea:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asamblea no encontrada"
+        )
+
+    cursor = get_cursor_cambios(db)
+    if since is None or get_registros_archivados(db, asamblea_id) is not None:
+        # Las filas archivadas ya no cambian, pero no tienen cambio_txid: se envían completas
+        return {
+            "cursor": cursor,
+            "completo": True,
+            "registros": get_registros_rows(db, asamblea_id),
+            "eliminados": [],
+        }
+
+    columnas = list(RegistroResponse.model_fields)
+    return {
+        "cursor": cursor,
+        "completo": False,
+        "registros": get_registros_cambiados(db, asamblea_id, columnas, since),
+        "eliminados": get_registros_eliminados(db, asamblea_id, since),
+    }
+
+# Columnas de la exportación de registros (una fila por registro)
+COLUMNAS_EXPORTACION = [
+    ("Cédula", "cedula"),
+    ("Nombre", "nombre"),
+    ("Teléfono", "telefono"),
+    ("Correo", "correo"),
+    ("N° Torre / Bloque", "numero_torre"),
+    ("N° Apartamento / Casa", "numero_apartamento"),
+    ("N° Control", "numero_control"),
+    ("Coeficiente", "coeficiente"),
+]
+ENCABEZADOS_EXPORTACION = [titulo for titulo, _ in COLUMNAS_EXPORTACION] + [
+    "Presente",
+    "Hora de ingreso",
+    "Hora de salida",
+    "Actividades",
+    "Poderes",
+    "Unidades representadas",
+]
+
+def _actividades_ordenadas(actividad_ingreso) -> list:
+    if not isinstance(actividad_ingreso, dict):
+        return []
+    actividades = []
+    for clave, valor in actividad_ingreso.items():
+        if isinstance(valor, dict) and clave.startswith("actividad_") and clave[10:].isdigit():
+            actividades.append((int(clave[10:]), valor))
+    return [valor for _, valor in sorted(actividades, key=lambda par: par[0])]
+
+# Fila plana de la exportación: poderes y asistencia calculados a partir de los JSON
+def _fila_exportacion(registro: Dict[str, Any]) -> list:
+    actividades = _actividades_ordenadas(registro.get("actividad_ingreso"))
+    presente = esta_presente(registro.get("actividad_ingreso"))
+    ingresos = [a.get("hora") for a in actividades if (a.get("tipo") or "").lower() in ("ingreso", "reingreso")]
+    salidas = [a.get("hora") for a in actividades if (a.get("tipo") or "").lower() == "salida"]
+
+    unidades = []
+    poderes = registro.get("gestion_poderes")
+    if isinstance(poderes, dict):
+        for clave in sorted(poderes, key=lambda c: int(c[6:]) if c[6:].isdigit() else 0):
+            poder = poderes[clave]
+            if clave == "poder_1" or not isinstance(poder, dict):
+                continue
+            torre = (poder.get("torre") or poder.get("numero_torre") or "").strip()
+            apartamento = (poder.get("apartamento") or poder.get("numero_apartamento") or "").strip()
+            if torre or apartamento:
+                unidades.append(f"{torre}-{apartamento}")
+
+    coeficiente = registro.get("coeficiente")
+    return [
+        *[registro.get(campo) for _, campo in COLUMNAS_EXPORTACION[:-1]],
+        float(coeficiente) if coeficiente is not None else None,
+        "Si" if presente else "No",
+        ingresos[0] if ingresos else None,
+        salidas[-1] if salidas and not presente else None,
+        len(actividades),
+        len(unidades),
+        "; ".join(unidades),
+    ]
+
+# Servicio para exportar los registros de una asamblea en streaming (CSV o XLSX)
+def exportar_registros_service(db: Session, asamblea_id: UUID, formato: str):
+    """
+    Retorna (iterador de bytes, media_type, nombre de archivo). Las filas se leen con un
+    cursor del servidor en una sesión de lectura propia que vive lo que dura la descarga.
+    """
+    asamblea = get_asamblea_by_id(db, asamblea_id)
+    if not asamblea:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asamblea no encontrada"
+        )
+    if formato not in ("csv", "xlsx"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato inválido. Use csv o xlsx"
+        )
+
+    columnas = [campo for _, campo in COLUMNAS_EXPORTACION] + ["actividad_ingreso", "gestion_poderes"]
+    # El archivo ya está ordenado por nombre (se escribe así): se recorre sin cargarlo completo
+    archivados = iterar_registros_archivados(db, asamblea_id) if asamblea.estado == "CERRADA" else None
+
+    def filas():
+        if archivados is not None:
+            for registro in archivados:
+                yield _fila_exportacion(registro)
+            return
+        # Mismo destino que las demás lecturas de reportes (réplica si está configurada)
+        db_stream = ReadSessionLocal()
+        try:
+            for registro in iterar_registros_rows(db_stream, asamblea_id, columnas):
+                yield _fila_exportacion(registro)
+        finally:
+            db_stream.close()
+
+    nombre = f"{asamblea.title or 'asamblea'}_registros.{formato}"
+    if formato == "csv":
+        return exportar_csv(ENCABEZADOS_EXPORTACION, filas()), "text/csv; charset=utf-8", nombre
+    return (
+        exportar_xlsx(ENCABEZADOS_EXPORTACION, filas()),
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        nombre,
+    )
+
+# Valor cacheado por asamblea. Con sesiones de la réplica no se usa la caché: la invalidación
+# llega del primario y un valor leído de una réplica atrasada quedaría guardado como vigente
+def _cacheado(db: Session, asamblea_id: UUID, clave: str, calcular):
+    if es_sesion_replica(db):
+        return calcular()
+    return cache_asambleas.obtener_o_calcular(asamblea_id, clave, calcular)
+
+# Servicio para obtener la versión actual de los registros de una asamblea (ETag)
+def get_registros_version_service(db: Session, asamblea_id: UUID) -> str:
+    # Cacheada por worker; se invalida con las notificaciones de cambios de la BD
+    def calcular():
+        version = get_registros_version(db=db, asamblea_id=asamblea_id)
+        # Sin filas: puede ser una asamblea archivada (la versión es la del archivo)
+        if version.startswith("0:"):
+            return get_version_archivo(db, asamblea_id) or version
+        return version
+
+    return _cacheado(db, asamblea_id, "version", calcular)
+
 # Servicio para buscar registros
 def search_registros_service(
     db: Session,
@@ -123,6 +334,16 @@ def buscar_registro_con_poder_service(
     
     return registro
 
+# Respuesta 409 cuando otra escritura cambió el registro (If-Match desactualizado o carrera)
+def _conflicto_version(db: Session, registro_id: UUID) -> HTTPException:
+    db.rollback()
+    actual = get_registro_by_id(db, registro_id)
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="El registro fue modificado por otra persona. Recargue los datos e intente de nuevo.",
+        headers={"ETag": version_etag(actual.version)} if actual else None,
+    )
+
 # Servicio para actualizar registro
 def update_registro_service(
     db: Session,
@@ -137,6 +358,7 @@ def update_registro_service(
     set_numero_control_none: bool = False,
     gestion_poderes: Optional[Dict[str, Any]] = None,
     actividad_ingreso: Optional[Dict[str, Any]] = None,
+    version_esperada: Optional[int] = None,
 ):
     registro = get_registro_by_id(db, registro_id)
     if not registro:
@@ -145,23 +367,165 @@ def update_registro_service(
             detail="Registro no encontrado"
         )
 
-    registro_actualizado = update_registro(
-        db=db,
-        registro_id=registro_id,
-        cedula=cedula,
-        nombre=nombre,
-        telefono=telefono,
-        correo=correo,
-        numero_torre=numero_torre,
-        numero_apartamento=numero_apartamento,
-        numero_control=numero_control,
-        _numero_control_set_none=set_numero_control_none,
-        gestion_poderes=gestion_poderes,
-        actividad_ingreso=actividad_ingreso,
-    )
+    try:
+        registro_actualizado = update_registro(
+            db=db,
+            registro_id=registro_id,
+            cedula=cedula,
+            nombre=nombre,
+            telefono=telefono,
+            correo=correo,
+            numero_torre=numero_torre,
+            numero_apartamento=numero_apartamento,
+            numero_control=numero_control,
+            _numero_control_set_none=set_numero_control_none,
+            gestion_poderes=gestion_poderes,
+            actividad_ingreso=actividad_ingreso,
+            version_esperada=version_esperada,
+        )
+    except StaleDataError:
+        raise _conflicto_version(db, registro_id)
 
+    cache_asambleas.invalidar_asamblea(registro.asamblea_id)
     return registro_actualizado
 
+# Hora en formato 12 horas ("9:05AM"), el mismo que usaba el frontend (por defecto, la actual)
+def _hora_12h(momento: Optional[datetime] = None) -> str:
+    zona = ZoneInfo(APP_TIMEZONE)
+    momento = momento.astimezone(zona) if momento else datetime.now(zona)
+    hora12 = momento.hour % 12 or 12
+    periodo = "PM" if momento.hour >= 12 else "AM"
+    return f"{hora12}:{momento.minute:02d}{periodo}"
+
+# Servicio para registrar una actividad (ingreso/salida/reingreso) en una sola operación
+def registrar_actividad_service(
+    db: Session,
+    registro_id: UUID,
+    tipo: str,
+    numero_control: Optional[str] = None,
+    version_esperada: Optional[int] = None,
+):
+    """
+    Agrega la siguiente actividad_N con la hora del servidor.
+    - ingreso/reingreso: asigna numero_control (si se envía) al registro y a poder_1.
+    - salida: quita el numero_control del registro.
+    - version_esperada (If-Match): opcional; el append es atómico aunque no se envíe.
+    """
+    tipo = (tipo or "").strip().lower()
+    if tipo not in TIPOS_ACTIVIDAD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de actividad inválido. Valores permitidos: {', '.join(TIPOS_ACTIVIDAD)}"
+        )
+
+    try:
+        registro = append_actividad(
+            db=db,
+            registro_id=registro_id,
+            tipo=tipo,
+            hora=_hora_12h(),
+            numero_control=(numero_control or "").strip() or None,
+            limpiar_control=(tipo == "salida"),
+            version_esperada=version_esperada,
+        )
+    except StaleDataError:
+        raise _conflicto_version(db, registro_id)
+    if not registro:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Registro no encontrado"
+        )
+    cache_asambleas.invalidar_asamblea(registro.asamblea_id)
+    return registro
+
+# Servicio para aplicar en lote las actividades que una mesa registró sin conexión
+def registrar_actividades_lote_service(db: Session, asamblea_id: UUID, eventos: list):
+    """
+    Aplica los eventos en una transacción (ver aplicar_actividades_lote) y retorna un resultado
+    por evento, en el orden recibido:
+    - aplicado: se creó la actividad (clave actividad_N y versión del registro).
+    - duplicado: la idempotency_key ya se había aplicado (se repite el resultado guardado).
+    - no_encontrado: el registro no pertenece a la asamblea.
+    - invalido: tipo o clave de idempotencia no válidos.
+    Los eventos de un mismo registro se aplican por client_timestamp (la hora de la actividad
+    es la de la mesa, no la del servidor; una hora futura se limita a la actual).
+    """
+    if len(eventos) > ACTIVIDADES_LOTE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El lote supera el máximo de {ACTIVIDADES_LOTE_MAX} actividades",
+        )
+    if not get_asamblea_by_id(db, asamblea_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asamblea no encontrada",
+        )
+    if get_registros_archivados(db, asamblea_id) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La asamblea está archivada: sus registros ya no se pueden actualizar.",
+        )
+
+    zona = ZoneInfo(APP_TIMEZONE)
+    ahora = datetime.now(zona)
+    resultados: list = []
+    validos = []
+    claves_vistas = set()
+    for indice, evento in enumerate(eventos):
+        clave = (evento.idempotency_key or "").strip()
+        tipo = (evento.tipo or "").strip().lower()
+        resultado = {"idempotency_key": clave, "registro_id": evento.registro_id}
+        resultados.append(resultado)
+        if not clave or len(clave) > 100:
+            resultado.update(estado="invalido", detail="idempotency_key vacía o de más de 100 caracteres")
+            continue
+        if tipo not in TIPOS_ACTIVIDAD:
+            resultado.update(estado="invalido", detail=f"Tipo de actividad inválido. Valores permitidos: {', '.join(TIPOS_ACTIVIDAD)}")
+            continue
+        numero_control = None if tipo == "salida" else ((evento.numero_control or "").strip() or None)
+        if numero_control and len(numero_control) > LARGO_NUMERO_CONTROL:
+            # Un valor más largo haría fallar el UPDATE de todo el lote
+            resultado.update(estado="invalido", detail=f"numero_control de más de {LARGO_NUMERO_CONTROL} caracteres")
+            continue
+        if clave in claves_vistas:
+            # Repetida dentro del mismo lote: se resuelve con el resultado de la primera
+            continue
+        claves_vistas.add(clave)
+        momento = evento.client_timestamp
+        if momento.tzinfo is None:
+            momento = momento.replace(tzinfo=zona)
+        momento = min(momento, ahora)
+        validos.append((momento, indice, {
+            "idempotency_key": clave,
+            "registro_id": evento.registro_id,
+            "tipo": tipo,
+            "hora": _hora_12h(momento),
+            "numero_control": numero_control,
+            "client_timestamp": momento.isoformat(),
+        }))
+
+    validos.sort(key=lambda item: (item[0], item[1]))
+    aplicados, anteriores = aplicar_actividades_lote(db, asamblea_id, [item[2] for item in validos])
+    if aplicados:
+        cache_asambleas.invalidar_asamblea(asamblea_id)
+
+    vistos = set()
+    for resultado in resultados:
+        if "estado" in resultado:
+            continue
+        clave = resultado["idempotency_key"]
+        if clave in aplicados and clave not in vistos:
+            vistos.add(clave)
+            resultado.update(estado="aplicado", actividad=aplicados[clave]["actividad"], version=aplicados[clave]["version"])
+        elif clave in aplicados or clave in anteriores:
+            previo = aplicados.get(clave) or anteriores[clave]
+            resultado.update(estado="duplicado", actividad=previo["actividad"], version=previo["version"])
+            if previo["registro_id"] != resultado["registro_id"]:
+                resultado["detail"] = "La idempotency_key ya se usó para otro registro"
+        else:
+            resultado["estado"] = "no_encontrado"
+    return {"aplicados": len(aplicados), "resultados": resultados}
+
 # Servicio para transferir un poder de un registro a otro
 def transferir_poder_service(
     db: Session,
@@ -262,8 +626,9 @@ def transferir_poder_service(
             num += 1
         nuevo_poderes_origen = poderes_reorganizados
     
-    # Agregar el poder al registro destino
-    poderes_destino = registro_destino.gestion_poderes or {}
+    # Agregar el poder al registro destino (copia: modificar el dict cargado en la sesión hace
+    # que el ORM lo compare consigo mismo y omita el UPDATE)
+    poderes_destino = dict(registro_destino.gestion_poderes or {})
     if not isinstance(poderes_destino, dict):
         poderes_destino = {}
     
@@ -296,19 +661,25 @@ def transferir_poder_service(
     if not nuevo_poderes_origen:
         nuevo_poderes_origen = {"poder_1": {"torre": "", "apartamento": "", "numero_control": ""}}
     
-    # Actualizar ambos registros
-    update_registro(
-        db=db,
-        registro_id=registro_origen.id,
-        gestion_poderes=nuevo_poderes_origen
-    )
-    
-    update_registro(
-        db=db,
-        registro_id=registro_destino_id,
-        gestion_poderes=poderes_destino_reorganizados
-    )
-    
+    # Actualizar ambos registros en una sola transacción: si otra mesa modificó alguno
+    # desde que se leyó (versión distinta), no se aplica ninguno de los dos cambios
+    try:
+        update_registro(
+            db=db,
+            registro_id=registro_origen.id,
+            gestion_poderes=nuevo_poderes_origen,
+            commit=False
+        )
+        
+        update_registro(
+            db=db,
+            registro_id=registro_destino_id,
+            gestion_poderes=poderes_destino_reorganizados
+        )
+    except StaleDataError:
+        raise _conflicto_version(db, registro_destino_id)
+
+    cache_asambleas.invalidar_asamblea(asamblea_id)
     return {
         "registro_origen": registro_origen,
         "registro_destino": registro_destino
@@ -396,8 +767,8 @@ def devolver_poder_service(
         # Si no quedan poderes, dejar poder_1 vacío
         nuevo_poderes_actuales = {"poder_1": {"torre": "", "apartamento": "", "numero_control": ""}}
     
-    # Agregar el poder al dueño original
-    poderes_dueno = dueno_original.gestion_poderes or {}
+    # Agregar el poder al dueño original (copia, ver transferir_poder_service)
+    poderes_dueno = dict(dueno_original.gestion_poderes or {})
     if not isinstance(poderes_dueno, dict):
         poderes_dueno = {}
     
@@ -442,19 +813,24 @@ def devolver_poder_service(
         poderes_dueno_reorganizados[f"poder_{num}"] = poderes_dueno[key]
         num += 1
     
-    # Actualizar ambos registros
-    registro_actual_actualizado = update_registro(
-        db=db,
-        registro_id=registro_actual_id,
-        gestion_poderes=nuevo_poderes_actuales
-    )
-    
-    dueno_original_actualizado = update_registro(
-        db=db,
-        registro_id=dueno_original.id,
-        gestion_poderes=poderes_dueno_reorganizados
-    )
-    
+    # Actualizar ambos registros en una sola transacción (ver transferir_poder_service)
+    try:
+        registro_actual_actualizado = update_registro(
+            db=db,
+            registro_id=registro_actual_id,
+            gestion_poderes=nuevo_poderes_actuales,
+            commit=False
+        )
+        
+        dueno_original_actualizado = update_registro(
+            db=db,
+            registro_id=dueno_original.id,
+            gestion_poderes=poderes_dueno_reorganizados
+        )
+    except StaleDataError:
+        raise _conflicto_version(db, registro_actual_id)
+
+    cache_asambleas.invalidar_asamblea(asamblea_id)
     return {
         "registro_actual": registro_actual_actualizado,
         "dueno_original": dueno_original_actualizado
@@ -512,10 +888,46 @@ def get_estadisticas_ingreso_por_hora_service(db: Session, asamblea_id: UUID):
             detail="Asamblea no encontrada"
         )
     
-    estadisticas = get_estadisticas_ingreso_por_hora(db=db, asamblea_id=asamblea_id)
+    if asamblea.estado == "CERRADA":
+        archivados = get_registros_archivados(db, asamblea_id)
+        if archivados is not None:
+            return contar_ingresos_por_hora(registro.get("actividad_ingreso") for registro in archivados)
+
+    estadisticas = _cacheado(
+        db, asamblea_id, "ingreso_por_hora", lambda: get_estadisticas_ingreso_por_hora(db=db, asamblea_id=asamblea_id)
+    )
     
     return estadisticas
 
+# Servicio para obtener la serie de tiempo del quorum
+def get_quorum_serie_service(
+    db: Session,
+    asamblea_id: UUID,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+):
+    """
+    Evolución del quorum durante la sesión (una muestra por minuto, para gráficas y el acta).
+    """
+    asamblea = get_asamblea_by_id(db, asamblea_id)
+    if not asamblea:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asamblea no encontrada"
+        )
+    if desde and hasta and desde > hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El parámetro 'desde' debe ser anterior a 'hasta'"
+        )
+
+    return {
+        "asamblea_id": str(asamblea_id),
+        "desde": desde,
+        "hasta": hasta,
+        "muestras": get_quorum_serie(db=db, asamblea_id=asamblea_id, desde=desde, hasta=hasta),
+    }
+
 # Servicio para obtener estadísticas de quorum y coeficiente presente
 def get_estadisticas_quorum_coeficiente_service(db: Session, asamblea_id: UUID):
     """
@@ -529,6 +941,8 @@ def get_estadisticas_quorum_coeficiente_service(db: Session, asamblea_id: UUID):
             detail="Asamblea no encontrada"
         )
     
-    estadisticas = get_estadisticas_quorum_coeficiente(db=db, asamblea_id=asamblea_id)
+    estadisticas = _cacheado(
+        db, asamblea_id, "quorum", lambda: get_estadisticas_quorum_coeficiente(db=db, asamblea_id=asamblea_id)
+    )
     
     return estadisticas
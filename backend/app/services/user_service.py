@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.schemas.user_schema import UserCreate, UserResponse, UserUpdate
-from app.repositories.user_repository import get_by_username, create_user, get_all_users, count_users, get_by_id, update_user, delete_user
+from app.repositories.user_repository import get_by_username, create_user, get_users_page, get_by_id, update_user, delete_user
 from app.core.security import hash_password, verify_password
 from app.models.user_model import User
 from app.schemas.user_schema import UserLogin
@@ -43,14 +43,15 @@ def get_users(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
-    is_admin: Optional[bool] = None
+    is_admin: Optional[bool] = None,
+    include_total: bool = True
 ):
-    users = get_all_users(db, skip=skip, limit=limit, search=search, is_admin=is_admin)
-    total = count_users(db, search=search, is_admin=is_admin)
+    pagina = get_users_page(db, skip=skip, limit=limit, search=search, is_admin=is_admin, include_total=include_total)
     
     return {
-        "users": users,
-        "total": total
+        "users": pagina["items"],
+        "total": pagina["total"],
+        "has_more": pagina["has_more"]
     }
 
 # Servicio para actualizar un usuario
@@ -0,0 +1 @@
+# Benchmarks reproducibles del backend (ejecutar desde la carpeta backend: python -m benchmarks.<modulo>)
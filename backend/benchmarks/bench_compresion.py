@@ -0,0 +1,77 @@
+"""
+Benchmark de compresión de la lista de registros: costo de CPU vs ancho de banda.
+
+Para cada algoritmo/nivel mide el tiempo de compresión y el tamaño resultante, y estima
+el tiempo total (comprimir + transferir) en redes típicas de un salón de asamblea.
+
+Uso (desde la carpeta backend):
+  python -m benchmarks.bench_compresion --registros 5000
+"""
+import argparse
+import statistics
+import time
+import zlib
+
+from app.core.serialization import dumps_json
+from app.schemas.registro_schema import RegistroResponse
+from benchmarks.sintetico import generar_registros
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Anchos de banda efectivos (Mbit/s): wifi congestionado, hotspot móvil, red cableada
+REDES = [("wifi-congestionado", 1), ("hotspot", 5), ("cableada", 50)]
+
+
+def _gzip(nivel):
+    def comprimir(data):
+        obj = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return obj.compress(data) + obj.flush()
+    return comprimir
+
+
+def _brotli(calidad):
+    def comprimir(data):
+        return brotli.compress(data, quality=calidad)
+    return comprimir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=5000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    columnas = list(RegistroResponse.model_fields)
+    filas = [{c: r[c] for c in columnas} for r in generar_registros(args.registros, 1, 3)]
+    data = dumps_json(filas)
+
+    algoritmos = [("identity", lambda d: d)]
+    algoritmos += [(f"gzip-{nivel}", _gzip(nivel)) for nivel in (1, 6, 9)]
+    if brotli is not None:
+        algoritmos += [(f"br-{calidad}", _brotli(calidad)) for calidad in (1, 4, 6, 11)]
+    else:
+        print("(brotli no instalado: se omiten las pruebas br)")
+
+    print(f"Cuerpo JSON: {len(data) / 1024:.0f} KiB ({args.registros} registros)\n")
+    cabecera = f"{'algoritmo':<10} {'KiB':>7} {'ratio':>6} {'cpu ms':>8}"
+    cabecera += "".join(f" {nombre + ' ms':>22}" for nombre, _ in REDES)
+    print(cabecera)
+    for nombre, funcion in algoritmos:
+        tiempos = []
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            salida = funcion(data)
+            tiempos.append(time.perf_counter() - inicio)
+        cpu = statistics.median(tiempos)
+        fila = f"{nombre:<10} {len(salida) / 1024:7.0f} {len(data) / len(salida):6.1f} {cpu * 1000:8.1f}"
+        for _, mbps in REDES:
+            transferencia = len(salida) * 8 / (mbps * 1_000_000)
+            fila += f" {(cpu + transferencia) * 1000:22.0f}"
+        print(fila)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de serialización de la lista de registros (GET /registros/asamblea/{id}).
+
+Compara, sobre una asamblea sintética (sin base de datos):
+  - anterior: objetos ORM -> RegistroResponse.model_validate por fila -> validación de
+    response_model=list[RegistroResponse] -> JSON con la librería estándar
+  - rápido:   filas como dict (lo que devuelve la consulta Core) -> dumps_json (orjson)
+
+Uso (desde la carpeta backend):
+  python -m benchmarks.bench_serializacion --registros 5000 --repeticiones 5
+"""
+import argparse
+import json
+import statistics
+import time
+
+from pydantic import TypeAdapter
+
+from app.core.serialization import dumps_json, orjson
+from app.models.asamblea_model import AsambleaRegistro
+from app.schemas.registro_schema import RegistroResponse
+from benchmarks.sintetico import generar_registros
+
+
+def _ruta_anterior(objetos):
+    registros_response = [RegistroResponse.model_validate(registro) for registro in objetos]
+    # Lo que hace FastAPI con response_model: validar de nuevo y volcar en modo JSON
+    adapter = TypeAdapter(list[RegistroResponse])
+    validados = adapter.validate_python(registros_response, from_attributes=True)
+    contenido = adapter.dump_python(validados, mode="json")
+    return json.dumps(contenido, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _ruta_rapida(filas):
+    return dumps_json(filas)
+
+
+def _medir(funcion, datos, repeticiones: int):
+    tiempos = []
+    salida = b""
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        salida = funcion(datos)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos, len(salida)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=5000)
+    parser.add_argument("--poderes", type=int, default=1, help="Poderes extra por titular")
+    parser.add_argument("--actividades", type=int, default=3, help="Actividades por registro presente")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    columnas = list(RegistroResponse.model_fields)
+    registros = generar_registros(args.registros, args.poderes, args.actividades)
+    objetos = [AsambleaRegistro(**registro) for registro in registros]
+    filas = [{columna: registro[columna] for columna in columnas} for registro in registros]
+
+    t_anterior, bytes_anterior = _medir(_ruta_anterior, objetos, args.repeticiones)
+    t_rapida, bytes_rapida = _medir(_ruta_rapida, filas, args.repeticiones)
+
+    mediana_anterior = statistics.median(t_anterior)
+    mediana_rapida = statistics.median(t_rapida)
+    print(f"Registros: {args.registros}  (encoder: {'orjson' if orjson else 'json estándar'})")
+    print(f"  anterior: {mediana_anterior * 1000:8.1f} ms  ({bytes_anterior / 1024:.0f} KiB)")
+    print(f"  rápido:   {mediana_rapida * 1000:8.1f} ms  ({bytes_rapida / 1024:.0f} KiB)")
+    print(f"  speedup:  {mediana_anterior / mediana_rapida:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Costo de los triggers de asamblea_quorum (migración 0010) en las escrituras.
+
+Mide las mismas escrituras con los triggers de quorum activos y desactivados sobre una
+asamblea sintética (cada operación en su propia transacción, como en la aplicación):
+- actividad: agregar una actividad (camino incremental, suma la diferencia)
+- editar_nombre: cambio que no afecta el quorum (el trigger corre pero no escribe)
+- editar_coeficiente: cambia los dueños de los poderes (recalcula la asamblea)
+- carga: insertar una asamblea completa en lotes
+
+Desactiva los triggers con ALTER TABLE (bloquea la tabla); no usar en producción.
+
+Uso (desde la carpeta backend):
+  python -m benchmarks.bench_triggers_quorum --registros 5000 --operaciones 200
+"""
+import argparse
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.repositories.registro_repository import append_actividad
+from benchmarks.sintetico import crear_asamblea_sintetica, eliminar_asamblea_sintetica
+
+TRIGGERS = ["trg_registros_quorum_insert", "trg_registros_quorum_update", "trg_registros_quorum_delete"]
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, round(p * (len(ordenados) - 1)))]
+
+
+@contextmanager
+def _triggers_quorum(engine, activos: bool):
+    accion = "ENABLE" if activos else "DISABLE"
+    with engine.begin() as conn:
+        for trigger in TRIGGERS:
+            conn.execute(text(f"ALTER TABLE public.asamblea_registros {accion} TRIGGER {trigger}"))
+    try:
+        yield
+    finally:
+        if not activos:
+            with engine.begin() as conn:
+                for trigger in TRIGGERS:
+                    conn.execute(text(f"ALTER TABLE public.asamblea_registros ENABLE TRIGGER {trigger}"))
+
+
+def _medir(operacion: Callable[[int], None], cantidad: int) -> List[float]:
+    tiempos = []
+    for i in range(cantidad):
+        inicio = time.perf_counter()
+        operacion(i)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def _operaciones(engine, SessionLocal, registros) -> Dict[str, Callable[[int], None]]:
+    def actividad(i):
+        db = SessionLocal()
+        try:
+            tipo = "salida" if i % 2 else "ingreso"
+            append_actividad(db, registros[i % len(registros)]["id"], tipo=tipo, hora="9:00AM")
+        finally:
+            db.close()
+
+    def editar_nombre(i):
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE public.asamblea_registros SET nombre = :nombre WHERE id = :id"),
+                {"nombre": f"Benchmark {i}", "id": registros[i % len(registros)]["id"]},
+            )
+
+    def editar_coeficiente(i):
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE public.asamblea_registros SET coeficiente = coeficiente + :delta WHERE id = :id"),
+                {"delta": 0.0001 if i % 2 == 0 else -0.0001, "id": registros[i % len(registros)]["id"]},
+            )
+
+    return {"actividad": actividad, "editar_nombre": editar_nombre, "editar_coeficiente": editar_coeficiente}
+
+
+def _resumen(tiempos: List[float]) -> Dict[str, float]:
+    return {"mediana_ms": statistics.median(tiempos), "p95_ms": _percentil(tiempos, 0.95)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=5000)
+    parser.add_argument("--poderes", type=int, default=1, help="Poderes extra por titular")
+    parser.add_argument("--operaciones", type=int, default=200, help="Escrituras por caso")
+    parser.add_argument("--operaciones-coeficiente", type=int, default=20,
+                        help="Escrituras del caso editar_coeficiente (recalcula toda la asamblea)")
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args(argv)
+
+    from app.core.database import engine, SessionLocal
+
+    if not engine:
+        print("ERROR: No se pudo conectar a la base de datos. Revisa las variables de entorno.")
+        return 1
+
+    resultados = {}
+    for activos in (False, True):
+        modo = "con triggers" if activos else "sin triggers"
+        with _triggers_quorum(engine, activos):
+            inicio = time.perf_counter()
+            sintetica = crear_asamblea_sintetica(engine, args.registros, args.poderes, seed=args.seed)
+            carga_ms = (time.perf_counter() - inicio) * 1000
+            try:
+                casos = {"carga": {"mediana_ms": carga_ms, "p95_ms": carga_ms}}
+                for nombre, operacion in _operaciones(engine, SessionLocal, sintetica["registros"]).items():
+                    cantidad = args.operaciones_coeficiente if nombre == "editar_coeficiente" else args.operaciones
+                    casos[nombre] = _resumen(_medir(operacion, cantidad))
+            finally:
+                eliminar_asamblea_sintetica(engine, sintetica["asamblea_id"])
+        resultados[modo] = casos
+
+    print(f"{args.registros} registros, {args.poderes} poderes extra por titular")
+    print(f"  {'caso':<20} {'sin triggers':>14} {'con triggers':>14} {'costo':>10}")
+    for caso, sin in resultados["sin triggers"].items():
+        con = resultados["con triggers"][caso]
+        costo = con["mediana_ms"] - sin["mediana_ms"]
+        print(
+            f"  {caso:<20} {sin['mediana_ms']:>11.2f} ms {con['mediana_ms']:>11.2f} ms "
+            f"{costo:>+7.2f} ms  (p95 {sin['p95_ms']:.2f} -> {con['p95_ms']:.2f} ms)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
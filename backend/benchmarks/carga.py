@@ -0,0 +1,289 @@
+"""
+Prueba de carga: mesas de registro y residentes actualizando datos al mismo tiempo.
+
+Flujos simulados contra un servidor local (uvicorn):
+  - mesa (lazo cerrado, una tarea por mesa): busca por torre/apto, agrega una actividad de
+    ingreso/salida, a veces transfiere un poder y cada cierto tiempo consulta las estadísticas.
+  - residente (lazo abierto, llegadas Poisson a la tasa pedida): POST /update-users/ingreso
+    seguido de PATCH /update-users/registro.
+
+Reporta por flujo y por paso: cantidad, p50/p95/p99, errores (5xx o fallas de red) y
+rechazos (4xx, p. ej. un poder que otra mesa ya transfirió).
+
+Cada residente envía su propia IP en X-Forwarded-For (10.x.x.x), como los celulares de un
+conjunto detrás del proxy: levante el servidor con RATE_LIMIT_PROXIES=1 para que cada uno use su
+propio bucket por IP. Con RATE_LIMIT_PROXIES=0 (o con --misma-ip) todas las peticiones cuentan
+para la IP del cliente de carga y los límites por IP rechazan (429) buena parte del flujo de
+residentes; para medir capacidad en ese modo, levante el servidor con RATE_LIMIT_ENABLED=false.
+
+Requiere httpx (pip install httpx). Uso (desde la carpeta backend, con el servidor corriendo):
+  python -m benchmarks.carga --url http://localhost:8000 --asamblea-id <uuid> --mesas 8 --residentes-por-min 120 --duracion 60
+  # Sin --asamblea-id crea una asamblea sintética en la BD del .env y la borra al terminar:
+  python -m benchmarks.carga --registros 10000 --mesas 8 --duracion 60 --salida carga.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.sintetico import TIPOS_CICLO, _hora_12h
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+class Resultados:
+    """Latencias (ms) y conteo de errores por nombre de flujo o paso."""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, int] = defaultdict(int)
+        self.rechazos: Dict[str, int] = defaultdict(int)
+
+    def registrar(self, nombre: str, duracion: float, status_code: Optional[int]):
+        self.latencias[nombre].append(duracion * 1000)
+        if status_code is None or status_code >= 500:
+            self.errores[nombre] += 1
+        elif status_code >= 400:
+            self.rechazos[nombre] += 1
+
+    def resumen(self, duracion_total: float) -> Dict[str, Dict[str, Any]]:
+        salida = {}
+        for nombre, valores in sorted(self.latencias.items()):
+            total = len(valores)
+            salida[nombre] = {
+                "cantidad": total,
+                "por_segundo": round(total / duracion_total, 2),
+                "p50_ms": round(_percentil(valores, 0.50), 1),
+                "p95_ms": round(_percentil(valores, 0.95), 1),
+                "p99_ms": round(_percentil(valores, 0.99), 1),
+                "max_ms": round(max(valores), 1),
+                "errores": self.errores[nombre],
+                "tasa_error": round(self.errores[nombre] / total, 4),
+                "rechazos": self.rechazos[nombre],
+            }
+        return salida
+
+
+class Simulador:
+    def __init__(self, client: httpx.AsyncClient, asamblea_id: str, unidades: List[Dict[str, Any]], args, resultados: Resultados):
+        self.client = client
+        self.asamblea_id = asamblea_id
+        self.unidades = unidades
+        self.args = args
+        self.resultados = resultados
+        self.fin = time.monotonic() + args.duracion
+
+    async def _pedir(self, paso: str, metodo: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        inicio = time.perf_counter()
+        try:
+            response = await self.client.request(metodo, url, **kwargs)
+        except httpx.HTTPError:
+            self.resultados.registrar(paso, time.perf_counter() - inicio, None)
+            return None
+        self.resultados.registrar(paso, time.perf_counter() - inicio, response.status_code)
+        return response
+
+    async def _buscar(self, unidad: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await self._pedir(
+            "mesa.buscar", "GET", f"/registros/asamblea/{self.asamblea_id}/buscar",
+            params={"numero_torre": unidad["numero_torre"], "numero_apartamento": unidad["numero_apartamento"]},
+        )
+        if response is None or response.status_code != 200:
+            return None
+        encontrados = response.json()
+        return encontrados[0] if encontrados else None
+
+    async def _agregar_actividad(self, registro: Dict[str, Any]):
+        actividades = dict(registro.get("actividad_ingreso") or {})
+        siguiente = len(actividades) + 1
+        actividades[f"actividad_{siguiente}"] = {
+            "tipo": TIPOS_CICLO[(siguiente - 1) % len(TIPOS_CICLO)],
+            "hora": _hora_12h(datetime.now()),
+        }
+        await self._pedir("mesa.actividad", "PUT", f"/registros/{registro['id']}", json={"actividad_ingreso": actividades})
+
+    async def _transferir(self, registro: Dict[str, Any], rnd: random.Random):
+        # El titular encontrado entrega su propio poder (poder_1) a otra unidad
+        poder = (registro.get("gestion_poderes") or {}).get("poder_1") or {}
+        if not (poder.get("torre") or "").strip():
+            return
+        destino = await self._buscar(rnd.choice(self.unidades))
+        if not destino or destino["id"] == registro["id"]:
+            return
+        await self._pedir(
+            "mesa.transferir", "POST", f"/registros/asamblea/{self.asamblea_id}/poderes/transferir",
+            json={
+                "registro_destino_id": destino["id"],
+                "torre": poder.get("torre") or "",
+                "apartamento": poder.get("apartamento") or "",
+                "numero_control": poder.get("numero_control") or "",
+            },
+        )
+
+    async def _estadisticas(self):
+        base = f"/registros/asamblea/{self.asamblea_id}/estadisticas"
+        await self._pedir("mesa.estadisticas", "GET", f"{base}/quorum-coeficiente")
+        await self._pedir("mesa.estadisticas", "GET", f"{base}/ingreso-por-hora")
+
+    async def mesa(self, numero: int):
+        rnd = random.Random(self.args.seed + numero)
+        ultimo_poll = 0.0
+        while time.monotonic() < self.fin:
+            inicio = time.perf_counter()
+            registro = await self._buscar(rnd.choice(self.unidades))
+            if registro:
+                await self._agregar_actividad(registro)
+                if rnd.random() < self.args.prob_transferencia:
+                    await self._transferir(registro, rnd)
+            if time.monotonic() - ultimo_poll >= self.args.poll_estadisticas:
+                await self._estadisticas()
+                ultimo_poll = time.monotonic()
+            self.resultados.registrar("flujo.mesa", time.perf_counter() - inicio, 200 if registro else 404)
+            await asyncio.sleep(rnd.uniform(0.5, 1.5) * self.args.pausa_mesa)
+
+    async def residente(self, rnd: random.Random):
+        unidad = rnd.choice(self.unidades)
+        headers = {}
+        if not self.args.misma_ip:
+            headers["X-Forwarded-For"] = f"10.{rnd.randrange(256)}.{rnd.randrange(256)}.{rnd.randrange(1, 255)}"
+        inicio = time.perf_counter()
+        response = await self._pedir(
+            "residente.ingreso", "POST", "/update-users/ingreso",
+            headers=headers,
+            json={
+                "asamblea_id": self.asamblea_id,
+                "numero_torre": unidad["numero_torre"],
+                "numero_apartamento": unidad["numero_apartamento"],
+            },
+        )
+        status_code = response.status_code if response is not None else None
+        if response is not None and response.status_code == 200:
+            token = response.json()["token"]
+            response = await self._pedir(
+                "residente.actualizar", "PATCH", "/update-users/registro",
+                headers=headers,
+                json={"token": token, "telefono": f"31{rnd.randrange(10**8):08d}"},
+            )
+            status_code = response.status_code if response is not None else None
+        self.resultados.registrar("flujo.residente", time.perf_counter() - inicio, status_code)
+
+    async def llegadas_residentes(self):
+        """Lazo abierto: las llegadas no esperan a que terminen las anteriores."""
+        if self.args.residentes_por_min <= 0:
+            return
+        rnd = random.Random(self.args.seed)
+        tasa = self.args.residentes_por_min / 60
+        tareas = set()
+        while True:
+            await asyncio.sleep(rnd.expovariate(tasa))
+            if time.monotonic() >= self.fin:
+                break
+            tarea = asyncio.create_task(self.residente(random.Random(rnd.random())))
+            tareas.add(tarea)
+            tarea.add_done_callback(tareas.discard)
+        if tareas:
+            await asyncio.gather(*tareas)
+
+
+async def _cargar_unidades(client: httpx.AsyncClient, asamblea_id: str) -> List[Dict[str, Any]]:
+    response = await client.get(f"/registros/asamblea/{asamblea_id}")
+    response.raise_for_status()
+    return [
+        {"numero_torre": r["numero_torre"], "numero_apartamento": r["numero_apartamento"]}
+        for r in response.json()
+        if r.get("numero_torre") and r.get("numero_apartamento")
+    ]
+
+
+async def _ejecutar(args, asamblea_id: str, unidades: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    limites = httpx.Limits(max_connections=args.mesas + args.max_residentes_concurrentes)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limites) as client:
+        if unidades is None:
+            unidades = await _cargar_unidades(client, asamblea_id)
+        if not unidades:
+            raise RuntimeError("La asamblea no tiene registros con torre y apartamento")
+        resultados = Resultados()
+        simulador = Simulador(client, asamblea_id, unidades, args, resultados)
+        inicio = time.monotonic()
+        await asyncio.gather(
+            *(simulador.mesa(i) for i in range(args.mesas)),
+            simulador.llegadas_residentes(),
+        )
+        return resultados.resumen(time.monotonic() - inicio)
+
+
+def _imprimir(resumen: Dict[str, Dict[str, Any]]):
+    print(f"{'flujo/paso':<22} {'n':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>7} {'4xx':>6}")
+    for nombre, r in resumen.items():
+        print(
+            f"{nombre:<22} {r['cantidad']:>7} {r['por_segundo']:>7.1f} {r['p50_ms']:>8.1f} "
+            f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['tasa_error'] * 100:>6.2f}% {r['rechazos']:>6}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--asamblea-id", help="Asamblea existente (si no se da, se crea una sintética)")
+    parser.add_argument("--registros", type=int, default=10000, help="Tamaño de la asamblea sintética")
+    parser.add_argument("--poderes", type=int, default=1, help="Poderes extra por titular (asamblea sintética)")
+    parser.add_argument("--mesas", type=int, default=8, help="Mesas de registro concurrentes")
+    parser.add_argument("--pausa-mesa", type=float, default=2.0, help="Segundos promedio entre atenciones de una mesa")
+    parser.add_argument("--prob-transferencia", type=float, default=0.1, help="Probabilidad de transferir un poder por atención")
+    parser.add_argument("--poll-estadisticas", type=float, default=5.0, help="Segundos entre consultas de estadísticas por mesa")
+    parser.add_argument("--residentes-por-min", type=float, default=60.0, help="Llegadas de residentes por minuto")
+    parser.add_argument("--max-residentes-concurrentes", type=int, default=50, help="Conexiones HTTP reservadas para residentes")
+    parser.add_argument("--misma-ip", action="store_true", help="No enviar X-Forwarded-For por residente (ver límites por IP)")
+    parser.add_argument("--duracion", type=float, default=60.0, help="Duración de la prueba en segundos")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=2026)
+    parser.add_argument("--salida", help="Archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    engine = None
+    asamblea_id = args.asamblea_id
+    unidades = None
+    if not asamblea_id:
+        from app.core.database import engine
+        from benchmarks.sintetico import crear_asamblea_sintetica
+
+        if not engine:
+            print("ERROR: sin --asamblea-id se necesita la base de datos del .env para crear la asamblea sintética.")
+            return 1
+        sintetica = crear_asamblea_sintetica(engine, args.registros, args.poderes, 0, seed=args.seed)
+        asamblea_id = str(sintetica["asamblea_id"])
+        unidades = [
+            {"numero_torre": r["numero_torre"], "numero_apartamento": r["numero_apartamento"]}
+            for r in sintetica["registros"]
+        ]
+        print(f"Asamblea sintética {asamblea_id} con {args.registros} registros")
+
+    print(f"Carga: {args.mesas} mesas, {args.residentes_por_min:g} residentes/min, {args.duracion:g} s contra {args.url}")
+    try:
+        resumen = asyncio.run(_ejecutar(args, asamblea_id, unidades))
+    finally:
+        if engine is not None:
+            from benchmarks.sintetico import eliminar_asamblea_sintetica
+            eliminar_asamblea_sintetica(engine, sintetica["asamblea_id"])
+
+    _imprimir(resumen)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"parametros": vars(args), "asamblea_id": asamblea_id, "resultados": resumen}, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
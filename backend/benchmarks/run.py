@@ -0,0 +1,204 @@
+"""
+Suite de benchmarks contra PostgreSQL local con una asamblea sintética.
+
+Crea una asamblea con N registros (poderes y actividades configurables), mide las funciones
+clave de servicios/repositorios y escribe los resultados en JSON para comparar versiones.
+Usa las variables de entorno de la base de datos de siempre (.env); no usar en producción.
+
+Uso (desde la carpeta backend):
+  python -m benchmarks.run --registros 10000 --poderes 1 --actividades 3 --salida bench.json
+  python -m benchmarks.run --registros 10000 --comparar bench_anterior.json --tolerancia 0.25
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, Optional
+
+from sqlalchemy import text
+
+from app.core.query_stats import assert_max_queries
+from app.services.registro_service import (
+    get_estadisticas_quorum_coeficiente_service,
+    get_estadisticas_ingreso_por_hora_service,
+    verificar_control_existente_service,
+    verificar_control_en_poderes_service,
+    transferir_poder_service,
+    get_registros_rows,
+    search_registros_service,
+)
+from benchmarks.sintetico import crear_asamblea_sintetica, eliminar_asamblea_sintetica
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def _medir(SessionLocal, funcion: Callable, repeticiones: int, calentamiento: int = 1) -> Dict[str, Any]:
+    """Ejecuta `funcion(db, i)` en una sesión nueva por repetición y resume los tiempos (ms)."""
+    tiempos = []
+    consultas = 0
+    for i in range(calentamiento + repeticiones):
+        db = SessionLocal()
+        try:
+            # Máximo alto: solo interesa el conteo, no fallar
+            with assert_max_queries(10**9) as stats:
+                inicio = time.perf_counter()
+                funcion(db, i)
+                duracion = time.perf_counter() - inicio
+        finally:
+            db.close()
+        if i >= calentamiento:
+            tiempos.append(duracion * 1000)
+            consultas = stats.cantidad
+    return {
+        "min_ms": round(min(tiempos), 3),
+        "mediana_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(_percentil(tiempos, 0.95), 3),
+        "max_ms": round(max(tiempos), 3),
+        "consultas": consultas,
+        "repeticiones": repeticiones,
+    }
+
+
+def _casos(asamblea_id, registros: List[Dict[str, Any]]) -> Dict[str, Callable]:
+    primero, segundo = registros[0], registros[1]
+    medio = registros[len(registros) // 2]
+    ultimo = registros[-1]
+    poder = primero["gestion_poderes"]["poder_1"]
+
+    def transferir(db, i):
+        # Ida y vuelta entre los dos primeros registros para no acumular cambios
+        destino = segundo["id"] if i % 2 == 0 else primero["id"]
+        transferir_poder_service(
+            db=db,
+            asamblea_id=asamblea_id,
+            registro_destino_id=destino,
+            torre=poder["torre"],
+            apartamento=poder["apartamento"],
+            numero_control=poder["numero_control"],
+        )
+
+    return {
+        "quorum": lambda db, i: get_estadisticas_quorum_coeficiente_service(db, asamblea_id),
+        "ingreso_por_hora": lambda db, i: get_estadisticas_ingreso_por_hora_service(db, asamblea_id),
+        "verificar_control": lambda db, i: verificar_control_existente_service(
+            db, asamblea_id, numero_control=str(len(registros) + 1)
+        ),
+        # Control inexistente: recorre todos los poderes (peor caso)
+        "verificar_control_en_poderes": lambda db, i: verificar_control_en_poderes_service(
+            db, asamblea_id, numero_control="no-existe"
+        ),
+        "transferir_poder": transferir,
+        "listar_registros": lambda db, i: get_registros_rows(db, asamblea_id),
+        "buscar_por_cedula": lambda db, i: search_registros_service(db, asamblea_id, cedula=ultimo["cedula"]),
+        "buscar_por_torre_apto": lambda db, i: search_registros_service(
+            db, asamblea_id, numero_torre=medio["numero_torre"], numero_apartamento=medio["numero_apartamento"]
+        ),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _comparar(actual: Dict[str, Any], anterior_path: str, tolerancia: float) -> List[str]:
+    """Casos cuya mediana empeoró más que la tolerancia respecto al archivo anterior."""
+    with open(anterior_path, encoding="utf-8") as f:
+        anterior = json.load(f)
+    regresiones = []
+    for caso, datos in actual["resultados"].items():
+        base = anterior.get("resultados", {}).get(caso)
+        if not base or not base.get("mediana_ms"):
+            continue
+        cambio = datos["mediana_ms"] / base["mediana_ms"] - 1
+        marca = "REGRESIÓN" if cambio > tolerancia else ""
+        print(f"  {caso:<30} {base['mediana_ms']:>10.2f} -> {datos['mediana_ms']:>10.2f} ms ({cambio:+.0%}) {marca}")
+        if marca:
+            regresiones.append(caso)
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=10000)
+    parser.add_argument("--poderes", type=int, default=1, help="Poderes extra por titular")
+    parser.add_argument("--actividades", type=int, default=3, help="Actividades por registro presente")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=2026)
+    parser.add_argument("--casos", nargs="*", help="Solo estos casos (por defecto todos)")
+    parser.add_argument("--salida", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Empeoramiento máximo aceptado (0.2 = 20%%)")
+    parser.add_argument("--mantener", action="store_true", help="No borrar la asamblea sintética al terminar")
+    args = parser.parse_args(argv)
+
+    from app.core.database import engine, SessionLocal
+
+    if not engine:
+        print("ERROR: No se pudo conectar a la base de datos. Revisa las variables de entorno.")
+        return 1
+
+    print(f"Creando asamblea sintética: {args.registros} registros, {args.poderes} poderes extra, {args.actividades} actividades")
+    inicio = time.perf_counter()
+    sintetica = crear_asamblea_sintetica(
+        engine, args.registros, args.poderes, args.actividades, seed=args.seed
+    )
+    asamblea_id = sintetica["asamblea_id"]
+    print(f"  insertada en {time.perf_counter() - inicio:.1f} s (asamblea {asamblea_id})")
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("ANALYZE asamblea_registros"))
+            version_pg = conn.execute(text("SHOW server_version")).scalar()
+
+        resultados = {}
+        for nombre, funcion in _casos(asamblea_id, sintetica["registros"]).items():
+            if args.casos and nombre not in args.casos:
+                continue
+            resultados[nombre] = _medir(SessionLocal, funcion, args.repeticiones)
+            r = resultados[nombre]
+            print(f"  {nombre:<30} mediana {r['mediana_ms']:>10.2f} ms  p95 {r['p95_ms']:>10.2f} ms  {r['consultas']} consultas")
+    finally:
+        if not args.mantener:
+            eliminar_asamblea_sintetica(engine, asamblea_id)
+
+    salida = {
+        "fecha": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "postgres": version_pg,
+        "parametros": {
+            "registros": args.registros,
+            "poderes_por_titular": args.poderes,
+            "actividades_por_registro": args.actividades,
+            "repeticiones": args.repeticiones,
+            "seed": args.seed,
+        },
+        "resultados": resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(salida, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        print(f"Comparación con {args.comparar}:")
+        if _comparar(salida, args.comparar, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Generador de datos sintéticos con la forma real de asamblea_registros
+(gestion_poderes con poder_N y actividad_ingreso con actividad_N).
+
+generar_registros no necesita base de datos; crear_asamblea_sintetica inserta una asamblea
+completa en PostgreSQL para los benchmarks que miden consultas reales.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Dict, Any
+
+from sqlalchemy import insert
+
+TIPOS_CICLO = ["ingreso", "salida", "reingreso", "salida"]
+
+
+def _hora_12h(momento: datetime) -> str:
+    hora12 = momento.hour % 12 or 12
+    periodo = "PM" if momento.hour >= 12 else "AM"
+    return f"{hora12}:{momento.minute:02d}{periodo}"
+
+
+def generar_actividades(cantidad: int, inicio: datetime, rnd: random.Random) -> Dict[str, Any]:
+    """actividad_1..N alternando ingreso/salida/reingreso, con horas crecientes."""
+    actividades = {}
+    momento = inicio
+    for i in range(cantidad):
+        momento += timedelta(minutes=rnd.randint(1, 45))
+        actividades[f"actividad_{i + 1}"] = {
+            "tipo": TIPOS_CICLO[i % len(TIPOS_CICLO)],
+            "hora": _hora_12h(momento),
+        }
+    return actividades
+
+
+def generar_registros(
+    cantidad: int,
+    poderes_por_titular: int = 0,
+    actividades_por_registro: int = 2,
+    asamblea_id: uuid.UUID = None,
+    seed: int = 2026,
+) -> List[Dict[str, Any]]:
+    """
+    Genera `cantidad` registros como dicts con las columnas de AsambleaRegistro.
+
+    - poderes_por_titular: poderes extra (poder_2..N) asignados a cada titular; los poderes
+      apuntan a unidades reales de otros registros, como ocurre tras transferir poderes.
+    - actividades_por_registro: actividades en actividad_ingreso de cada registro presente
+      (alrededor de 2/3 de los registros tienen actividad).
+    """
+    rnd = random.Random(seed)
+    asamblea_id = asamblea_id or uuid.uuid4()
+    ahora = datetime.now(timezone.utc)
+    inicio = ahora.replace(hour=8, minute=0, second=0, microsecond=0)
+
+    unidades = []
+    torres = max(1, cantidad // 200)
+    for i in range(cantidad):
+        unidades.append((str(i % torres + 1), str(100 + i // torres)))
+
+    registros = []
+    for i, (torre, apto) in enumerate(unidades):
+        poderes = {
+            "poder_1": {"torre": torre, "apartamento": apto, "numero_control": str(i + 1)},
+        }
+        for p in range(poderes_por_titular):
+            otra_torre, otro_apto = unidades[rnd.randrange(cantidad)]
+            poderes[f"poder_{p + 2}"] = {
+                "torre": otra_torre,
+                "apartamento": otro_apto,
+                "numero_control": "",
+            }
+        con_actividad = actividades_por_registro > 0 and rnd.random() < 0.66
+        registros.append({
+            "id": uuid.uuid4(),
+            "asamblea_id": asamblea_id,
+            "cedula": str(10_000_000 + i),
+            "nombre": f"Propietario {i:05d}",
+            "telefono": f"300{i:07d}",
+            "correo": f"propietario{i}@example.com",
+            "numero_torre": torre,
+            "numero_apartamento": apto,
+            "numero_control": str(i + 1) if con_actividad else None,
+            "coeficiente": Decimal(f"{rnd.uniform(0.05, 0.3):.4f}"),
+            "actividad_ingreso": generar_actividades(actividades_por_registro, inicio, rnd) if con_actividad else None,
+            "gestion_poderes": poderes,
+            "created_at": ahora,
+            "updated_at": ahora,
+            "version": 1,
+        })
+    return registros
+
+
+def crear_asamblea_sintetica(
+    engine,
+    registros: int,
+    poderes_por_titular: int = 0,
+    actividades_por_registro: int = 2,
+    seed: int = 2026,
+    lote: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Inserta una asamblea ACTIVA con sus registros sintéticos (en lotes de `lote` filas).
+    Retorna {"asamblea_id", "registros"} con los dicts insertados.
+    """
+    from app.models.asamblea_model import Asamblea, AsambleaRegistro
+
+    asamblea_id = uuid.uuid4()
+    filas = generar_registros(
+        registros,
+        poderes_por_titular=poderes_por_titular,
+        actividades_por_registro=actividades_por_registro,
+        asamblea_id=asamblea_id,
+        seed=seed,
+    )
+    with engine.begin() as conn:
+        conn.execute(insert(Asamblea.__table__).values(
+            id=asamblea_id,
+            title=f"Benchmark {registros} registros",
+            description="Asamblea sintética generada por benchmarks.sintetico",
+            estado="ACTIVA",
+            created_by="benchmark",
+        ))
+        for inicio in range(0, len(filas), lote):
+            conn.execute(insert(AsambleaRegistro.__table__), filas[inicio:inicio + lote])
+    return {"asamblea_id": asamblea_id, "registros": filas}
+
+
+def eliminar_asamblea_sintetica(engine, asamblea_id: uuid.UUID):
+    """Borra la asamblea sintética (los registros se eliminan en cascada)."""
+    from app.models.asamblea_model import Asamblea
+
+    with engine.begin() as conn:
+        conn.execute(Asamblea.__table__.delete().where(Asamblea.__table__.c.id == asamblea_id))
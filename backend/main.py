@@ -1,11 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import router
-from app.core.database import engine, Base
-from app.core.config import CORS_ORIGINS
-from app.models.user_model import User
-from app.models.asamblea_model import Asamblea, AsambleaRegistro
-from app.models.email_model import Email  # noqa: F401 - registra la tabla emails en Base.metadata
+from app.core.config import CORS_ORIGINS, COMPRESSION_MINIMUM_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, iniciar_flush_periodico
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.idempotencia import IdempotencyMiddleware
+from app.core.migrations import get_schema_status
+from app.core.notificaciones import iniciar_listener, detener_listener
+from app.core.salud import iniciar_verificador, detener_verificador
 import logging
 
 # Configurar logging
@@ -14,6 +17,10 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="API", version="1.0.0", root_path="/api")
 
+# Idempotency-Key en POST/PUT de /registros y /asambleas; se registra primero (queda dentro
+# de CORS y de la compresión) para guardar la respuesta sin comprimir y sin headers CORS
+app.add_middleware(IdempotencyMiddleware)
+
 # Configuración de CORS (configurable mediante variable de entorno CORS_ORIGINS)
 app.add_middleware(
     CORSMiddleware,
@@ -21,20 +28,54 @@ app.add_middleware(
     allow_credentials=True,  # Permite cookies
     allow_methods=["*"],  # Permite todos los métodos HTTP
     allow_headers=["*"],  # Permite todos los headers
+    expose_headers=["ETag", "Server-Timing", "Idempotent-Replayed", "Retry-After"],  # ETag (GET condicionales, If-Match), tiempos de BD por petición, respuestas repetidas por Idempotency-Key y espera de reintento (409 en curso, 429)
+)
+
+# Compresión brotli/gzip de respuestas grandes (listas de registros, exportaciones)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
 )
 
-# Evento de inicio: crear tablas de la base de datos
+# Conteo de consultas SQL por petición (header Server-Timing, warnings de N+1)
+app.add_middleware(QueryStatsMiddleware)
+
+# Métricas por ruta (latencia y conteo); se registra al final para medir la petición completa
+app.add_middleware(MetricsMiddleware)
+
+# Evento de inicio: verificar la versión del esquema (las tablas se crean con las migraciones)
 @app.on_event("startup")
 async def startup_event():
-    from app.core.database import engine
+    from app.core.database import engine, calentar_pools
+    iniciar_flush_periodico()
     if engine:
         try:
-            Base.metadata.create_all(bind=engine)
-            logger.info("Tablas de la base de datos creadas/verificadas exitosamente")
+            schema = get_schema_status(engine)
+            if schema["al_dia"]:
+                logger.info(f"Esquema de la base de datos al día (versión {schema['version_actual']})")
+            else:
+                logger.warning(
+                    f"Esquema de la base de datos en versión {schema['version_actual']}, "
+                    f"se esperaba {schema['version_esperada']}. "
+                    "Ejecuta: python -m app.core.migrations upgrade"
+                )
         except Exception as e:
-            logger.warning(f"No se pudieron crear las tablas al iniciar: {e}")
-            logger.info("El servidor continuará, pero las tablas deben crearse manualmente o cuando la conexión esté disponible")
+            logger.warning(f"No se pudo verificar la versión del esquema al iniciar: {e}")
+            logger.info("El servidor continuará, pero las tablas deben crearse con las migraciones cuando la conexión esté disponible")
+        # Abrir las primeras conexiones para que la primera petición no espere el handshake
+        calentar_pools()
+        # Invalidación de la caché en memoria entre workers (LISTEN/NOTIFY)
+        iniciar_listener(engine)
     else:
         logger.warning("Motor de base de datos no disponible. Configure las variables de entorno para habilitar la conexión.")
+    # Estado para /health/ready (sin motor queda en "no listo")
+    iniciar_verificador()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    detener_listener()
+    detener_verificador()
 
 app.include_router(router)
\ No newline at end of file
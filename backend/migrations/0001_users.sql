@@ -1,10 +1,6 @@
 -- public.users definition
 
--- Drop table
-
--- DROP TABLE public.users;
-
-CREATE TABLE public.users (
+CREATE TABLE IF NOT EXISTS public.users (
 	id uuid DEFAULT gen_random_uuid() NOT NULL,
 	"name" varchar(100) NOT NULL,
 	last_name varchar(100) NOT NULL,
@@ -15,4 +11,4 @@ CREATE TABLE public.users (
 	updated_at timestamp DEFAULT now() NULL,
 	CONSTRAINT users_pkey PRIMARY KEY (id),
 	CONSTRAINT users_username_key UNIQUE (username)
-);
\ No newline at end of file
+);
@@ -1,10 +1,6 @@
 -- public.asambleas definition
 
--- Drop table
-
--- DROP TABLE public.asambleas;
-
-CREATE TABLE public.asambleas (
+CREATE TABLE IF NOT EXISTS public.asambleas (
 	id uuid DEFAULT gen_random_uuid() NOT NULL,
 	title varchar(100) NOT NULL,
 	description text NULL,
@@ -16,4 +12,7 @@ CREATE TABLE public.asambleas (
 	fecha_final timestamptz NULL,
 	CONSTRAINT asambleas_estado_check CHECK (((estado)::text = ANY ((ARRAY['CREADA'::character varying, 'ACTIVA'::character varying, 'CERRADA'::character varying])::text[]))),
 	CONSTRAINT asambleas_pkey PRIMARY KEY (id)
-);
\ No newline at end of file
+);
+
+-- Bases creadas antes de que existiera fecha_final
+ALTER TABLE public.asambleas ADD COLUMN IF NOT EXISTS fecha_final timestamptz NULL;
@@ -1,4 +1,6 @@
-CREATE TABLE public.asamblea_registros (
+-- public.asamblea_registros definition
+
+CREATE TABLE IF NOT EXISTS public.asamblea_registros (
 	id uuid DEFAULT gen_random_uuid() NOT NULL,
 	asamblea_id uuid NOT NULL,
 	cedula varchar(20) NOT NULL,
@@ -16,4 +18,13 @@ CREATE TABLE public.asamblea_registros (
 	CONSTRAINT asamblea_registros_pkey PRIMARY KEY (id)
 );
 
-ALTER TABLE public.asamblea_registros ADD CONSTRAINT asamblea_registros_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE;
\ No newline at end of file
+-- public.asamblea_registros foreign keys
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE conname = 'asamblea_registros_asamblea_fk'
+  ) THEN
+    ALTER TABLE public.asamblea_registros ADD CONSTRAINT asamblea_registros_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE;
+  END IF;
+END $$;
@@ -1,10 +1,6 @@
 -- public.emails definition
 
--- Drop table
-
--- DROP TABLE public.emails;
-
-CREATE TABLE public.emails (
+CREATE TABLE IF NOT EXISTS public.emails (
 	id uuid DEFAULT gen_random_uuid() NOT NULL,
 	asamblea_id uuid NOT NULL,
 	destinatario varchar(255) NOT NULL,
@@ -18,7 +14,13 @@ CREATE TABLE public.emails (
 	CONSTRAINT emails_tipo_check CHECK (((tipo)::text = ANY (ARRAY[('REPORTE CONTROL'::character varying)::text, ('ENVIO QR'::character varying)::text, ('ACTUALIZACION'::character varying)::text])))
 );
 
-
 -- public.emails foreign keys
 
-ALTER TABLE public.emails ADD CONSTRAINT emails_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE;
\ No newline at end of file
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE conname = 'emails_asamblea_fk'
+  ) THEN
+    ALTER TABLE public.emails ADD CONSTRAINT emails_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE;
+  END IF;
+END $$;
@@ -1,5 +1,4 @@
 -- Token único por registro para acceso a actualización de datos (link en correo / QR).
--- Ejecutar todo el script completo en este orden.
 
 -- Paso 1: Añadir la columna si no existe
 DO $$
@@ -0,0 +1,14 @@
+-- Búsqueda de texto completo en asambleas (título con más peso que descripción)
+
+ALTER TABLE public.asambleas ADD COLUMN IF NOT EXISTS search_vector tsvector
+	GENERATED ALWAYS AS (
+		setweight(to_tsvector('spanish'::regconfig, coalesce(title, '')), 'A') ||
+		setweight(to_tsvector('spanish'::regconfig, coalesce(description, '')), 'B')
+	) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_asambleas_search_vector
+ON public.asambleas USING gin (search_vector);
+
+-- Paginación por cursor (keyset) sobre (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_asambleas_created_at_id
+ON public.asambleas (created_at, id);
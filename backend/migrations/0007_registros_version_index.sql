@@ -0,0 +1,5 @@
+-- Versión barata de los registros de una asamblea (ETag): count, max y suma de updated_at
+-- se resuelven con un index-only scan sobre este índice.
+
+CREATE INDEX IF NOT EXISTS idx_asamblea_registros_asamblea_updated_at
+ON public.asamblea_registros (asamblea_id, updated_at);
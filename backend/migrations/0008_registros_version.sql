@@ -0,0 +1,5 @@
+-- Control de concurrencia optimista: cada escritura de un registro incrementa version.
+-- La API la expone en RegistroResponse y como ETag; los PUT con If-Match desactualizado reciben 409.
+
+ALTER TABLE public.asamblea_registros
+ADD COLUMN IF NOT EXISTS version integer DEFAULT 1 NOT NULL;
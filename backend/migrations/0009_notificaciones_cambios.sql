@@ -0,0 +1,88 @@
+-- Notificaciones de cambios para invalidar las cachés en memoria de cada worker.
+-- Canal: comerciovip_cambios. Payload JSON: {"tabla", "op", "asamblea_id", "registro_id"}.
+-- Triggers por sentencia (no por fila): una carga masiva envía una notificación por asamblea,
+-- con registro_id solo cuando la sentencia tocó un único registro.
+-- PostgreSQL entrega las notificaciones al hacer COMMIT (nunca si hay ROLLBACK).
+
+CREATE OR REPLACE FUNCTION public.notificar_cambios_registros() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  fila record;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    FOR fila IN
+      SELECT asamblea_id, CASE WHEN count(*) = 1 THEN min(id::text) END AS registro_id
+      FROM filas_viejas GROUP BY asamblea_id
+    LOOP
+      PERFORM pg_notify('comerciovip_cambios', json_build_object(
+        'tabla', TG_TABLE_NAME, 'op', TG_OP,
+        'asamblea_id', fila.asamblea_id, 'registro_id', fila.registro_id)::text);
+    END LOOP;
+  ELSE
+    FOR fila IN
+      SELECT asamblea_id, CASE WHEN count(*) = 1 THEN min(id::text) END AS registro_id
+      FROM filas_nuevas GROUP BY asamblea_id
+    LOOP
+      PERFORM pg_notify('comerciovip_cambios', json_build_object(
+        'tabla', TG_TABLE_NAME, 'op', TG_OP,
+        'asamblea_id', fila.asamblea_id, 'registro_id', fila.registro_id)::text);
+    END LOOP;
+  END IF;
+  RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION public.notificar_cambios_asambleas() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  fila record;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    FOR fila IN SELECT id FROM filas_viejas LOOP
+      PERFORM pg_notify('comerciovip_cambios', json_build_object(
+        'tabla', TG_TABLE_NAME, 'op', TG_OP, 'asamblea_id', fila.id, 'registro_id', NULL)::text);
+    END LOOP;
+  ELSE
+    FOR fila IN SELECT id FROM filas_nuevas LOOP
+      PERFORM pg_notify('comerciovip_cambios', json_build_object(
+        'tabla', TG_TABLE_NAME, 'op', TG_OP, 'asamblea_id', fila.id, 'registro_id', NULL)::text);
+    END LOOP;
+  END IF;
+  RETURN NULL;
+END $$;
+
+-- Las tablas de transición exigen un trigger por evento
+DROP TRIGGER IF EXISTS trg_registros_notificar_insert ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_notificar_insert
+AFTER INSERT ON public.asamblea_registros
+REFERENCING NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION public.notificar_cambios_registros();
+
+DROP TRIGGER IF EXISTS trg_registros_notificar_update ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_notificar_update
+AFTER UPDATE ON public.asamblea_registros
+REFERENCING NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION public.notificar_cambios_registros();
+
+DROP TRIGGER IF EXISTS trg_registros_notificar_delete ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_notificar_delete
+AFTER DELETE ON public.asamblea_registros
+REFERENCING OLD TABLE AS filas_viejas
+FOR EACH STATEMENT EXECUTE FUNCTION public.notificar_cambios_registros();
+
+DROP TRIGGER IF EXISTS trg_asambleas_notificar_insert ON public.asambleas;
+CREATE TRIGGER trg_asambleas_notificar_insert
+AFTER INSERT ON public.asambleas
+REFERENCING NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION public.notificar_cambios_asambleas();
+
+DROP TRIGGER IF EXISTS trg_asambleas_notificar_update ON public.asambleas;
+CREATE TRIGGER trg_asambleas_notificar_update
+AFTER UPDATE ON public.asambleas
+REFERENCING NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION public.notificar_cambios_asambleas();
+
+DROP TRIGGER IF EXISTS trg_asambleas_notificar_delete ON public.asambleas;
+CREATE TRIGGER trg_asambleas_notificar_delete
+AFTER DELETE ON public.asambleas
+REFERENCING OLD TABLE AS filas_viejas
+FOR EACH STATEMENT EXECUTE FUNCTION public.notificar_cambios_asambleas();
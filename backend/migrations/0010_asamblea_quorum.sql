@@ -0,0 +1,191 @@
+-- Resumen de quorum por asamblea mantenido por triggers sobre asamblea_registros.
+-- get_estadisticas_quorum_coeficiente pasa a leer una sola fila, igual en todos los nodos.
+--
+-- Reglas (mismas que registro_repository.calcular_estadisticas_quorum_coeficiente):
+-- - Presente: la última actividad_N (por N) es ingreso o reingreso.
+-- - Coeficiente presente de un registro: su coeficiente + el coeficiente del dueño original de
+--   cada poder distinto de poder_1 (dueño = primer registro de la asamblea con esa torre y
+--   apartamento, por created_at, id).
+--
+-- Mantenimiento por sentencia:
+-- - UPDATE que solo cambia actividad_ingreso / gestion_poderes: suma la diferencia de aportes.
+-- - INSERT, DELETE o cambios de coeficiente / torre / apartamento (cambian los dueños):
+--   recalcula la asamblea completa con recalcular_asamblea_quorum, que también sirve de reparación.
+
+CREATE TABLE IF NOT EXISTS public.asamblea_quorum (
+	asamblea_id uuid NOT NULL,
+	total_registros integer DEFAULT 0 NOT NULL,
+	registros_presentes integer DEFAULT 0 NOT NULL,
+	total_coeficiente numeric DEFAULT 0 NOT NULL,
+	coeficiente_presente numeric DEFAULT 0 NOT NULL,
+	updated_at timestamptz DEFAULT now() NOT NULL,
+	CONSTRAINT asamblea_quorum_pkey PRIMARY KEY (asamblea_id),
+	CONSTRAINT asamblea_quorum_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE
+);
+
+-- Búsqueda del dueño original de un poder (torre, apartamento normalizados)
+CREATE INDEX IF NOT EXISTS idx_asamblea_registros_unidad
+ON public.asamblea_registros (
+	asamblea_id,
+	lower(btrim(coalesce(numero_torre, ''))),
+	lower(btrim(coalesce(numero_apartamento, '')))
+);
+
+CREATE OR REPLACE FUNCTION public.registro_esta_presente(actividad jsonb) RETURNS boolean
+LANGUAGE sql IMMUTABLE AS $$
+  SELECT coalesce((
+    SELECT lower(a.valor ->> 'tipo') IN ('ingreso', 'reingreso')
+    FROM jsonb_each(CASE WHEN jsonb_typeof(actividad) = 'object' THEN actividad ELSE '{}'::jsonb END) AS a(clave, valor)
+    WHERE a.clave ~ '^actividad_[0-9]+$' AND jsonb_typeof(a.valor) = 'object' AND a.valor ? 'tipo'
+    ORDER BY substring(a.clave FROM 11)::numeric DESC
+    LIMIT 1
+  ), false)
+$$;
+
+CREATE OR REPLACE FUNCTION public.quorum_coeficiente_dueno(p_asamblea_id uuid, p_torre text, p_apartamento text)
+RETURNS numeric
+LANGUAGE sql STABLE AS $$
+  SELECT r.coeficiente
+  FROM public.asamblea_registros r
+  WHERE r.asamblea_id = p_asamblea_id
+    AND lower(btrim(coalesce(r.numero_torre, ''))) = p_torre
+    AND lower(btrim(coalesce(r.numero_apartamento, ''))) = p_apartamento
+  ORDER BY r.created_at, r.id
+  LIMIT 1
+$$;
+
+-- Coeficiente que aporta un registro al quorum (0 si no está presente)
+CREATE OR REPLACE FUNCTION public.quorum_aporte_registro(
+  p_asamblea_id uuid, p_coeficiente numeric, p_actividad jsonb, p_poderes jsonb
+) RETURNS numeric
+LANGUAGE sql STABLE AS $$
+  SELECT CASE WHEN NOT public.registro_esta_presente(p_actividad) THEN 0::numeric
+  ELSE coalesce(p_coeficiente, 0) + coalesce((
+    SELECT sum(public.quorum_coeficiente_dueno(p_asamblea_id, p.torre, p.apartamento))
+    FROM (
+      SELECT
+        lower(btrim(coalesce(nullif(e.valor ->> 'torre', ''), nullif(e.valor ->> 'numero_torre', ''), ''))) AS torre,
+        lower(btrim(coalesce(nullif(e.valor ->> 'apartamento', ''), nullif(e.valor ->> 'numero_apartamento', ''), ''))) AS apartamento
+      FROM jsonb_each(CASE WHEN jsonb_typeof(p_poderes) = 'object' THEN p_poderes ELSE '{}'::jsonb END) AS e(clave, valor)
+      WHERE e.clave <> 'poder_1' AND jsonb_typeof(e.valor) = 'object'
+    ) p
+    WHERE p.torre <> '' OR p.apartamento <> ''
+  ), 0) END
+$$;
+
+-- Recalcula desde cero el resumen de una asamblea (también para reparar desvíos)
+CREATE OR REPLACE FUNCTION public.recalcular_asamblea_quorum(p_asamblea_id uuid) RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+  -- La asamblea pudo borrarse en esta misma transacción (ON DELETE CASCADE de sus registros)
+  IF NOT EXISTS (SELECT 1 FROM public.asambleas WHERE id = p_asamblea_id) THEN
+    RETURN;
+  END IF;
+
+  -- Bloquear la fila antes de calcular: el cálculo (nueva instantánea) ve todo lo confirmado
+  -- por quien la tenía bloqueada, y los que esperan suman su diferencia sobre este resultado
+  INSERT INTO public.asamblea_quorum (asamblea_id) VALUES (p_asamblea_id)
+  ON CONFLICT (asamblea_id) DO NOTHING;
+  PERFORM 1 FROM public.asamblea_quorum WHERE asamblea_id = p_asamblea_id FOR UPDATE;
+
+  UPDATE public.asamblea_quorum q SET
+    total_registros = s.total_registros,
+    registros_presentes = s.registros_presentes,
+    total_coeficiente = s.total_coeficiente,
+    coeficiente_presente = s.coeficiente_presente,
+    updated_at = now()
+  FROM (
+    SELECT
+      count(*) AS total_registros,
+      count(*) FILTER (WHERE public.registro_esta_presente(r.actividad_ingreso)) AS registros_presentes,
+      coalesce(sum(r.coeficiente), 0) AS total_coeficiente,
+      coalesce(sum(public.quorum_aporte_registro(r.asamblea_id, r.coeficiente, r.actividad_ingreso, r.gestion_poderes)), 0)
+        AS coeficiente_presente
+    FROM public.asamblea_registros r
+    WHERE r.asamblea_id = p_asamblea_id
+  ) s
+  WHERE q.asamblea_id = p_asamblea_id;
+END $$;
+
+CREATE OR REPLACE FUNCTION public.mantener_asamblea_quorum() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  fila record;
+  recalculadas uuid[] := '{}';
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    FOR fila IN SELECT DISTINCT asamblea_id FROM filas_nuevas LOOP
+      PERFORM public.recalcular_asamblea_quorum(fila.asamblea_id);
+    END LOOP;
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'DELETE' THEN
+    FOR fila IN SELECT DISTINCT asamblea_id FROM filas_viejas LOOP
+      PERFORM public.recalcular_asamblea_quorum(fila.asamblea_id);
+    END LOOP;
+    RETURN NULL;
+  END IF;
+
+  -- UPDATE que cambia los dueños de los poderes: recalcular las asambleas afectadas
+  FOR fila IN
+    SELECT DISTINCT x.asamblea_id
+    FROM filas_nuevas n
+    JOIN filas_viejas v ON v.id = n.id
+    CROSS JOIN LATERAL (VALUES (n.asamblea_id), (v.asamblea_id)) AS x(asamblea_id)
+    WHERE n.asamblea_id IS DISTINCT FROM v.asamblea_id
+       OR n.coeficiente IS DISTINCT FROM v.coeficiente
+       OR lower(btrim(coalesce(n.numero_torre, ''))) IS DISTINCT FROM lower(btrim(coalesce(v.numero_torre, '')))
+       OR lower(btrim(coalesce(n.numero_apartamento, ''))) IS DISTINCT FROM lower(btrim(coalesce(v.numero_apartamento, '')))
+  LOOP
+    PERFORM public.recalcular_asamblea_quorum(fila.asamblea_id);
+    recalculadas := recalculadas || fila.asamblea_id;
+  END LOOP;
+
+  -- Resto (ingresos, salidas, poderes): sumar la diferencia de aportes
+  FOR fila IN
+    SELECT
+      n.asamblea_id,
+      sum(public.registro_esta_presente(n.actividad_ingreso)::int
+          - public.registro_esta_presente(v.actividad_ingreso)::int) AS presentes,
+      sum(public.quorum_aporte_registro(n.asamblea_id, n.coeficiente, n.actividad_ingreso, n.gestion_poderes)
+          - public.quorum_aporte_registro(v.asamblea_id, v.coeficiente, v.actividad_ingreso, v.gestion_poderes)) AS aporte
+    FROM filas_nuevas n
+    JOIN filas_viejas v ON v.id = n.id
+    WHERE NOT (n.asamblea_id = ANY (recalculadas))
+      AND (n.actividad_ingreso IS DISTINCT FROM v.actividad_ingreso
+           OR n.gestion_poderes IS DISTINCT FROM v.gestion_poderes)
+    GROUP BY n.asamblea_id
+  LOOP
+    UPDATE public.asamblea_quorum SET
+      registros_presentes = registros_presentes + fila.presentes,
+      coeficiente_presente = coeficiente_presente + fila.aporte,
+      updated_at = now()
+    WHERE asamblea_id = fila.asamblea_id;
+    IF NOT FOUND THEN
+      PERFORM public.recalcular_asamblea_quorum(fila.asamblea_id);
+    END IF;
+  END LOOP;
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_registros_quorum_insert ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_quorum_insert
+AFTER INSERT ON public.asamblea_registros
+REFERENCING NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION public.mantener_asamblea_quorum();
+
+DROP TRIGGER IF EXISTS trg_registros_quorum_update ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_quorum_update
+AFTER UPDATE ON public.asamblea_registros
+REFERENCING OLD TABLE AS filas_viejas NEW TABLE AS filas_nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION public.mantener_asamblea_quorum();
+
+DROP TRIGGER IF EXISTS trg_registros_quorum_delete ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_quorum_delete
+AFTER DELETE ON public.asamblea_registros
+REFERENCING OLD TABLE AS filas_viejas
+FOR EACH STATEMENT EXECUTE FUNCTION public.mantener_asamblea_quorum();
+
+-- Llenar el resumen de las asambleas existentes
+SELECT public.recalcular_asamblea_quorum(id) FROM public.asambleas;
@@ -0,0 +1,59 @@
+-- Serie de tiempo del quorum: una muestra por asamblea y minuto.
+-- Un trigger sobre asamblea_quorum (migración 0010) guarda el valor cada vez que cambia la
+-- presencia; varias muestras en el mismo minuto se compactan en la última.
+-- La clave primaria (asamblea_id, minuto) sirve la consulta por rango con un solo index scan.
+
+CREATE TABLE IF NOT EXISTS public.asamblea_quorum_muestras (
+	asamblea_id uuid NOT NULL,
+	minuto timestamptz NOT NULL,
+	total_registros integer NOT NULL,
+	registros_presentes integer NOT NULL,
+	total_coeficiente numeric NOT NULL,
+	coeficiente_presente numeric NOT NULL,
+	CONSTRAINT asamblea_quorum_muestras_pkey PRIMARY KEY (asamblea_id, minuto),
+	CONSTRAINT asamblea_quorum_muestras_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE
+);
+
+CREATE OR REPLACE FUNCTION public.registrar_muestra_quorum() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO public.asamblea_quorum_muestras (
+    asamblea_id, minuto, total_registros, registros_presentes, total_coeficiente, coeficiente_presente
+  ) VALUES (
+    NEW.asamblea_id, date_trunc('minute', now()), NEW.total_registros, NEW.registros_presentes,
+    NEW.total_coeficiente, NEW.coeficiente_presente
+  )
+  ON CONFLICT (asamblea_id, minuto) DO UPDATE SET
+    total_registros = EXCLUDED.total_registros,
+    registros_presentes = EXCLUDED.registros_presentes,
+    total_coeficiente = EXCLUDED.total_coeficiente,
+    coeficiente_presente = EXCLUDED.coeficiente_presente;
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_quorum_muestra_insert ON public.asamblea_quorum;
+CREATE TRIGGER trg_quorum_muestra_insert
+AFTER INSERT ON public.asamblea_quorum
+FOR EACH ROW EXECUTE FUNCTION public.registrar_muestra_quorum();
+
+-- Solo cambios de presencia o coeficientes (no cada recálculo que deja el mismo valor)
+DROP TRIGGER IF EXISTS trg_quorum_muestra_update ON public.asamblea_quorum;
+CREATE TRIGGER trg_quorum_muestra_update
+AFTER UPDATE ON public.asamblea_quorum
+FOR EACH ROW
+WHEN (
+  OLD.registros_presentes IS DISTINCT FROM NEW.registros_presentes
+  OR OLD.coeficiente_presente IS DISTINCT FROM NEW.coeficiente_presente
+  OR OLD.total_registros IS DISTINCT FROM NEW.total_registros
+  OR OLD.total_coeficiente IS DISTINCT FROM NEW.total_coeficiente
+)
+EXECUTE FUNCTION public.registrar_muestra_quorum();
+
+-- El historial anterior no se puede reconstruir (las actividades solo guardan la hora):
+-- las asambleas existentes empiezan la serie con su valor actual
+INSERT INTO public.asamblea_quorum_muestras (
+  asamblea_id, minuto, total_registros, registros_presentes, total_coeficiente, coeficiente_presente
+)
+SELECT asamblea_id, date_trunc('minute', now()), total_registros, registros_presentes, total_coeficiente, coeficiente_presente
+FROM public.asamblea_quorum
+ON CONFLICT (asamblea_id, minuto) DO NOTHING;
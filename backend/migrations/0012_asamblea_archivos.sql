@@ -0,0 +1,25 @@
+-- Archivo de asambleas cerradas: registros exportados a un archivo JSON lines comprimido
+-- (ver app/core/archivo.py) y, opcionalmente, borrados de asamblea_registros.
+
+CREATE TABLE IF NOT EXISTS public.asamblea_archivos (
+	asamblea_id uuid NOT NULL,
+	ruta text NOT NULL,
+	formato varchar(30) NOT NULL,
+	registros integer NOT NULL,
+	bytes bigint NOT NULL,
+	sha256 varchar(64) NOT NULL,
+	filas_eliminadas boolean DEFAULT false NOT NULL,
+	created_at timestamptz DEFAULT now() NOT NULL,
+	CONSTRAINT asamblea_archivos_pkey PRIMARY KEY (asamblea_id),
+	CONSTRAINT asamblea_archivos_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE
+);
+
+-- Al borrar las filas archivadas el resumen de quorum (y su serie) se conserva tal cual:
+-- la transacción de archivo hace SET LOCAL comerciovip.archivando = 'on'
+DROP TRIGGER IF EXISTS trg_registros_quorum_delete ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_quorum_delete
+AFTER DELETE ON public.asamblea_registros
+REFERENCING OLD TABLE AS filas_viejas
+FOR EACH STATEMENT
+WHEN (coalesce(current_setting('comerciovip.archivando', true), '') <> 'on')
+EXECUTE FUNCTION public.mantener_asamblea_quorum();
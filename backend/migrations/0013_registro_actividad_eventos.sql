@@ -0,0 +1,24 @@
+-- Actividades (ingreso/salida/reingreso) recibidas en lote desde las mesas (sincronización
+-- después de trabajar sin conexión). La clave de idempotencia la genera la mesa por evento:
+-- reenviar un lote ya aplicado no duplica actividades, devuelve el resultado guardado.
+
+CREATE TABLE IF NOT EXISTS public.registro_actividad_eventos (
+	asamblea_id uuid NOT NULL,
+	idempotency_key varchar(100) NOT NULL,
+	registro_id uuid NOT NULL,
+	tipo varchar(20) NOT NULL,
+	hora varchar(10) NOT NULL,
+	numero_control varchar(20) NULL,
+	client_timestamp timestamptz NOT NULL,
+	-- Clave actividad_N creada y versión del registro después de aplicar el lote
+	actividad varchar(30) NULL,
+	"version" integer NULL,
+	created_at timestamptz DEFAULT now() NOT NULL,
+	CONSTRAINT registro_actividad_eventos_pkey PRIMARY KEY (asamblea_id, idempotency_key),
+	CONSTRAINT registro_actividad_eventos_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE
+);
+
+-- Sin FK a asamblea_registros: el archivo de asambleas cerradas borra las filas y el historial
+-- de eventos se conserva hasta que se borre la asamblea
+CREATE INDEX IF NOT EXISTS idx_registro_actividad_eventos_registro
+	ON public.registro_actividad_eventos USING btree (registro_id);
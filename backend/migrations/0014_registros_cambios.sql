@@ -0,0 +1,66 @@
+-- Sincronización incremental de registros (GET /registros/asamblea/{id}/changes?since=).
+--
+-- Cada fila guarda en cambio_txid el id de la transacción que la escribió por última vez.
+-- El cursor que recibe el cliente es el xmin del snapshot de la consulta: todas las
+-- transacciones con id menor ya terminaron y sus cambios ya se entregaron, así que la
+-- siguiente consulta pide cambio_txid >= cursor. A diferencia de updated_at (o de una
+-- secuencia), no se pierden escrituras que confirman fuera de orden ni depende del reloj.
+-- Requiere PostgreSQL 13+ (xid8).
+
+ALTER TABLE public.asamblea_registros
+ADD COLUMN IF NOT EXISTS cambio_txid xid8 DEFAULT pg_current_xact_id() NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_asamblea_registros_cambio
+	ON public.asamblea_registros USING btree (asamblea_id, cambio_txid);
+
+CREATE OR REPLACE FUNCTION public.marcar_cambio_registro() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  NEW.cambio_txid := pg_current_xact_id();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_registros_cambio ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_cambio
+BEFORE UPDATE ON public.asamblea_registros
+FOR EACH ROW EXECUTE FUNCTION public.marcar_cambio_registro();
+
+-- Registros borrados (tombstones) para que los clientes los quiten de su copia local
+CREATE TABLE IF NOT EXISTS public.registro_eliminaciones (
+	asamblea_id uuid NOT NULL,
+	registro_id uuid NOT NULL,
+	cambio_txid xid8 DEFAULT pg_current_xact_id() NOT NULL,
+	eliminado_en timestamptz DEFAULT now() NOT NULL,
+	CONSTRAINT registro_eliminaciones_pkey PRIMARY KEY (asamblea_id, registro_id),
+	CONSTRAINT registro_eliminaciones_asamblea_fk FOREIGN KEY (asamblea_id) REFERENCES public.asambleas(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_registro_eliminaciones_cambio
+	ON public.registro_eliminaciones USING btree (asamblea_id, cambio_txid);
+
+CREATE OR REPLACE FUNCTION public.registrar_eliminacion_registros() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  -- Al borrar la asamblea sus registros se borran en cascada: la asamblea ya no es visible y
+  -- no hay nada que sincronizar (el EXISTS evita además violar la FK)
+  INSERT INTO public.registro_eliminaciones (asamblea_id, registro_id)
+  SELECT f.asamblea_id, f.id
+  FROM filas_viejas f
+  WHERE EXISTS (SELECT 1 FROM public.asambleas a WHERE a.id = f.asamblea_id)
+  ON CONFLICT (asamblea_id, registro_id) DO UPDATE SET
+    cambio_txid = EXCLUDED.cambio_txid,
+    eliminado_en = EXCLUDED.eliminado_en;
+  RETURN NULL;
+END;
+$$;
+
+-- El archivo de asambleas cerradas borra las filas pero los registros siguen existiendo
+-- (se leen del archivo): no son eliminaciones
+DROP TRIGGER IF EXISTS trg_registros_eliminacion ON public.asamblea_registros;
+CREATE TRIGGER trg_registros_eliminacion
+AFTER DELETE ON public.asamblea_registros
+REFERENCING OLD TABLE AS filas_viejas
+FOR EACH STATEMENT
+WHEN (coalesce(current_setting('comerciovip.archivando', true), '') <> 'on')
+EXECUTE FUNCTION public.registrar_eliminacion_registros();
@@ -0,0 +1,23 @@
+-- Respuestas guardadas por Idempotency-Key (ver app/core/idempotencia.py).
+-- Una fila por clave, llamador, método y ruta: mientras la petición original se ejecuta queda
+-- en EN_CURSO; al terminar guarda la respuesta y vive hasta expira_en (IDEMPOTENCY_TTL_SECONDS).
+
+CREATE TABLE IF NOT EXISTS public.idempotency_keys (
+	clave varchar(200) NOT NULL,
+	-- sha256 del sub del JWT o 'anon': una respuesta guardada solo se repite a quien la pidió
+	sujeto varchar(64) NOT NULL,
+	metodo varchar(10) NOT NULL,
+	ruta text NOT NULL,
+	-- sha256 del cuerpo de la petición: la misma clave con otro cuerpo es un error del cliente
+	huella varchar(64) NOT NULL,
+	estado varchar(20) NOT NULL,
+	status_code integer NULL,
+	headers jsonb NULL,
+	body bytea NULL,
+	created_at timestamptz DEFAULT now() NOT NULL,
+	expira_en timestamptz NOT NULL,
+	CONSTRAINT idempotency_keys_pkey PRIMARY KEY (clave, sujeto, metodo, ruta)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expira_en
+	ON public.idempotency_keys USING btree (expira_en);
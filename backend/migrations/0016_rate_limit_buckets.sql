@@ -0,0 +1,15 @@
+-- Estado compartido del limitador de peticiones de las rutas públicas (RATE_LIMIT_COMPARTIDO).
+-- Un token bucket por clave (límite + IP o asamblea); el cálculo de recarga y consumo se hace
+-- en un solo UPSERT (ver app/core/rate_limit.py).
+-- UNLOGGED: no pasa por el WAL (escrituras baratas); si el servidor se reinicia la tabla queda
+-- vacía, lo que solo reinicia los contadores.
+
+CREATE UNLOGGED TABLE IF NOT EXISTS public.rate_limit_buckets (
+	clave text NOT NULL,
+	tokens double precision NOT NULL,
+	actualizado timestamptz DEFAULT now() NOT NULL,
+	CONSTRAINT rate_limit_buckets_pkey PRIMARY KEY (clave)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_actualizado
+	ON public.rate_limit_buckets USING btree (actualizado);
@@ -0,0 +1,53 @@
+"""
+Configuración de pytest para las pruebas del backend.
+
+Requiere pytest y httpx (pip install pytest httpx). Ejecutar desde la carpeta backend con:
+  python -m pytest -q test
+Las pruebas que usan PostgreSQL solo corren con PRUEBAS_BD=1 y la base de datos del .env
+(crean una asamblea sintética y la borran al terminar); las demás no se conectan a la base.
+"""
+import os
+import sys
+
+import pytest
+
+# Agregar el directorio raíz al path para importar los módulos de app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Script de verificación manual (python -m test.test_database_connection), no es una prueba de pytest
+collect_ignore = ["test_database_connection.py"]
+
+
+@pytest.fixture(scope="session")
+def engine_bd():
+    """Motor de la base de datos del .env; omite la prueba si PRUEBAS_BD no está activo."""
+    if os.getenv("PRUEBAS_BD", "").strip().lower() not in ("1", "true", "yes", "si", "sí"):
+        pytest.skip("Pruebas con base de datos desactivadas (PRUEBAS_BD=1 para ejecutarlas)")
+    from app.core.database import engine, test_connection
+    if not test_connection():
+        pytest.skip("Base de datos del .env no disponible")
+    return engine
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Sin el bloque with no corre el lifespan (chequeo de migraciones ni listener de NOTIFY)
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    from app.core.security import create_access_token
+    token = create_access_token({"sub": "pruebas", "is_admin": True}, 60)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def asamblea_sintetica(engine_bd):
+    """Asamblea ACTIVA con 40 registros sintéticos, borrada al terminar la prueba."""
+    from benchmarks.sintetico import crear_asamblea_sintetica, eliminar_asamblea_sintetica
+    sintetica = crear_asamblea_sintetica(engine_bd, 40, poderes_por_titular=1, actividades_por_registro=2)
+    yield sintetica
+    eliminar_asamblea_sintetica(engine_bd, sintetica["asamblea_id"])
@@ -0,0 +1,27 @@
+"""
+Registro atómico de una actividad (POST /registros/{id}/actividad). Requiere PRUEBAS_BD=1.
+"""
+
+
+def test_primera_actividad_de_un_registro_sin_actividades(client, asamblea_sintetica):
+    # Sin actividades ni poderes: el insert guarda None como JSON null
+    registro = next(r for r in asamblea_sintetica["registros"] if r["actividad_ingreso"] is None)
+    response = client.post(f"/registros/{registro['id']}/actividad", json={"tipo": "ingreso", "numero_control": "15"})
+    assert response.status_code == 200
+    cuerpo = response.json()
+    assert list(cuerpo["actividad_ingreso"]) == ["actividad_1"]
+    assert cuerpo["actividad_ingreso"]["actividad_1"]["tipo"] == "ingreso"
+    assert cuerpo["numero_control"] == "15"
+    assert cuerpo["gestion_poderes"]["poder_1"]["numero_control"] == "15"
+
+    response = client.post(f"/registros/{registro['id']}/actividad", json={"tipo": "salida"})
+    assert response.status_code == 200
+    assert list(response.json()["actividad_ingreso"]) == ["actividad_1", "actividad_2"]
+
+
+def test_actividad_sigue_la_numeracion_existente(client, asamblea_sintetica):
+    registro = next(r for r in asamblea_sintetica["registros"] if r["actividad_ingreso"])
+    existentes = len(registro["actividad_ingreso"])
+    response = client.post(f"/registros/{registro['id']}/actividad", json={"tipo": "reingreso", "numero_control": "16"})
+    assert response.status_code == 200
+    assert f"actividad_{existentes + 1}" in response.json()["actividad_ingreso"]
@@ -0,0 +1,42 @@
+"""
+Sincronización en lote de actividades registradas sin conexión. Requiere PRUEBAS_BD=1.
+"""
+from datetime import datetime
+
+
+def _evento(registro_id, clave: str, **extra) -> dict:
+    return {
+        "registro_id": str(registro_id),
+        "tipo": "ingreso",
+        "client_timestamp": datetime(2026, 3, 1, 9, 30).isoformat(),
+        "idempotency_key": clave,
+        **extra,
+    }
+
+
+def test_numero_control_largo_invalida_solo_ese_evento(client, asamblea_sintetica):
+    asamblea_id = asamblea_sintetica["asamblea_id"]
+    primero, segundo = asamblea_sintetica["registros"][0], asamblea_sintetica["registros"][1]
+    response = client.post(f"/registros/asamblea/{asamblea_id}/actividades/lote", json={"eventos": [
+        _evento(primero["id"], "lote-1", numero_control="77"),
+        _evento(segundo["id"], "lote-2", numero_control="9" * 21),
+    ]})
+    assert response.status_code == 200
+    cuerpo = response.json()
+    assert cuerpo["aplicados"] == 1
+    assert [r["estado"] for r in cuerpo["resultados"]] == ["aplicado", "invalido"]
+    assert "numero_control" in cuerpo["resultados"][1]["detail"]
+
+
+def test_lote_repetido_no_duplica(client, asamblea_sintetica):
+    asamblea_id = asamblea_sintetica["asamblea_id"]
+    # Sin actividades: el insert guarda None como JSON null
+    registro = next(r for r in asamblea_sintetica["registros"] if r["actividad_ingreso"] is None)
+    lote = {"eventos": [_evento(registro["id"], "lote-3", numero_control="9" * 20)]}
+    primera = client.post(f"/registros/asamblea/{asamblea_id}/actividades/lote", json=lote).json()
+    segunda = client.post(f"/registros/asamblea/{asamblea_id}/actividades/lote", json=lote).json()
+    assert primera["resultados"][0]["estado"] == "aplicado"
+    assert primera["resultados"][0]["actividad"] == "actividad_1"
+    assert segunda["aplicados"] == 0
+    assert segunda["resultados"][0]["estado"] == "duplicado"
+    assert segunda["resultados"][0]["actividad"] == primera["resultados"][0]["actividad"]
@@ -0,0 +1,34 @@
+"""
+Sincronización incremental de registros (GET /registros/asamblea/{id}/changes?since=...).
+"""
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.registro_service import get_cambios_registros_service
+
+
+@pytest.mark.parametrize("since", ["", "abc", "-1", "1.5", "²", "١٢", str(2 ** 64), "9" * 30, "9" * 5000])
+def test_cursor_invalido(since):
+    # La validación ocurre antes de consultar la base de datos
+    with pytest.raises(HTTPException) as error:
+        get_cambios_registros_service(db=None, asamblea_id=uuid.uuid4(), since=since)
+    assert error.value.status_code == 400
+
+
+def test_cambios_desde_el_cursor(client, admin_headers, asamblea_sintetica):
+    asamblea_id = asamblea_sintetica["asamblea_id"]
+    url = f"/registros/asamblea/{asamblea_id}/changes"
+    completo = client.get(url, headers=admin_headers).json()
+    assert completo["completo"] is True
+    assert len(completo["registros"]) == len(asamblea_sintetica["registros"])
+
+    registro_id = str(asamblea_sintetica["registros"][0]["id"])
+    assert client.put(f"/registros/{registro_id}", json={"telefono": "3000000004"}).status_code == 200
+    cambios = client.get(url, params={"since": completo["cursor"]}, headers=admin_headers).json()
+    assert [r["id"] for r in cambios["registros"]] == [registro_id]
+
+    # El máximo de xid8 es válido; uno más es 400 (antes, 500 al convertirlo en PostgreSQL)
+    assert client.get(url, params={"since": str(2 ** 64 - 1)}, headers=admin_headers).status_code == 200
+    assert client.get(url, params={"since": str(2 ** 64)}, headers=admin_headers).status_code == 400
@@ -0,0 +1,123 @@
+"""
+CompressionMiddleware: negociación de Accept-Encoding y respuestas que no se comprimen.
+"""
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, _negociar_encoding
+
+GRANDE = {"registros": [{"nombre": f"Residente {i}", "torre": "1", "apartamento": str(i)} for i in range(200)]}
+
+
+def _app() -> Starlette:
+    async def grande(request):
+        return JSONResponse(GRANDE, headers={"ETag": '"v1"'})
+
+    async def pequeno(request):
+        return JSONResponse({"ok": True})
+
+    async def pdf(request):
+        return Response(b"%PDF-" + b"0" * 5000, media_type="application/pdf")
+
+    async def ya_comprimido(request):
+        return Response(b"x" * 5000, media_type="text/plain", headers={"Content-Encoding": "identity"})
+
+    async def sin_cambios(request):
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    async def streaming(request):
+        async def partes():
+            for i in range(5):
+                yield f"fila {i}\n".encode("utf-8") * 100
+        return StreamingResponse(partes(), media_type="text/csv")
+
+    app = Starlette(routes=[
+        Route("/grande", grande),
+        Route("/pequeno", pequeno),
+        Route("/pdf", pdf),
+        Route("/ya-comprimido", ya_comprimido),
+        Route("/sin-cambios", sin_cambios),
+        Route("/streaming", streaming),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return app
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    return TestClient(_app())
+
+
+def _get(cliente, ruta: str, accept_encoding: str = "gzip"):
+    return cliente.get(ruta, headers={"Accept-Encoding": accept_encoding})
+
+
+@pytest.mark.parametrize("accept_encoding, esperado", [
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, deflate", "gzip"),
+    ("*", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+    ("gzip;q=abc", None),
+])
+def test_negociar_encoding(monkeypatch, accept_encoding, esperado):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert _negociar_encoding(accept_encoding) == esperado
+
+
+def test_negociar_prefiere_brotli_si_esta_instalado():
+    pytest.importorskip("brotli")
+    assert _negociar_encoding("gzip, br") == "br"
+    assert _negociar_encoding("gzip, br;q=0") == "gzip"
+
+
+def test_negociar_sin_brotli_usa_gzip(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert _negociar_encoding("br") is None
+    assert _negociar_encoding("br, gzip") == "gzip"
+
+
+def test_comprime_respuesta_grande(cliente):
+    response = _get(cliente, "/grande")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == GRANDE
+    # El ETag fuerte pasa a débil al cambiar los bytes
+    assert response.headers["etag"] == 'W/"v1"'
+
+
+def test_sin_accept_encoding_no_comprime(cliente):
+    response = _get(cliente, "/grande", accept_encoding="identity")
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+
+
+@pytest.mark.parametrize("ruta", ["/pequeno", "/pdf"])
+def test_no_comprime_pequenas_ni_binarias(cliente, ruta):
+    response = _get(cliente, ruta)
+    assert "content-encoding" not in response.headers
+
+
+def test_respeta_content_encoding_existente(cliente):
+    response = _get(cliente, "/ya-comprimido")
+    assert response.headers["content-encoding"] == "identity"
+    assert response.content == b"x" * 5000
+
+
+def test_304_pasa_sin_cuerpo(cliente):
+    response = _get(cliente, "/sin-cambios")
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+
+
+def test_streaming_se_comprime_por_fragmentos(cliente):
+    response = _get(cliente, "/streaming")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == b"".join(f"fila {i}\n".encode("utf-8") * 100 for i in range(5))
@@ -0,0 +1,46 @@
+"""
+Cantidad máxima de consultas SQL de los endpoints más usados durante una asamblea.
+
+Si un cambio agrega consultas por registro (N+1) o una consulta extra por petición, estas
+pruebas fallan con la lista de sentencias ejecutadas. Requieren PRUEBAS_BD=1 (ver conftest.py).
+"""
+from app.core.query_stats import assert_max_queries
+
+
+def test_quorum_coeficiente(client, admin_headers, asamblea_sintetica):
+    asamblea_id = asamblea_sintetica["asamblea_id"]
+    with assert_max_queries(3):
+        response = client.get(f"/registros/asamblea/{asamblea_id}/estadisticas/quorum-coeficiente", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["total_registros"] == len(asamblea_sintetica["registros"])
+
+
+def test_listar_registros(client, admin_headers, asamblea_sintetica):
+    asamblea_id = asamblea_sintetica["asamblea_id"]
+    with assert_max_queries(3):
+        response = client.get(f"/registros/asamblea/{asamblea_id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == len(asamblea_sintetica["registros"])
+
+
+def test_update_users_ingreso_y_actualizacion(client, asamblea_sintetica):
+    registro = asamblea_sintetica["registros"][3]
+    with assert_max_queries(5):
+        response = client.post("/update-users/ingreso", json={
+            "asamblea_id": str(asamblea_sintetica["asamblea_id"]),
+            "numero_torre": registro["numero_torre"],
+            "numero_apartamento": registro["numero_apartamento"],
+        })
+    assert response.status_code == 200
+    token = response.json()["token"]
+
+    with assert_max_queries(1):
+        response = client.get("/update-users/registro", params={"token": token})
+    assert response.status_code == 200
+    assert response.json()["id"] == str(registro["id"])
+
+    # El caso normal es un solo UPDATE ... RETURNING
+    with assert_max_queries(1):
+        response = client.patch("/update-users/registro", json={"token": token, "telefono": "3001234567"})
+    assert response.status_code == 200
+    assert response.json()["telefono"] == "3001234567"
@@ -0,0 +1,76 @@
+"""
+ETag e If-None-Match (GET condicionales) e If-Match (versión de un registro).
+"""
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.etag import make_etag, etag_coincide, version_etag, version_if_match
+
+
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(nombre.replace("_", "-").encode("latin-1"), valor.encode("latin-1")) for nombre, valor in headers.items()],
+    })
+
+
+def test_make_etag_es_debil_y_estable():
+    etag = make_etag("asamblea", 3, 120)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("asamblea", 3, 120)
+
+
+def test_make_etag_cambia_con_cada_parte():
+    base = make_etag("asamblea", 3, 120)
+    assert make_etag("asamblea", 4, 120) != base
+    assert make_etag("asamblea", 3, 121) != base
+    # El separador evita que partes distintas den el mismo texto
+    assert make_etag("a", "bc") != make_etag("ab", "c")
+
+
+def test_etag_coincide_sin_header():
+    assert not etag_coincide(_request(), make_etag(1))
+
+
+def test_etag_coincide_con_lista_y_comparacion_debil():
+    etag = make_etag(1)
+    fuerte = etag[2:]
+    assert etag_coincide(_request(if_none_match=etag), etag)
+    # Proxies que quitan el W/ siguen validando
+    assert etag_coincide(_request(if_none_match=fuerte), etag)
+    assert etag_coincide(_request(if_none_match=f'W/"otro", {etag}'), etag)
+    assert etag_coincide(_request(if_none_match="*"), etag)
+    assert not etag_coincide(_request(if_none_match=make_etag(2)), etag)
+
+
+def test_version_if_match_sin_header_o_comodin():
+    assert version_if_match(_request()) is None
+    assert version_if_match(_request(if_match="*")) is None
+
+
+def test_version_if_match_acepta_etag_fuerte_y_debil():
+    assert version_if_match(_request(if_match=version_etag(3))) == 3
+    assert version_if_match(_request(if_match='"3"')) == 3
+    # Con varios valores se usa el primero
+    assert version_if_match(_request(if_match='W/"5", W/"4"')) == 5
+
+
+def test_version_if_match_invalido():
+    with pytest.raises(HTTPException) as error:
+        version_if_match(_request(if_match=make_etag("asamblea", 1)))
+    assert error.value.status_code == 400
+
+
+def test_put_registro_con_version_vieja(client, asamblea_sintetica):
+    registro_id = asamblea_sintetica["registros"][0]["id"]
+    response = client.put(f"/registros/{registro_id}", json={"telefono": "3000000001"}, headers={"If-Match": version_etag(1)})
+    assert response.status_code == 200
+    assert response.headers["etag"] == version_etag(2)
+
+    # Otro cliente todavía con la versión 1: conflicto y el registro no cambia
+    response = client.put(f"/registros/{registro_id}", json={"telefono": "3000000002"}, headers={"If-Match": version_etag(1)})
+    assert response.status_code == 409
+    assert client.get(f"/registros/{registro_id}").json()["telefono"] == "3000000001"
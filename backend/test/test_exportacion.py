@@ -0,0 +1,138 @@
+"""
+Exportación en streaming a CSV y XLSX (exportar_csv / exportar_xlsx) y el endpoint de
+exportación de registros, en vivo y desde el archivo de una asamblea cerrada.
+"""
+import csv
+import hashlib
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from app.core import exportacion
+from app.core.exportacion import exportar_csv, exportar_xlsx
+
+ENCABEZADOS = ["Nombre", "Torre", "Coeficiente", "Presente"]
+FILAS = [
+    ["Pérez, Ana", "1", Decimal("0.125"), True],
+    ['Gómez "Toño"', None, 2, False],
+    ["Línea\ncon salto\x07", "", 0.5, None],
+]
+NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def _filas_sin_consumir():
+    """Falla si el generador pide filas antes de entregar el encabezado."""
+    raise AssertionError("Se leyeron filas antes de entregar el encabezado")
+    yield  # pragma: no cover
+
+
+def _celdas_xlsx(contenido: bytes):
+    with zipfile.ZipFile(io.BytesIO(contenido)) as zf:
+        assert zf.testzip() is None
+        hoja = ET.fromstring(zf.read("xl/worksheets/sheet1.xml"))
+    filas = []
+    for fila in hoja.find("x:sheetData", NS):
+        valores = []
+        for celda in fila:
+            texto = celda.find("x:is/x:t", NS)
+            valor = celda.find("x:v", NS)
+            valores.append(texto.text if texto is not None else (valor.text if valor is not None else None))
+        filas.append(valores)
+    return filas
+
+
+def test_csv_encabezado_con_bom_y_valores():
+    contenido = b"".join(exportar_csv(ENCABEZADOS, FILAS)).decode("utf-8")
+    assert contenido.startswith("﻿")
+    leidas = list(csv.reader(io.StringIO(contenido[1:])))
+    assert leidas == [
+        ENCABEZADOS,
+        ["Pérez, Ana", "1", "0.125", "True"],
+        ['Gómez "Toño"', "", "2", "False"],
+        ["Línea\ncon salto\x07", "", "0.5", ""],
+    ]
+
+
+def test_csv_entrega_el_encabezado_antes_de_leer_filas():
+    generador = exportar_csv(ENCABEZADOS, _filas_sin_consumir())
+    assert next(generador).decode("utf-8").startswith("﻿Nombre,")
+
+
+def test_csv_por_bloques(monkeypatch):
+    monkeypatch.setattr(exportacion, "FILAS_POR_BLOQUE", 10)
+    bloques = list(exportar_csv(["n"], ([i] for i in range(25))))
+    # Encabezado, dos bloques completos y el resto
+    assert len(bloques) == 4
+    assert b"".join(bloques).decode("utf-8").splitlines()[1:] == [str(i) for i in range(25)]
+
+
+def test_xlsx_es_un_libro_valido():
+    contenido = b"".join(exportar_xlsx(ENCABEZADOS, FILAS, nombre_hoja='Asamblea "Torre 1"'))
+    filas = _celdas_xlsx(contenido)
+    assert filas == [
+        ENCABEZADOS,
+        ["Pérez, Ana", "1", "0.125", "Si"],
+        ['Gómez "Toño"', None, "2", "No"],
+        # Los caracteres de control no válidos en XML se eliminan
+        ["Línea\ncon salto", None, "0.5", None],
+    ]
+    with zipfile.ZipFile(io.BytesIO(contenido)) as zf:
+        libro = ET.fromstring(zf.read("xl/workbook.xml"))
+    assert libro.find("x:sheets/x:sheet", NS).get("name") == 'Asamblea "Torre 1"'
+
+
+def test_xlsx_entrega_el_inicio_antes_de_leer_filas():
+    generador = exportar_xlsx(ENCABEZADOS, _filas_sin_consumir())
+    assert next(generador).startswith(b"PK")
+
+
+def test_xlsx_por_bloques(monkeypatch):
+    monkeypatch.setattr(exportacion, "FILAS_POR_BLOQUE", 50)
+    # Texto poco comprimible: con filas repetidas el compresor retiene todo hasta el final
+    filas = [[i, hashlib.sha256(str(i).encode("utf-8")).hexdigest()] for i in range(2000)]
+    bloques = list(exportar_xlsx(["n", "huella"], filas))
+    assert len(bloques) > 2
+    leidas = _celdas_xlsx(b"".join(bloques))
+    assert len(leidas) == 2001
+    assert leidas[-1] == ["1999", filas[-1][1]]
+
+
+def test_xlsx_abre_con_openpyxl():
+    openpyxl = pytest.importorskip("openpyxl")
+    libro = openpyxl.load_workbook(io.BytesIO(b"".join(exportar_xlsx(ENCABEZADOS, FILAS))))
+    hoja = libro.active
+    assert [celda.value for celda in hoja[1]] == ENCABEZADOS
+    assert hoja["A2"].value == "Pérez, Ana"
+    assert hoja.freeze_panes == "A2"
+
+
+def test_export_en_vivo_y_archivado(client, admin_headers, asamblea_sintetica, engine_bd, tmp_path, monkeypatch):
+    from app.services import archivo_service
+
+    asamblea_id = asamblea_sintetica["asamblea_id"]
+    url = f"/registros/asamblea/{asamblea_id}/export"
+    en_vivo = client.get(url, params={"format": "csv"}, headers=admin_headers)
+    assert en_vivo.status_code == 200
+    filas = list(csv.reader(io.StringIO(en_vivo.content.decode("utf-8-sig"))))
+    assert len(filas) == len(asamblea_sintetica["registros"]) + 1
+
+    # Cerrar, archivar borrando las filas y exportar desde el archivo
+    monkeypatch.setattr(archivo_service, "ARCHIVO_DIR", str(tmp_path))
+    with engine_bd.begin() as conn:
+        conn.execute(text("UPDATE public.asambleas SET estado = 'CERRADA' WHERE id = :id"), {"id": asamblea_id})
+    response = client.post(f"/asambleas/{asamblea_id}/archivar", params={"eliminar_filas": True}, headers=admin_headers)
+    assert response.status_code == 200
+    with engine_bd.connect() as conn:
+        restantes = conn.execute(
+            text("SELECT count(*) FROM public.asamblea_registros WHERE asamblea_id = :id"), {"id": asamblea_id}
+        ).scalar()
+    assert restantes == 0
+
+    # Mismas filas en el mismo orden (el archivo se escribe ordenado por nombre)
+    archivado = client.get(url, params={"format": "csv"}, headers=admin_headers)
+    assert archivado.status_code == 200
+    assert archivado.content == en_vivo.content
@@ -0,0 +1,225 @@
+"""
+IdempotencyMiddleware: repetición de la respuesta, 409 en curso, 422 con otro cuerpo,
+qué respuestas se guardan y separación de claves por llamador.
+
+Las pruebas unitarias reemplazan la tabla idempotency_keys por un dict (misma semántica que
+las sentencias SQL del módulo); la última usa la tabla real (PRUEBAS_BD=1).
+"""
+import threading
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import database, idempotencia
+from app.core.etag import version_etag
+from app.core.idempotencia import ANONIMO, IdempotencyMiddleware, _ruta, _se_guarda, _sujeto
+from app.core.security import create_access_token
+
+
+class IdempotencyEnMemoria(IdempotencyMiddleware):
+    """Guarda las claves en un dict en lugar de PostgreSQL."""
+
+    def __init__(self, app, filas: dict):
+        super().__init__(app)
+        self.filas = filas
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _id(params: dict):
+        return params["clave"], params["sujeto"], params["metodo"], params["ruta"]
+
+    def _reservar(self, engine, params: dict):
+        with self._lock:
+            fila = self.filas.get(self._id(params))
+            if fila is None:
+                self.filas[self._id(params)] = {
+                    "huella": params["huella"], "estado": "EN_CURSO", "status_code": None, "headers": None, "body": None,
+                }
+                return True, None
+            return False, dict(fila)
+
+    def _guardar(self, engine, params: dict, status_code: int, headers: list, body: bytes) -> bool:
+        with self._lock:
+            fila = self.filas.get(self._id(params))
+            if fila and fila["huella"] == params["huella"]:
+                fila.update(estado="COMPLETA", status_code=status_code, headers=headers, body=body)
+        return True
+
+    def _liberar(self, engine, params: dict):
+        with self._lock:
+            fila = self.filas.get(self._id(params))
+            if fila and fila["huella"] == params["huella"] and fila["estado"] == "EN_CURSO":
+                del self.filas[self._id(params)]
+
+
+@pytest.fixture
+def entorno(monkeypatch):
+    # El middleware deja pasar todo sin motor configurado; el motor no se usa con el dict
+    monkeypatch.setattr(database, "engine", object())
+    llamadas = []
+    filas = {}
+
+    async def operacion(request):
+        datos = await request.json()
+        llamadas.append(datos)
+        estado = int(request.query_params.get("estado", 201))
+        if estado >= 500:
+            raise RuntimeError("falla de la operación")
+        return JSONResponse({"llamada": len(llamadas), **datos}, status_code=estado, headers={"X-Operacion": "si"})
+
+    app = Starlette(routes=[
+        Route("/registros/operacion", operacion, methods=["POST", "PUT"]),
+        Route("/otra/operacion", operacion, methods=["POST"]),
+    ])
+    app.add_middleware(IdempotencyEnMemoria, filas=filas)
+    cliente = TestClient(app, raise_server_exceptions=False)
+    return cliente, llamadas, filas
+
+
+def _post(cliente, clave, datos=None, ruta="/registros/operacion", **kwargs):
+    headers = {"Idempotency-Key": clave, **kwargs.pop("headers", {})} if clave else kwargs.pop("headers", {})
+    return cliente.post(ruta, json=datos or {"valor": 1}, headers=headers, **kwargs)
+
+
+def test_repite_la_respuesta_sin_ejecutar_de_nuevo(entorno):
+    cliente, llamadas, _ = entorno
+    primera = _post(cliente, "clave-1")
+    segunda = _post(cliente, "clave-1")
+    assert len(llamadas) == 1
+    assert primera.status_code == segunda.status_code == 201
+    assert segunda.json() == primera.json()
+    assert segunda.headers["x-operacion"] == "si"
+    assert segunda.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in primera.headers
+
+
+def test_misma_clave_con_otro_cuerpo(entorno):
+    cliente, llamadas, _ = entorno
+    _post(cliente, "clave-1", {"valor": 1})
+    response = _post(cliente, "clave-1", {"valor": 2})
+    assert response.status_code == 422
+    assert len(llamadas) == 1
+
+
+def test_original_en_curso(entorno):
+    cliente, llamadas, filas = entorno
+    _post(cliente, "clave-1")
+    fila = next(iter(filas.values()))
+    fila.update(estado="EN_CURSO", status_code=None, headers=None, body=None)
+    response = _post(cliente, "clave-1")
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+    assert len(llamadas) == 1
+
+
+@pytest.mark.parametrize("estado", [401, 403, 429, 500])
+def test_respuestas_no_guardadas_liberan_la_clave(entorno, estado):
+    cliente, llamadas, filas = entorno
+    assert _post(cliente, "clave-1", params={"estado": estado}).status_code == estado
+    assert filas == {}
+    assert _post(cliente, "clave-1").status_code == 201
+    assert len(llamadas) == 2
+
+
+@pytest.mark.parametrize("estado", [200, 400, 404, 409, 410, 422])
+def test_respuestas_deterministas_se_guardan(entorno, estado):
+    cliente, llamadas, _ = entorno
+    _post(cliente, "clave-1", params={"estado": estado})
+    response = _post(cliente, "clave-1", params={"estado": estado})
+    assert response.status_code == estado
+    assert response.headers["idempotent-replayed"] == "true"
+    assert len(llamadas) == 1
+
+
+def test_respuesta_grande_no_libera_la_clave(entorno, monkeypatch):
+    cliente, llamadas, filas = entorno
+    monkeypatch.setattr(idempotencia, "IDEMPOTENCY_MAX_BYTES", 10)
+    primera = _post(cliente, "clave-1", {"valor": "x" * 100})
+    assert primera.json()["valor"] == "x" * 100
+    segunda = _post(cliente, "clave-1", {"valor": "x" * 100})
+    assert len(llamadas) == 1
+    assert segunda.status_code == 201
+    assert segunda.headers["idempotent-replayed"] == "true"
+    assert segunda.headers["idempotent-body-omitted"] == "true"
+    assert "detail" in segunda.json()
+
+
+def test_si_no_se_puede_guardar_la_clave_queda_reservada(entorno, monkeypatch):
+    cliente, llamadas, filas = entorno
+    monkeypatch.setattr(IdempotencyEnMemoria, "_guardar", lambda self, *args: False)
+    assert _post(cliente, "clave-1").status_code == 201
+    assert next(iter(filas.values()))["estado"] == "EN_CURSO"
+    # El reintento espera (409) en lugar de aplicar la operación otra vez
+    assert _post(cliente, "clave-1").status_code == 409
+    assert len(llamadas) == 1
+
+
+def test_se_guarda():
+    assert _se_guarda(200) and _se_guarda(204) and _se_guarda(404)
+    assert not _se_guarda(401) and not _se_guarda(403) and not _se_guarda(429) and not _se_guarda(503)
+
+
+def test_claves_separadas_por_usuario(entorno):
+    cliente, llamadas, _ = entorno
+    ana = {"Authorization": f"Bearer {create_access_token({'sub': 'ana'}, 5)}"}
+    luis = {"Authorization": f"Bearer {create_access_token({'sub': 'luis'}, 5)}"}
+    _post(cliente, "clave-1", headers=ana)
+    # Otro usuario con la misma clave no recibe la respuesta de ana
+    response = _post(cliente, "clave-1", headers=luis)
+    assert "idempotent-replayed" not in response.headers
+    assert _post(cliente, "clave-1", headers=ana).headers["idempotent-replayed"] == "true"
+    assert len(llamadas) == 2
+
+
+def test_sin_header_metodo_o_ruta_fuera_del_alcance(entorno):
+    cliente, llamadas, filas = entorno
+    _post(cliente, None)
+    _post(cliente, None)
+    _post(cliente, "clave-1", ruta="/otra/operacion")
+    _post(cliente, "clave-1", ruta="/otra/operacion")
+    assert len(llamadas) == 4
+    assert filas == {}
+
+
+def test_clave_demasiado_larga(entorno):
+    cliente, llamadas, _ = entorno
+    assert _post(cliente, "x" * 201).status_code == 400
+    assert llamadas == []
+
+
+def _conexion(headers: dict) -> HTTPConnection:
+    return HTTPConnection({
+        "type": "http",
+        "headers": [(nombre.lower().encode("latin-1"), valor.encode("latin-1")) for nombre, valor in headers.items()],
+    })
+
+
+def test_sujeto():
+    token = create_access_token({"sub": "ana"}, 5)
+    assert _sujeto(_conexion({})) == ANONIMO
+    assert _sujeto(_conexion({"Authorization": "Bearer no-es-un-jwt"})) == ANONIMO
+    por_header = _sujeto(_conexion({"Authorization": f"Bearer {token}"}))
+    assert por_header != ANONIMO
+    # Cookie y header con el mismo usuario comparten la clave; el sub no se guarda en claro
+    assert _sujeto(_conexion({"Cookie": f"access_token={token}"})) == por_header
+    assert "ana" not in por_header
+
+
+def test_ruta_sin_root_path():
+    assert _ruta({"path": "/api/registros/1", "root_path": "/api"}) == "/registros/1"
+    assert _ruta({"path": "/registros/1", "root_path": ""}) == "/registros/1"
+
+
+def test_put_registro_repetido_en_postgresql(client, asamblea_sintetica):
+    registro_id = asamblea_sintetica["registros"][0]["id"]
+    headers = {"Idempotency-Key": f"prueba-{registro_id}", "If-Match": version_etag(1)}
+    primera = client.put(f"/registros/{registro_id}", json={"telefono": "3000000003"}, headers=headers)
+    # Sin la clave, el mismo If-Match daría 409: la respuesta guardada se repite
+    segunda = client.put(f"/registros/{registro_id}", json={"telefono": "3000000003"}, headers=headers)
+    assert primera.status_code == segunda.status_code == 200
+    assert segunda.headers["idempotent-replayed"] == "true"
+    assert segunda.json()["version"] == primera.json()["version"] == 2
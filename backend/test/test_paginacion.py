@@ -0,0 +1,43 @@
+"""
+Cursores de paginación keyset (encode_cursor / decode_cursor).
+"""
+import base64
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.repositories.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_ida_y_vuelta():
+    valores = {"created_at": "2026-03-01T10:00:00", "id": "8d7b0c1e-1f0a-4c55-9f5e-2b7c1f0e6a11"}
+    assert decode_cursor(encode_cursor(valores)) == valores
+
+
+def test_cursor_es_url_safe_sin_relleno():
+    cursor = encode_cursor({"nombre": "Núñez ¿?&/+", "id": 7})
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == {"nombre": "Núñez ¿?&/+", "id": 7}
+
+
+def test_cursor_serializa_fechas_y_uuid_como_texto():
+    fecha = datetime(2026, 3, 1, 10, 0, 0)
+    identificador = uuid.uuid4()
+    assert decode_cursor(encode_cursor({"created_at": fecha, "id": identificador})) == {
+        "created_at": str(fecha),
+        "id": str(identificador),
+    }
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "no es base64!",
+    base64.urlsafe_b64encode(b"{no json").decode("ascii"),
+    # JSON válido que no es un objeto
+    base64.urlsafe_b64encode(b"[1, 2]").decode("ascii"),
+])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,149 @@
+"""
+Límite de peticiones: TokenBucket, IP del cliente detrás de proxies y dependencias de las
+rutas públicas. El reloj se controla reemplazando time.monotonic del módulo.
+"""
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.rate_limit import TokenBucket, ip_cliente, limitar_por_ip, registrar_ingreso_fallido
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(rate_limit.time, "monotonic", reloj)
+    return reloj
+
+
+def _request(ip: str = "200.1.1.1", reenviada: str = None) -> Request:
+    headers = [(b"x-forwarded-for", reenviada.encode("latin-1"))] if reenviada else []
+    return Request({"type": "http", "method": "POST", "path": "/update-users/ingreso", "headers": headers, "client": (ip, 5000)})
+
+
+def test_rafaga_y_espera(reloj):
+    bucket = TokenBucket("prueba", por_minuto=60, rafaga=3)
+    assert [bucket.consumir("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.consumir("a") == pytest.approx(1.0)
+    assert bucket.espera("a") == pytest.approx(1.0)
+
+
+def test_recarga_hasta_la_capacidad(reloj):
+    bucket = TokenBucket("prueba", por_minuto=60, rafaga=3)
+    for _ in range(3):
+        bucket.consumir("a")
+    reloj.ahora += 1.5
+    assert bucket.consumir("a") == 0.0
+    assert bucket.consumir("a") == pytest.approx(0.5)
+    # Mucho tiempo sin uso no acumula más que la ráfaga
+    reloj.ahora += 3600
+    assert [bucket.consumir("a") for _ in range(4)][-1] > 0
+
+
+def test_espera_no_consume(reloj):
+    bucket = TokenBucket("prueba", por_minuto=60, rafaga=1)
+    assert bucket.espera("a") == 0.0
+    assert bucket.espera("a") == 0.0
+    assert bucket.consumir("a") == 0.0
+
+
+def test_claves_independientes(reloj):
+    bucket = TokenBucket("prueba", por_minuto=60, rafaga=1)
+    assert bucket.consumir("a") == 0.0
+    assert bucket.consumir("a") > 0
+    assert bucket.consumir("b") == 0.0
+
+
+def test_descarta_las_claves_menos_usadas(reloj, monkeypatch):
+    monkeypatch.setattr(rate_limit, "MAX_CLAVES", 2)
+    bucket = TokenBucket("prueba", por_minuto=60, rafaga=1)
+    bucket.consumir("a")
+    bucket.consumir("b")
+    bucket.consumir("c")
+    assert list(bucket._buckets) == ["b", "c"]
+    # Una clave olvidada empieza llena
+    assert bucket.consumir("a") == 0.0
+
+
+def test_ip_cliente_sin_proxy(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_PROXIES", 0)
+    assert ip_cliente(_request("200.1.1.1")) == "200.1.1.1"
+
+
+@pytest.mark.parametrize("proxies, reenviada, esperada", [
+    (1, "190.2.2.2", "190.2.2.2"),
+    # El cliente puede inventar entradas a la izquierda: se toma la que agregó el proxy
+    (1, "1.1.1.1, 190.2.2.2", "190.2.2.2"),
+    (2, "1.1.1.1, 190.2.2.2, 10.0.0.5", "190.2.2.2"),
+    # Menos entradas que proxies (petición directa a la API): IP de la conexión
+    (2, "190.2.2.2", "200.1.1.1"),
+])
+def test_ip_cliente_detras_de_proxies(monkeypatch, proxies, reenviada, esperada):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_PROXIES", proxies)
+    assert ip_cliente(_request("200.1.1.1", reenviada)) == esperada
+
+
+def test_x_forwarded_for_sin_proxies_no_evita_el_limite(reloj, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_PROXIES", 0)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_COMPARTIDO", False)
+    monkeypatch.setattr(rate_limit, "limite_ip", TokenBucket("ip", 60, 2))
+    monkeypatch.setattr(rate_limit, "limite_fallos", TokenBucket("fallos", 5, 1))
+    # El header lo escribe el cliente: sin proxies declarados se limita por la IP de la conexión
+    assert ip_cliente(_request("200.1.1.1", "190.2.2.2")) == "200.1.1.1"
+    limitar_por_ip(_request("200.1.1.1", "1.1.1.1"))
+    limitar_por_ip(_request("200.1.1.1", "2.2.2.2"))
+    with pytest.raises(HTTPException) as error:
+        limitar_por_ip(_request("200.1.1.1", "3.3.3.3"))
+    assert error.value.status_code == 429
+
+    # Los ingresos fallidos también cuentan para la IP de la conexión
+    registrar_ingreso_fallido(_request("200.1.1.2", "4.4.4.4"))
+    with pytest.raises(HTTPException) as error:
+        limitar_por_ip(_request("200.1.1.2", "5.5.5.5"))
+    assert error.value.status_code == 429
+
+
+def test_limitar_por_ip(reloj, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_PROXIES", 0)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_COMPARTIDO", False)
+    monkeypatch.setattr(rate_limit, "limite_ip", TokenBucket("ip", 60, 2))
+    monkeypatch.setattr(rate_limit, "limite_fallos", TokenBucket("fallos", 5, 1))
+    request = _request("200.1.1.1")
+    limitar_por_ip(request)
+    limitar_por_ip(request)
+    with pytest.raises(HTTPException) as error:
+        limitar_por_ip(request)
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "1"
+
+    # Un ingreso fallido agota el bucket de fallos: la IP queda bloqueada aunque tenga tokens
+    otra = _request("200.1.1.2")
+    registrar_ingreso_fallido(otra)
+    with pytest.raises(HTTPException) as error:
+        limitar_por_ip(otra)
+    assert error.value.headers["Retry-After"] == "12"
+
+
+def test_bucket_compartido_en_postgresql(engine_bd):
+    bucket = TokenBucket("prueba", por_minuto=1, rafaga=2)
+    clave = str(uuid.uuid4())
+    try:
+        assert rate_limit._consumir_compartido(bucket, clave) == 0.0
+        assert rate_limit._consumir_compartido(bucket, clave) == 0.0
+        assert rate_limit._consumir_compartido(bucket, clave) == pytest.approx(60.0)
+    finally:
+        with engine_bd.begin() as conn:
+            conn.exec_driver_sql("DELETE FROM public.rate_limit_buckets WHERE clave = %s", (f"prueba:{clave}",))
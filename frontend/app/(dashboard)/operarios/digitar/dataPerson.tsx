@@ -43,6 +43,7 @@ import {
   obtenerCoeficientePoder,
   verificarControlExistente,
   actualizarRegistro,
+  registrarActividad as registrarActividadRegistro,
   getRegistro,
   getRegistros,
   type Registro 
@@ -280,84 +281,17 @@ export default function DataPerson() {
     setIsLoading(true);
 
     try {
-      const actividadesActuales = getActividades();
-      const siguienteNumero = actividadesActuales.length + 1;
-      const hora = obtenerHoraActual();
-
-      // Crear nueva actividad
-      const nuevaActividad: Actividad = {
-        tipo: tipo,
-        hora: hora
-      };
-
-      // Construir el objeto de actividades
-      const actividadIngresoNuevo: Record<string, Actividad> = {};
-      
-      // Agregar actividades existentes
-      actividadesActuales.forEach((act, index) => {
-        actividadIngresoNuevo[`actividad_${index + 1}`] = act;
-      });
-
-      // Agregar nueva actividad
-      actividadIngresoNuevo[`actividad_${siguienteNumero}`] = nuevaActividad;
-
-      // Determinar qué hacer con el número de control y gestion_poderes
-      let numeroControlActualizar: string | null | undefined = undefined;
-      let gestionPoderesActualizar: Record<string, any> | undefined = undefined;
-      
-      if (tipo === "salida") {
-        // Al salir, quitar el número de control
-        numeroControlActualizar = null;
-      } else if (tipo === "ingreso" || tipo === "reingreso") {
-        // Al ingresar o reingresar, asignar el número de control
-        numeroControlActualizar = numeroControl || undefined;
-        
-        // Actualizar el poder_1 con el número de control
-        if (numeroControl) {
-          const poderesActuales = getPoderes();
-          const gestionPoderesActual = registroSeleccionado.gestion_poderes || {};
-          
-          // Obtener los datos del poder_1 actual o usar los datos de la persona
-          let poder1 = {
-            torre: registroSeleccionado.numero_torre || "",
-            apartamento: registroSeleccionado.numero_apartamento || "",
-            numero_control: numeroControl
-          };
-          
-          // Si ya existe poder_1, mantener su torre y apartamento, solo actualizar numero_control
-          if (poderesActuales.length > 0) {
-            const poder1Actual = poderesActuales[0];
-            poder1 = {
-              torre: poder1Actual.torre || registroSeleccionado.numero_torre || "",
-              apartamento: poder1Actual.apartamento || registroSeleccionado.numero_apartamento || "",
-              numero_control: numeroControl
-            };
-          }
-          
-          // Construir el nuevo gestion_poderes
-          gestionPoderesActualizar = {
-            poder_1: poder1
-          };
-          
-          // Agregar los demás poderes si existen
-          if (poderesActuales.length > 1) {
-            poderesActuales.slice(1).forEach((poder, index) => {
-              gestionPoderesActualizar![`poder_${index + 2}`] = {
-                torre: poder.torre || "",
-                apartamento: poder.apartamento || "",
-                numero_control: poder.numero_control || ""
-              };
-            });
-          }
-        }
-      }
-
-      // Actualizar registro
-      const registroActualizado = await actualizarRegistro(registroSeleccionado.id, {
-        gestion_poderes: gestionPoderesActualizar,
-        actividad_ingreso: actividadIngresoNuevo,
-        numero_control: numeroControlActualizar,
+      // El backend agrega la siguiente actividad con su hora y asigna/quita el número de control
+      // en una sola operación (sin reenviar todo actividad_ingreso)
+      const registroActualizado = await registrarActividadRegistro(registroSeleccionado.id, {
+        tipo,
+        numero_control: tipo === "salida" ? undefined : numeroControl,
       });
+      const actividadesRegistradas = Object.entries(registroActualizado.actividad_ingreso || {})
+        .sort(([a], [b]) => Number(a.replace("actividad_", "")) - Number(b.replace("actividad_", "")));
+      const hora = actividadesRegistradas.length > 0
+        ? String((actividadesRegistradas[actividadesRegistradas.length - 1][1] as Actividad).hora)
+        : obtenerHoraActual();
 
       actualizarRegistroContext(registroActualizado);
       
@@ -852,7 +786,7 @@ export default function DataPerson() {
           // Actualizar el registro con el número de control
           registroActualizado = await actualizarRegistro(registroSeleccionado.id, {
             gestion_poderes: gestionPoderesActualizado,
-          });
+          }, registroActualizado.version);
         }
       }
       
@@ -951,7 +885,7 @@ export default function DataPerson() {
       // Actualizar en el backend
       const registroActualizado = await actualizarRegistro(registroSeleccionado.id, {
         gestion_poderes: gestionPoderesNuevo,
-      });
+      }, registroSeleccionado.version);
 
       actualizarRegistroContext(registroActualizado);
       
@@ -1039,7 +973,7 @@ export default function DataPerson() {
         // Actualizar en el backend
         const registroActualizado = await actualizarRegistro(registroSeleccionado.id, {
           gestion_poderes: gestionPoderesNuevo,
-        });
+        }, registroSeleccionado.version);
 
         actualizarRegistroContext(registroActualizado);
         toast.success("Poder eliminado");
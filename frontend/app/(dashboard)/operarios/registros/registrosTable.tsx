@@ -152,7 +152,7 @@ export default function RegistrosTable() {
             const newApt = (payload.numero_apartamento as string | null) ?? null;
             const newControl = (payload.numero_control as string | null) ?? null;
             payload.gestion_poderes = mergePoder1(registro.gestion_poderes, newTorre, newApt, newControl);
-            return actualizarRegistro(registro.id, payload as any);
+            return actualizarRegistro(registro.id, payload as any, registro.version);
           })
         );
         setRegistros((prev) =>
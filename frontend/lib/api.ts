@@ -21,6 +21,54 @@ export function getAuthToken(): string | null {
     return window.localStorage.getItem(AUTH_TOKEN_KEY);
 }
 
+/** Genera una Idempotency-Key nueva (UUID v4 cuando el navegador lo soporta) */
+function nuevaIdempotencyKey(): string {
+    if (typeof crypto !== "undefined" && typeof crypto.randomUUID === "function") {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+}
+
+// Respuestas tras las que se reintenta con la misma clave (el servidor o el proxy no terminaron la petición)
+const ESTADOS_REINTENTABLES = [502, 503, 504];
+
+/**
+ * apiFetch para POST/PUT que no deben aplicarse dos veces (transferir y devolver poderes).
+ *
+ * Envía un header Idempotency-Key y, si la red falla o el servidor no responde, reintenta con
+ * la misma clave: si la primera petición sí se aplicó, el backend repite su respuesta en lugar
+ * de ejecutarla otra vez. Un 409 con Retry-After (la original sigue en curso) también se reintenta;
+ * un 409 sin Retry-After (conflicto de versión) se devuelve tal cual.
+ *
+ * @param endpoint - Ruta del endpoint
+ * @param options - Opciones de fetch (method, body, headers, etc.)
+ * @param reintentos - Reintentos después del primer intento
+ */
+export async function apiFetchIdempotente(endpoint: string, options: RequestInit = {}, reintentos = 3) {
+    const headers: Record<string, string> = {
+        ...(options.headers as Record<string, string> || {}),
+        "Idempotency-Key": nuevaIdempotencyKey(),
+    };
+
+    for (let intento = 0; ; intento++) {
+        const espera = 500 * 2 ** intento;
+        try {
+            const res = await apiFetch(endpoint, { ...options, headers });
+            const enCurso = res.status === 409 && res.headers.has("Retry-After");
+            if (intento < reintentos && (enCurso || ESTADOS_REINTENTABLES.includes(res.status))) {
+                const retryAfter = Number(res.headers.get("Retry-After"));
+                await new Promise((resolve) => setTimeout(resolve, retryAfter > 0 ? retryAfter * 1000 : espera));
+                continue;
+            }
+            return res;
+        } catch (error) {
+            // Sin respuesta (conexión cortada): no se sabe si se aplicó, la misma clave lo resuelve
+            if (intento >= reintentos) throw error;
+            await new Promise((resolve) => setTimeout(resolve, espera));
+        }
+    }
+}
+
 /**
  * Función helper para realizar peticiones HTTP a la API
  * 
@@ -1,4 +1,4 @@
-import { apiFetch } from "@/lib/api";
+import { apiFetch, apiFetchIdempotente } from "@/lib/api";
 
 export interface Registro {
   id: string;
@@ -15,6 +15,8 @@ export interface Registro {
   gestion_poderes: Record<string, any> | null;
   created_at: string;
   updated_at: string;
+  /** Versión del registro; se envía como If-Match al actualizar */
+  version: number;
 }
 
 export interface SearchParams {
@@ -242,11 +244,13 @@ export interface RegistroUpdatePayload {
  *
  * @param registroId - ID del registro
  * @param payload - Campos a actualizar (solo se envían los definidos)
+ * @param version - Versión leída del registro; si otra persona lo modificó después, el backend responde 409
  * @returns Registro actualizado
  */
 export async function actualizarRegistro(
   registroId: string,
-  payload: RegistroUpdatePayload
+  payload: RegistroUpdatePayload,
+  version?: number
 ): Promise<Registro> {
   const endpoint = `/registros/${registroId}`;
 
@@ -262,11 +266,14 @@ export async function actualizarRegistro(
   if (payload.actividad_ingreso !== undefined) body.actividad_ingreso = payload.actividad_ingreso;
 
   try {
+    const headers: Record<string, string> = {
+      "Content-Type": "application/json",
+    };
+    if (version !== undefined) headers["If-Match"] = `W/"${version}"`;
+
     const response = await apiFetch(endpoint, {
       method: "PUT",
-      headers: {
-        "Content-Type": "application/json",
-      },
+      headers,
       body: JSON.stringify(body),
     });
 
@@ -275,6 +282,10 @@ export async function actualizarRegistro(
       return data;
     }
 
+    if (response.status === 409) {
+      throw new Error("El registro fue modificado por otra persona. Recargue los datos e intente de nuevo.");
+    }
+
     throw new Error(`Error al actualizar registro: ${response.status}`);
   } catch (error) {
     console.error("Error al actualizar registro:", error);
@@ -283,7 +294,44 @@ export async function actualizarRegistro(
 }
 
 /**
- * Transfiere un poder de un registro a otro
+ * Registra una actividad (ingreso, salida o reingreso) en un registro.
+ * El servidor agrega la siguiente actividad_N con su propia hora en una sola operación,
+ * así dos mesas que registran al mismo tiempo no se sobrescriben.
+ *
+ * @param registroId - ID del registro
+ * @param params - Tipo de actividad y número de control (ingreso/reingreso)
+ * @returns Registro actualizado
+ */
+export async function registrarActividad(
+  registroId: string,
+  params: { tipo: "ingreso" | "salida" | "reingreso"; numero_control?: string }
+): Promise<Registro> {
+  const endpoint = `/registros/${registroId}/actividad`;
+
+  try {
+    const response = await apiFetch(endpoint, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(params),
+    });
+
+    if (response.ok) {
+      const data: Registro = await response.json();
+      return data;
+    }
+
+    throw new Error(`Error al registrar actividad: ${response.status}`);
+  } catch (error) {
+    console.error("Error al registrar actividad:", error);
+    throw error;
+  }
+}
+
+/**
+ * Transfiere un poder de un registro a otro.
+ * Se envía con Idempotency-Key y se reintenta ante fallos de red sin transferir dos veces.
  * 
  * @param asambleaId - ID de la asamblea
  * @param params - Parámetros de transferencia
@@ -296,7 +344,7 @@ export async function transferirPoder(
   const endpoint = `/registros/asamblea/${asambleaId}/poderes/transferir`;
 
   try {
-    const response = await apiFetch(endpoint, {
+    const response = await apiFetchIdempotente(endpoint, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -398,7 +446,8 @@ export async function verificarControlExistente(
 }
 
 /**
- * Devuelve un poder a su dueño original
+ * Devuelve un poder a su dueño original.
+ * Se envía con Idempotency-Key y se reintenta ante fallos de red sin devolver dos veces.
  * 
  * @param asambleaId - ID de la asamblea
  * @param params - Parámetros de devolución
@@ -411,7 +460,7 @@ export async function devolverPoder(
   const endpoint = `/registros/asamblea/${asambleaId}/poderes/devolver`;
 
   try {
-    const response = await apiFetch(endpoint, {
+    const response = await apiFetchIdempotente(endpoint, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",